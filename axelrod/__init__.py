@@ -13,12 +13,19 @@ from .player import (
     update_history, update_state_distribution, Player)
 from .mock_player import MockPlayer
 from .match import Match
-from .moran import MoranProcess, ApproximateMoranProcess
+from .moran import (MoranProcess, ApproximateMoranProcess,
+                    TypeCountMoranProcess, AnalyticMoranProcess,
+                    estimate_fixation, build_cached_outcomes,
+                    save_cached_outcomes, load_cached_outcomes)
 from .strategies import *
 from .deterministic_cache import DeterministicCache
 from .match_generator import *
 from .tournament import Tournament
 from .result_set import ResultSet
+from .out_of_core import OutOfCoreResultSet
+from .sparse import SparseResultSet
 from .ecosystem import Ecosystem
-from .fingerprint import AshlockFingerprint, TransitiveFingerprint
+from .fingerprint import (AshlockFingerprint, TransitiveFingerprint,
+                          FingerprintIndex, FingerprintStore,
+                          fingerprint_strategies)
 
@@ -1,4 +1,6 @@
-import random
+import numpy as np
+from scipy.integrate import solve_ivp
+
 from axelrod.result_set import ResultSet
 from typing import List, Callable
 
@@ -44,35 +46,129 @@ class Ecosystem(object):
         else:
             self.fitness = lambda p: p
 
-    def reproduce(self, turns: int):
+    def _fitness(self, payoffs: np.ndarray) -> np.ndarray:
+        """Applies the fitness function to every payoff of an array."""
+        return np.vectorize(self.fitness, otypes=[float])(payoffs)
+
+    def reproduce_batch(self, turns: int, populations: np.ndarray = None,
+                        repetitions: int = None) -> np.ndarray:
+        """Runs a batch of independent ecosystems.
+
+        Every turn the payoff matrix of each ecosystem is sampled at once and
+        the populations are updated by matrix-vector products.
+        `self.population_sizes` is not modified.
 
-        for iturn in range(turns):
-            plist = list(range(self.num_players))
-            pops = self.population_sizes[-1]
+        Parameters
+        ----------
+        turns : int
+            The number of turns
+        populations : np.array, optional
+            The initial populations of the ecosystems, one row per ecosystem.
+            The rows are normalised. If None, the last population of
+            `self.population_sizes` is used for every ecosystem.
+        repetitions : int, optional
+            The number of ecosystems when populations is None
+            Default: 1
 
+        Returns
+        ----------
+        populations : np.array
+            An array of shape (turns + 1, ecosystems, players) of the
+            normalised populations of each ecosystem after each turn.
+        """
+        if populations is None:
+            populations = np.tile(self.population_sizes[-1],
+                                  (repetitions or 1, 1))
+        populations = np.array(populations, dtype=float)
+        if (populations.ndim != 2 or
+                populations.shape[1] != self.num_players):
+            raise TypeError(
+                "Population vectors must be same size as number of players")
+        if populations.min() < 0:
+            raise TypeError(
+                "Minimum value of population vector must be non-negative")
+        populations = populations / populations.sum(axis=1, keepdims=True)
+
+        mean = np.array(self.payoff_matrix, dtype=float)
+        stddev = np.array(self.payoff_stddevs, dtype=float)
+        shape = (len(populations),) + mean.shape
+
+        history = np.empty((turns + 1,) + populations.shape)
+        history[0] = populations
+        for turn in range(turns):
             # The unit payoff for each player in this turn is the sum of the
             # payoffs obtained from playing with all other players, scaled by
             # the size of the opponent's population. Note that we sample the
             # normal distribution based on the payoff matrix and its standard
             # deviations obtained from the iterated PD tournament run
             # previously.
-            payoffs = [0.0 for ip in plist]
-            for ip in plist:
-                for jp in plist:
-                    avg = self.payoff_matrix[ip][jp]
-                    dev = self.payoff_stddevs[ip][jp]
-                    p = random.normalvariate(avg, dev)
-                    payoffs[ip] += p * pops[jp]
+            payoff_matrices = np.random.normal(mean, stddev, size=shape)
+            payoffs = np.einsum('bij,bj->bi', payoff_matrices, populations)
 
             # The fitness should determine how well a strategy reproduces. The
             # new populations should be multiplied by something that is
             # proportional to the fitness, but we are normalizing anyway so
             # just multiply times fitness.
-            fitness = [self.fitness(p) for p in payoffs]
-            newpops = [p * f for p, f in zip(pops, fitness)]
+            populations = populations * self._fitness(payoffs)
 
             # Make sure the new populations are normalized to one.
-            norm = sum(newpops)
-            newpops = [p / norm for p in newpops]
+            populations = populations / populations.sum(axis=1, keepdims=True)
+            history[turn + 1] = populations
+        return history
+
+    def _replicate(self, turns: int, tolerance: float) -> None:
+        """Integrates the replicator dynamics of the mean payoff matrix,
+        recording the populations at each integer time until the populations
+        have converged."""
+        matrix = np.array(self.payoff_matrix, dtype=float)
+
+        def derivative(_, populations):
+            fitness = self._fitness(np.dot(matrix, populations))
+            return populations * (fitness - np.dot(populations, fitness))
+
+        def converged(time, populations):
+            return np.abs(derivative(time, populations)).max() - tolerance
+        converged.terminal = True  # type: ignore
+        converged.direction = -1  # type: ignore
+
+        initial = np.array(self.population_sizes[-1], dtype=float)
+        if turns == 0 or converged(0, initial) <= 0:
+            return
+        solution = solve_ivp(derivative, (0, turns), initial,
+                             t_eval=np.arange(1, turns + 1), events=converged,
+                             rtol=1e-8, atol=1e-10)
+        populations = solution.y.T
+        if solution.status == 1:
+            # The populations when they converged
+            populations = np.vstack([populations, solution.y_events[0]])
+        for population in populations:
+            population = np.maximum(population, 0)
+            self.population_sizes.append(
+                (population / population.sum()).tolist())
+
+    def reproduce(self, turns: int, replicator: bool = False,
+                  tolerance: float = 1e-8) -> None:
+        """Evolves the populations, appending them to
+        `self.population_sizes`.
+
+        Parameters
+        ----------
+        turns : int
+            The number of turns
+        replicator : bool, optional
+            If False, each turn the payoffs are sampled from the normal
+            distributions of the tournament and the populations are multiplied
+            by their fitness. If True, the deterministic replicator dynamics
+            of the mean payoffs are integrated until time `turns`, recording
+            the populations at each integer time, and stop early (recording
+            the final populations) when the populations have converged.
+        tolerance : float, optional
+            In replicator mode, the populations have converged when none of
+            their rates of change is larger than tolerance.
+        """
+        if replicator:
+            self._replicate(turns, tolerance)
+            return
 
-            self.population_sizes.append(newpops)
+        populations = self.reproduce_batch(turns)
+        self.population_sizes.extend(populations[1:, 0].tolist())
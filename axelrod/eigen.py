@@ -3,10 +3,21 @@ Compute the principal eigenvector of a matrix using power iteration.
 
 See also numpy.linalg.eig which calculates all the eigenvalues and
 eigenvectors.
+
+For large matrices the principal eigenvector can also be computed with
+ARPACK (the implicitly restarted Arnoldi method, the non symmetric analogue
+of Lanczos) through scipy, and the `RatingEngine` rates many result sets at
+once, warm starting each computation from the previous eigenvector.
 """
 
+from typing import Dict, List, Tuple
+
 import numpy
-from typing import Tuple
+from scipy.sparse import issparse
+from scipy.sparse.linalg import ArpackNoConvergence, LinearOperator, eigs
+
+# The size from which the 'auto' method uses ARPACK instead of power iteration
+ARPACK_THRESHOLD = 1000
 
 
 def normalise(nvec: numpy.ndarray) -> numpy.ndarray:
@@ -23,13 +34,24 @@ def squared_error(vector_1: numpy.ndarray, vector_2: numpy.ndarray) -> float:
     return numpy.sqrt(s)
 
 
-def power_iteration(mat: numpy.matrix, initial: numpy.ndarray) -> numpy.ndarray:
+def product(mat, vector: numpy.ndarray) -> numpy.ndarray:
+    """
+    Multiplies a matrix by a vector. The matrix can be anything accepted by
+    numpy.dot, a scipy sparse matrix or a scipy LinearOperator.
+    """
+    if issparse(mat) or isinstance(mat, LinearOperator):
+        return mat.dot(vector)
+    return numpy.dot(mat, vector)
+
+
+def power_iteration(mat: numpy.ndarray,
+                    initial: numpy.ndarray) -> numpy.ndarray:
     """
     Generator of successive approximations.
 
     Params
     ------
-    mat: numpy.matrix
+    mat: numpy.ndarray, scipy.sparse matrix or LinearOperator
         The matrix to use for multiplication iteration
     initial: numpy.array, None
         The initial state. Will be set to numpy.array([1, 1, ...]) if None
@@ -41,44 +63,279 @@ def power_iteration(mat: numpy.matrix, initial: numpy.ndarray) -> numpy.ndarray:
 
     vec = initial
     while True:
-        vec = normalise(numpy.dot(mat, vec))
+        vec = normalise(product(mat, vec))
         yield vec
 
 
-def principal_eigenvector(mat: numpy.matrix, maximum_iterations=1000,
-                          max_error=1e-3) -> Tuple[numpy.ndarray, float]:
+def _as_operand(mat):
+    """Sparse matrices and linear operators are kept as they are, anything
+    else is converted to a float ndarray."""
+    if issparse(mat) or isinstance(mat, LinearOperator):
+        return mat
+    return numpy.asarray(mat, dtype=float)
+
+
+def _arpack_eigenvector(mat, maximum_iterations=None,
+                        initial: numpy.ndarray = None) -> numpy.ndarray:
+    """
+    Computes the eigenvector of the eigenvalue of largest magnitude with
+    ARPACK, to machine precision. Matrices too small for ARPACK are made
+    dense.
+    """
+    size = mat.shape[0]
+    if size < 3:
+        if not isinstance(mat, numpy.ndarray):
+            mat = product(mat, numpy.identity(size))
+        eigenvalues, eigenvectors = numpy.linalg.eig(mat)
+        vector = eigenvectors[:, numpy.argmax(numpy.abs(eigenvalues))]
+    else:
+        try:
+            _, eigenvectors = eigs(mat, k=1, which='LM', v0=initial,
+                                   maxiter=maximum_iterations)
+        except ArpackNoConvergence as error:
+            eigenvectors = error.eigenvectors
+        vector = eigenvectors[:, 0]
+    # The eigenvector is defined up to a (complex) factor: choose the real
+    # unit vector whose components have a non negative sum, as obtained by
+    # power iteration from numpy.ones for non negative matrices.
+    vector = numpy.real(vector * numpy.exp(
+        -1j * numpy.angle(vector[numpy.argmax(numpy.abs(vector))])))
+    vector = normalise(vector)
+    if vector.sum() < 0:
+        vector = -vector
+    return vector
+
+
+def principal_eigenvector(mat, maximum_iterations=1000, max_error=1e-3,
+                          initial: numpy.ndarray = None,
+                          method: str = 'power'
+                          ) -> Tuple[numpy.ndarray, float]:
     """
     Computes the (normalised) principal eigenvector of the given matrix.
 
     Params
     ------
-    mat: numpy.matrix
-        The matrix to use for multiplication iteration
-    initial: numpy.array, None
-        The initial state. Will be set to numpy.array([1, 1, ...]) if None
+    mat: array like, scipy.sparse matrix or LinearOperator
+        The matrix to use for multiplication iteration. Sparse matrices and
+        linear operators are never converted to dense matrices.
     maximum_iterations: int, None
         The maximum number of iterations of the approximation
-    max_error: float, 1e-8
-        Exit criterion -- error threshold of the difference of successive steps
+    max_error: float, 1e-3
+        Exit criterion -- error threshold of the difference of successive
+        steps of power iteration
+    initial: numpy.array, None
+        The initial vector, for example a previous eigenvector of a similar
+        matrix. Will be set to numpy.array([1, 1, ...]) if None
+    method: str, 'power'
+        'power' for power iteration, 'arpack' for ARPACK (to machine
+        precision) or 'auto' to use ARPACK for matrices of at least
+        ARPACK_THRESHOLD rows
     """
-
-    mat_ = numpy.matrix(mat)
+    mat_ = _as_operand(mat)
     size = mat_.shape[0]
-    initial = numpy.ones(size)
+    if initial is None:
+        initial = numpy.ones(size)
+    else:
+        initial = numpy.asarray(initial, dtype=float)
+
+    if method == 'auto':
+        method = 'arpack' if size >= ARPACK_THRESHOLD else 'power'
+    if method == 'arpack':
+        vector = _arpack_eigenvector(mat_, maximum_iterations, initial)
+    elif method == 'power':
+        # Power iteration
+        if not maximum_iterations:
+            maximum_iterations = float('inf')
+        last = initial
+        for i, vector in enumerate(power_iteration(mat_, initial=initial)):
+            if i > maximum_iterations:
+                break
+            if squared_error(vector, last) < max_error:
+                break
+            last = vector
+    else:
+        raise ValueError("method must be one of 'power', 'arpack' or 'auto'")
 
-    # Power iteration
-    if not maximum_iterations:
-        maximum_iterations = float('inf')
-    last = initial
-    for i, vector in enumerate(power_iteration(mat, initial=initial)):
-        if i > maximum_iterations:
-            break
-        if squared_error(vector, last) < max_error:
-            break
-        last = vector
     # Compute the eigenvalue (Rayleigh quotient)
     eigenvalue = numpy.dot(
-        numpy.dot(mat_, vector), vector) / numpy.dot(vector, vector)
+        product(mat_, vector), vector) / numpy.dot(vector, vector)
     # Liberate the eigenvalue from numpy
     eigenvalue = float(eigenvalue)
     return vector, eigenvalue
+
+
+def principal_eigenvectors(matrices, maximum_iterations=1000, max_error=1e-3,
+                           initial: numpy.ndarray = None
+                           ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Computes the principal eigenvectors of a batch of matrices of the same
+    size by power iteration, iterating all the matrices at once.
+
+    Each eigenvector is the one `principal_eigenvector` would compute (up to
+    rounding): the iteration of a matrix stops as soon as it has converged.
+
+    Params
+    ------
+    matrices: array like
+        The matrices, of shape (batch, size, size)
+    maximum_iterations: int, None
+        The maximum number of iterations of the approximation
+    max_error: float, 1e-3
+        Exit criterion -- error threshold of the difference of successive
+        steps
+    initial: numpy.array, None
+        The initial vector of every matrix (of shape (size,)) or of each
+        matrix (of shape (batch, size)). Will be set to numpy.array([1, 1,
+        ...]) if None
+
+    Returns
+    -------
+    eigenvectors, eigenvalues: numpy.array
+        The eigenvectors (one row per matrix) and eigenvalues
+    """
+    matrices = numpy.asarray(matrices, dtype=float)
+    batch, size = matrices.shape[:2]
+    if initial is None:
+        initial = numpy.ones(size)
+    last = numpy.array(numpy.broadcast_to(initial, (batch, size)),
+                       dtype=float)
+    if not maximum_iterations:
+        maximum_iterations = float('inf')
+
+    vectors = numpy.empty((batch, size))
+    active = numpy.arange(batch)
+    i = 0
+    while len(active):
+        with numpy.errstate(invalid='ignore'):
+            vector = numpy.einsum('bij,bj->bi', matrices[active],
+                                  last[active])
+            vector = vector / numpy.sqrt(
+                (vector ** 2).sum(axis=1))[:, numpy.newaxis]
+        errors = numpy.sqrt(((vector - last[active]) ** 2).sum(axis=1))
+        done = (errors < max_error) | (i > maximum_iterations)
+        vectors[active[done]] = vector[done]
+        last[active] = vector
+        active = active[~done]
+        i += 1
+
+    # Compute the eigenvalues (Rayleigh quotients)
+    eigenvalues = (numpy.einsum('bij,bj->bi', matrices, vectors) *
+                   vectors).sum(axis=1) / (vectors ** 2).sum(axis=1)
+    return vectors, eigenvalues
+
+
+class RatingEngine(object):
+    """
+    Computes the eigenvector ratings (eigenjesus and eigenmoses) of result
+    sets.
+
+    The eigenvectors of a batch of result sets are computed at once and each
+    computation can be warm started from the previous eigenvector of the
+    same rating and size, which is useful when rating many similar result
+    sets (bootstrap samples, noise sweeps).
+
+    Parameters
+    ----------
+    method : str
+        'power', 'arpack' or 'auto' (see `principal_eigenvector`). Batches
+        are iterated at once with power iteration.
+    maximum_iterations : int
+        The maximum number of iterations of power iteration
+    max_error : float
+        The convergence threshold of power iteration
+    warm_start : bool
+        Whether to start each computation from the previous eigenvector of
+        the same rating and size
+    """
+
+    def __init__(self, method: str = 'power', maximum_iterations: int = 1000,
+                 max_error: float = 1e-3, warm_start: bool = True) -> None:
+        self.method = method
+        self.maximum_iterations = maximum_iterations
+        self.max_error = max_error
+        self.warm_start = warm_start
+        self.eigenvectors = {}  # type: Dict[Tuple[str, int], numpy.ndarray]
+
+    def _initial(self, key: str, size: int) -> numpy.ndarray:
+        """The initial vector of a computation, None for a cold start."""
+        if self.warm_start:
+            return self.eigenvectors.get((key, size))
+        return None
+
+    def principal_eigenvector(self, mat, key: str = None) -> numpy.ndarray:
+        """
+        Computes the principal eigenvector of a matrix (dense, sparse or a
+        LinearOperator).
+
+        Parameters
+        ----------
+        mat : array like, scipy.sparse matrix or LinearOperator
+        key : str
+            The name of the rating, used to warm start the next computation
+        """
+        size = mat.shape[0] if hasattr(mat, 'shape') else len(mat)
+        vector, _ = principal_eigenvector(
+            mat, maximum_iterations=self.maximum_iterations,
+            max_error=self.max_error, initial=self._initial(key, size),
+            method=self.method)
+        if numpy.all(numpy.isfinite(vector)):
+            self.eigenvectors[(key, size)] = vector
+        return vector
+
+    def principal_eigenvectors(self, matrices,
+                               key: str = None) -> numpy.ndarray:
+        """
+        Computes the principal eigenvectors of a batch of matrices of the
+        same size, one row per matrix.
+
+        Parameters
+        ----------
+        matrices : array like
+            The matrices, of shape (batch, size, size)
+        key : str
+            The name of the rating, used to warm start the next computation
+        """
+        matrices = numpy.asarray(matrices, dtype=float)
+        size = matrices.shape[1]
+        method = self.method
+        if method == 'auto':
+            method = 'arpack' if size >= ARPACK_THRESHOLD else 'power'
+        if method != 'power':
+            return numpy.array([self.principal_eigenvector(matrix, key)
+                                for matrix in matrices])
+
+        vectors, _ = principal_eigenvectors(
+            matrices, maximum_iterations=self.maximum_iterations,
+            max_error=self.max_error, initial=self._initial(key, size))
+        finite = numpy.all(numpy.isfinite(vectors), axis=1)
+        if finite.any():
+            self.eigenvectors[(key, size)] = vectors[finite][-1]
+        return vectors
+
+    def rate(self, result_sets: List) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Computes the eigenjesus and eigenmoses ratings of result sets with
+        the same number of players.
+
+        Parameters
+        ----------
+        result_sets : list
+            Result sets with dense `normalised_cooperation` and
+            `vengeful_cooperation` matrices (ResultSet or OutOfCoreResultSet)
+
+        Returns
+        -------
+        eigenjesus, eigenmoses : numpy.array
+            The ratings of each result set, one row per result set
+        """
+        normalised_cooperation = numpy.array(
+            [result_set.normalised_cooperation for result_set in result_sets],
+            dtype=float)
+        vengeful_cooperation = numpy.array(
+            [result_set.vengeful_cooperation for result_set in result_sets],
+            dtype=float)
+        eigenjesus = self.principal_eigenvectors(normalised_cooperation,
+                                                 key='eigenjesus')
+        eigenmoses = self.principal_eigenvectors(vengeful_cooperation,
+                                                 key='eigenmoses')
+        return eigenjesus, eigenmoses
@@ -1,25 +1,46 @@
 import csv
 import os
-from collections import namedtuple
-from tempfile import mkstemp
+import pickle
+from collections import UserDict, namedtuple
+from functools import lru_cache
+from importlib import import_module
+from itertools import product
 
 import matplotlib.pyplot as plt
 import numpy as np
 import tqdm
-import dask.dataframe as dd
-import dask as da
+import pandas as pd
 from mpl_toolkits.axes_grid1 import make_axes_locatable
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.interpolate import griddata
 
 import axelrod as axl
 from axelrod import Player
-from axelrod.strategy_transformers import JossAnnTransformer, DualTransformer
+from axelrod.action import Action
+from axelrod.player import update_history
+from axelrod.strategy_transformers import (
+    DualTransformer, StrategyTransformerFactory, joss_ann_wrapper,
+    jossann_reclassifier)
 from axelrod.interaction_utils import (
     compute_final_score_per_turn, read_interactions_from_file)
 
-from typing import List, Any, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+C, D = Action.C, Action.D
 
 Point = namedtuple('Point', 'x y')
 
+# A strategy as a finite Markov chain: the probability of cooperating in each
+# state and the next state for each state, own action and opponent action
+# (indexed 0 for C and 1 for D). The chain starts in state 0.
+Machine = namedtuple('Machine', 'cooperation transitions')
+
+# The largest number of states explored by `create_machine`
+MAX_MACHINE_STATES = 1000
+# The length of the histories used to check that a deterministic player only
+# looks at the last round
+MEMORY_ONE_CHECK_DEPTH = 3
+
 
 def create_points(step: float, progress_bar: bool = True) -> List[Point]:
     """Creates a set of Points over the unit square.
@@ -60,6 +81,79 @@ def create_points(step: float, progress_bar: bool = True) -> List[Point]:
     return points
 
 
+def _joss_ann_probe_wrapper(player: Player, opponent: Player,
+                            proposed_action: Action) -> Action:
+    """The JossAnn wrapper with the probability of the point stored on the
+    player."""
+    return joss_ann_wrapper(player, opponent, proposed_action,
+                            player.joss_ann_probability)
+
+
+_JossAnnProbeTransformer = StrategyTransformerFactory(
+    _joss_ann_probe_wrapper, name_prefix="Joss-Ann")
+
+
+def _set_joss_ann_probability(player: Player, probability: tuple) -> None:
+    """Sets the probability of a JossAnn probe and reclassifies it as the
+    `JossAnnTransformer` does."""
+    player.joss_ann_probability = probability
+    jossann_reclassifier(player.classifier, probability)
+
+
+def _rebuild_jossann(probe: Union[type, Player], dual: bool) -> Player:
+    """Unpickles a JossAnn probe (see `_jossann_class`)."""
+    if isinstance(probe, Player):
+        probe = probe.__class__
+    return _jossann_class(probe, dual)()
+
+
+@lru_cache(maxsize=None)
+def _jossann_class(probe: type, dual: bool) -> type:
+    """The JossAnn (or dual JossAnn) class of a probe class.
+
+    The probability of a point is stored on the instances, so that the
+    transformed classes are only created once per probe class. The instances
+    are pickled as a reference to the probe class (or, if it cannot be
+    imported, an instance of it) and their attributes.
+    """
+    if dual:
+        probe_class = DualTransformer()(_jossann_class(probe, False))
+    else:
+        probe_class = _JossAnnProbeTransformer()(probe)
+        base_repr = probe_class.__repr__
+        base_clone = probe_class.clone
+        base_reset = probe_class.reset
+
+        def __repr__(self):
+            return ''.join([base_repr(self), ': ',
+                            str(self.joss_ann_probability)])
+
+        def clone(self):
+            new_player = base_clone(self)
+            _set_joss_ann_probability(new_player, self.joss_ann_probability)
+            return new_player
+
+        def reset(self):
+            base_reset(self)
+            _set_joss_ann_probability(self, self.joss_ann_probability)
+
+        probe_class.__repr__ = __repr__
+        probe_class.clone = clone
+        probe_class.reset = reset
+
+    if getattr(import_module(probe.__module__), probe.__name__,
+               None) is probe:
+        reference = probe  # type: Union[type, Player]
+    else:
+        reference = probe()
+
+    def __reduce__(self):
+        return _rebuild_jossann, (reference, dual), self.__dict__
+
+    probe_class.__reduce__ = __reduce__
+    return probe_class
+
+
 def create_jossann(point: Point, probe: Any) -> Player:
     """Creates a JossAnn probe player that matches the Point.
 
@@ -67,6 +161,10 @@ def create_jossann(point: Point, probe: Any) -> Player:
     flipped and subtracted from 1 to give meaningful probabilities. We also
     use the Dual of the probe. This is outlined further in [Ashlock2010]_.
 
+    The probe plays as the `JossAnnTransformer` (and `DualTransformer`) of
+    its class but the point is stored on the player: the transformed classes
+    are created once per probe class.
+
     Parameters
     ----------
     point : Point
@@ -88,10 +186,11 @@ def create_jossann(point: Point, probe: Any) -> Player:
         init_kwargs = {}
 
     if x + y >= 1:
-        joss_ann = DualTransformer()(
-            JossAnnTransformer((1 - x, 1 - y))(probe))(**init_kwargs)
+        joss_ann = _jossann_class(probe, True)(**init_kwargs)
+        _set_joss_ann_probability(joss_ann, (1 - x, 1 - y))
     else:
-        joss_ann = JossAnnTransformer((x, y))(probe)(**init_kwargs)
+        joss_ann = _jossann_class(probe, False)(**init_kwargs)
+        _set_joss_ann_probability(joss_ann, (x, y))
     return joss_ann
 
 
@@ -212,6 +311,389 @@ def reshape_data(data: dict, points: list, size: int) -> np.ndarray:
     return plotting_data
 
 
+def _explore(initial: Any, cooperation: Callable,
+             transition: Callable) -> Optional[Machine]:
+    """Builds the machine of the states reachable from `initial`, given the
+    probability of cooperating in a state and the next state after a pair of
+    actions. Returns None if there are more than MAX_MACHINE_STATES states."""
+    index = {initial: 0}
+    states = [initial]
+    probabilities = []  # type: List[float]
+    transitions = []  # type: List[List[List[int]]]
+    for state in states:
+        probabilities.append(float(cooperation(state)))
+        row = []  # type: List[List[int]]
+        for own in (C, D):
+            row.append([])
+            for opponent in (C, D):
+                next_state = transition(state, own, opponent)
+                if next_state not in index:
+                    if len(states) == MAX_MACHINE_STATES:
+                        return None
+                    index[next_state] = len(states)
+                    states.append(next_state)
+                row[-1].append(index[next_state])
+        transitions.append(row)
+    return Machine(np.array(probabilities), np.array(transitions, dtype=int))
+
+
+def _probability(action_or_float: Union[Action, float]) -> float:
+    """The probability of cooperating given by an action or a float."""
+    if isinstance(action_or_float, Action):
+        return float(action_or_float == C)
+    return float(action_or_float)
+
+
+def _tail(actions: tuple, depth: int) -> tuple:
+    """The last `depth` actions."""
+    return actions[len(actions) - depth:] if depth else ()
+
+
+def _memory_one_machine(player: Player) -> Optional[Machine]:
+    """The machine of a MemoryOnePlayer: its state is the last round."""
+    four_vector = player._four_vector
+    return _explore(
+        (),
+        lambda state: (four_vector[state] if state
+                       else _probability(player._initial)),
+        lambda state, own, opponent: (own, opponent))
+
+
+def _fsm_machine(player: Player) -> Optional[Machine]:
+    """The machine of an FSMPlayer: its state is the state of the finite
+    state machine and the last action of the opponent."""
+    fsm = player.fsm.state_transitions
+
+    def cooperation(state):
+        if not state:
+            return _probability(player.initial_action)
+        return _probability(fsm[state][1])
+
+    def transition(state, own, opponent):
+        if not state:
+            return player.initial_state, opponent
+        return fsm[state][0], opponent
+
+    return _explore((), cooperation, transition)
+
+
+def _lookup_machine(player: Player) -> Optional[Machine]:
+    """The machine of a LookerUp or a Gambler: its state is the turn (up to
+    the depth of the table), the last plays of both players and the openings
+    of the opponent."""
+    lookup = player._lookup
+    depth = lookup.table_depth
+    initial_actions = player.initial_actions
+
+    def cooperation(state):
+        turn, plays, op_plays, op_openings = state
+        if turn < len(initial_actions):
+            return _probability(initial_actions[turn])
+        return _probability(lookup.get(_tail(plays, lookup.player_depth),
+                                       _tail(op_plays, lookup.op_depth),
+                                       op_openings))
+
+    def transition(state, own, opponent):
+        turn, plays, op_plays, op_openings = state
+        return (min(turn + 1, depth),
+                _tail(plays + (own,), depth),
+                _tail(op_plays + (opponent,), depth),
+                (op_openings + (opponent,))[:lookup.op_openings_depth])
+
+    return _explore((0, (), (), ()), cooperation, transition)
+
+
+def _response(player: Player, history: tuple,
+              opponent_history: tuple) -> Action:
+    """The action of a clone of player after the given histories. The
+    strategy is called every round so that any internal state is updated."""
+    player = player.clone()
+    opponent = Player()
+    for own, other in zip(history, opponent_history):
+        player.strategy(opponent)
+        update_history(player, own)
+        update_history(opponent, other)
+    return player.strategy(opponent)
+
+
+def _deterministic_memory_one_machine(player: Player) -> Optional[Machine]:
+    """The machine of a deterministic player that only looks at the last
+    round, found by asking it for its action after every history of up to
+    MEMORY_ONE_CHECK_DEPTH rounds. Returns None if the action does not only
+    depend on the last round."""
+    first = _probability(_response(player, (), ()))
+    responses = {}  # type: Dict[tuple, float]
+    rounds = list(product((C, D), repeat=2))
+    for depth in range(1, MEMORY_ONE_CHECK_DEPTH + 1):
+        for history in product(rounds, repeat=depth):
+            own, opponent = zip(*history)
+            response = _probability(_response(player, own, opponent))
+            if responses.setdefault(history[-1], response) != response:
+                return None
+    return _explore(
+        (),
+        lambda state: responses[state] if state else first,
+        lambda state, own, opponent: (own, opponent))
+
+
+def create_machine(player: Union[type, Player]) -> Optional[Machine]:
+    """Creates the finite Markov chain of a strategy if it can be analysed.
+
+    Random players, memory one players, finite state machine players, lookup
+    table players (LookerUp and Gambler) and deterministic players that only
+    look at the last round (checked against every history of up to
+    MEMORY_ONE_CHECK_DEPTH rounds) can be analysed.
+
+    Parameters
+    ----------
+    player : class or instance
+        A class that must be descended from axelrod.Player or an instance of
+        axelrod.Player.
+
+    Returns
+    ----------
+    machine : Machine or None
+        The probability of cooperating in each state and the next state for
+        each pair of actions, or None if the strategy cannot be analysed.
+    """
+    if isinstance(player, axl.Player):
+        player = player.clone()
+    else:
+        player = player()
+    strategy = type(player).strategy
+    classifier = player.classifier
+
+    if isinstance(player, axl.Random) and strategy is axl.Random.strategy:
+        return Machine(np.array([float(player.p)]),
+                       np.zeros((1, 2, 2), dtype=int))
+    if isinstance(player, axl.MemoryOnePlayer) and \
+            strategy is axl.MemoryOnePlayer.strategy:
+        return _memory_one_machine(player)
+    if isinstance(player, axl.FSMPlayer) and \
+            strategy is axl.FSMPlayer.strategy:
+        return _fsm_machine(player)
+    if isinstance(player, axl.LookerUp) and \
+            strategy in (axl.LookerUp.strategy, axl.Gambler.strategy):
+        return _lookup_machine(player)
+    if (not classifier['stochastic'] and
+            classifier['memory_depth'] <= 1 and
+            not classifier['makes_use_of'] and
+            not classifier['inspects_source'] and
+            not classifier['manipulates_source'] and
+            not classifier['manipulates_state']):
+        return _deterministic_memory_one_machine(player)
+    return None
+
+
+def dual_machine(machine: Machine) -> Machine:
+    """The machine of the dual of a strategy: it plays the opposite action to
+    the original strategy as if its own history had been flipped."""
+    return Machine(1 - machine.cooperation, machine.transitions[:, ::-1, :])
+
+
+def _transition_matrices(machine: Machine) -> List[List[np.ndarray]]:
+    """The 0-1 matrices of the transitions of a machine for each pair of
+    own and opponent actions."""
+    size = len(machine.cooperation)
+    matrices = []  # type: List[List[np.ndarray]]
+    for own in range(2):
+        matrices.append([])
+        for opponent in range(2):
+            matrix = np.zeros((size, size))
+            matrix[np.arange(size), machine.transitions[:, own, opponent]] = 1
+            matrices[-1].append(matrix)
+    return matrices
+
+
+def _play_distributions(machine: Machine, probe_machine: Machine,
+                        probe_cooperation: np.ndarray, turns: int,
+                        noise: float = 0) -> Iterator[List[List[np.ndarray]]]:
+    """Yields, for each turn, the probability of each pair of states and of
+    each pair of actions of the strategy and the probe at a number of points.
+
+    The distribution over the pairs of states of both players is propagated
+    for all points at once, `probe_cooperation` being the probability of the
+    probe cooperating in each of its states at each point. The yielded arrays
+    are indexed by [own action][probe action] and have shape (points, states,
+    probe states).
+    """
+    cooperation = machine.cooperation * (1 - noise) + (
+        1 - machine.cooperation) * noise
+    probe_cooperation = probe_cooperation * (1 - noise) + (
+        1 - probe_cooperation) * noise
+    actions = [cooperation, 1 - cooperation]
+    probe_actions = [probe_cooperation, 1 - probe_cooperation]
+    matrices = _transition_matrices(machine)
+    probe_matrices = _transition_matrices(probe_machine)
+
+    distribution = np.zeros((len(probe_cooperation),
+                             len(machine.cooperation),
+                             len(probe_machine.cooperation)))
+    distribution[:, 0, 0] = 1
+    for _ in range(turns):
+        weights = [[distribution *
+                    actions[own][np.newaxis, :, np.newaxis] *
+                    probe_actions[opponent][:, np.newaxis, :]
+                    for opponent in range(2)] for own in range(2)]
+        yield weights
+        distribution = np.zeros(distribution.shape)
+        for own in range(2):
+            for opponent in range(2):
+                distribution += np.matmul(
+                    np.matmul(matrices[own][opponent].T,
+                              weights[own][opponent]),
+                    probe_matrices[opponent][own])
+
+
+def _expected_scores(machine: Machine, probe_machine: Machine,
+                     probe_cooperation: np.ndarray, turns: int,
+                     game: axl.Game) -> np.ndarray:
+    """The expected score per turn of the strategy against the probe at a
+    number of points."""
+    (R, P, S, T) = game.RPST()
+    payoffs = [[R, S], [T, P]]
+    total = np.zeros(len(probe_cooperation))
+    for weights in _play_distributions(machine, probe_machine,
+                                       probe_cooperation, turns):
+        for own in range(2):
+            for opponent in range(2):
+                total += (payoffs[own][opponent] *
+                          weights[own][opponent].sum(axis=(1, 2)))
+    return total / turns
+
+
+def exact_cooperation(machine: Machine, opponent_machines: List[Machine],
+                      turns: int, noise: float = 0) -> np.ndarray:
+    """Computes the probability of a strategy cooperating in each turn
+    against each of a list of opponents.
+
+    Opponents with the same transitions (for example Random players of any
+    probability) are computed at once.
+
+    Parameters
+    ----------
+    machine : Machine
+        The machine of the strategy
+    opponent_machines : list
+        The machines of the opponents
+    turns : int
+        The number of turns per match
+    noise : float
+        The probability that a player's intended action is flipped
+
+    Returns
+    ----------
+    cooperation : np.array
+        An array where the ith row is the probability of cooperating in each
+        turn against the ith opponent.
+    """
+    groups = {}  # type: Dict[tuple, List[int]]
+    for index, opponent in enumerate(opponent_machines):
+        key = (opponent.transitions.shape, opponent.transitions.tobytes())
+        groups.setdefault(key, []).append(index)
+
+    cooperation = np.zeros((len(opponent_machines), turns))
+    for indices in groups.values():
+        opponent_machine = opponent_machines[indices[0]]
+        opponent_cooperation = np.array(
+            [opponent_machines[index].cooperation for index in indices])
+        for turn, weights in enumerate(_play_distributions(
+                machine, opponent_machine, opponent_cooperation, turns,
+                noise)):
+            # The probability of the action played, noise included
+            cooperation[indices, turn] = (
+                weights[0][0] + weights[0][1]).sum(axis=(1, 2))
+    return cooperation
+
+
+def exact_data(machine: Machine, probe_machine: Machine, points: list,
+               turns: int, game: axl.Game = None) -> dict:
+    """Computes the expected score per turn of a strategy against the
+    JossAnn probes of every point.
+
+    For a point (x, y) the JossAnn probe cooperates with probability x,
+    defects with probability y and otherwise plays as the probe. When the
+    coordinates sum to more than 1 the probe is the dual of the JossAnn of
+    the point (1 - x, 1 - y), as in `create_jossann`.
+
+    Parameters
+    ----------
+    machine : Machine
+        The machine of the strategy
+    probe_machine : Machine
+        The machine of the probe
+    points : list
+        of Point objects with coordinates (x, y)
+    turns : int
+        The number of turns per match
+    game : axelrod.Game
+        The game used to score the matches, the default game if None
+
+    Returns
+    ----------
+    point_scores : dict
+        A dictionary where the keys are Points of the form (x, y) and
+        the values are the expected score per turn against their probe.
+    """
+    if game is None:
+        game = axl.DefaultGame
+    coordinates = np.array(points, dtype=float).reshape(-1, 2)
+    x, y = coordinates[:, 0:1], coordinates[:, 1:2]
+    dual = (x + y >= 1)[:, 0]
+    scores = np.zeros(len(points))
+
+    if (~dual).any():
+        cooperation = (x[~dual] + (1 - x[~dual] - y[~dual]) *
+                       probe_machine.cooperation)
+        scores[~dual] = _expected_scores(machine, probe_machine, cooperation,
+                                         turns, game)
+    if dual.any():
+        dual_probe = dual_machine(probe_machine)
+        cooperation = ((1 - y[dual]) + (x[dual] + y[dual] - 1) *
+                       dual_probe.cooperation)
+        scores[dual] = _expected_scores(machine, dual_probe, cooperation,
+                                        turns, game)
+    return dict(zip(points, scores.tolist()))
+
+
+def stream_scores(tournament: axl.Tournament, edges: list,
+                  processes: int = None, progress_bar: bool = True) -> tuple:
+    """Plays a spatial tournament and accumulates the score per turn of the
+    first player of each edge as the matches are played.
+
+    Parameters
+    ----------
+    tournament : axelrod.Tournament
+        A spatial tournament
+    edges : list of tuples
+        The edges of the tournament
+    processes : int, optional
+        The number of processes to be used for parallel processing
+    progress_bar : bool
+        Whether or not to create a progress bar which will be updated
+
+    Returns
+    ----------
+    means, variances : numpy.array
+        The mean and the (sample) variance of the score per turn of each edge
+    """
+    index = {edge: i for i, edge in enumerate(edges)}
+    totals = np.zeros(len(edges))
+    squares = np.zeros(len(edges))
+    counts = np.zeros(len(edges))
+    for edge, interactions in tournament.stream(processes=processes,
+                                                progress_bar=progress_bar):
+        for interaction in interactions:
+            score = compute_final_score_per_turn(interaction)[0]
+            totals[index[edge]] += score
+            squares[index[edge]] += score ** 2
+            counts[index[edge]] += 1
+    means = totals / counts
+    variances = np.maximum(squares - counts * means ** 2, 0) / np.maximum(
+        counts - 1, 1)
+    return means, variances
+
+
 class AshlockFingerprint(object):
     def __init__(self, strategy: Union[type, Player],
                  probe: Union[type, Player]=axl.TitForTat) -> None:
@@ -269,7 +751,7 @@ class AshlockFingerprint(object):
     def fingerprint(
         self, turns: int = 50, repetitions: int = 10, step: float = 0.01,
         processes: int=None, filename: str = None,
-        progress_bar: bool = True
+        progress_bar: bool = True, exact: bool = False
 ) -> dict:
         """Build and play the spatial tournament.
 
@@ -292,9 +774,15 @@ class AshlockFingerprint(object):
             The number of processes to be used for parallel processing
         filename: str, optional
             The name of the file for self.spatial_tournament's interactions.
-            if None, will auto-generate a filename.
+            If None, the interactions are not written to a file: the mean
+            scores are accumulated as the matches are played.
         progress_bar : bool
             Whether or not to create a progress bar which will be updated
+        exact : bool, optional
+            If True and both the strategy and the probe can be analysed by
+            `create_machine`, the expected scores are computed exactly from
+            their Markov chains instead of playing the spatial tournament.
+            Other strategies are fingerprinted by playing the tournament.
 
         Returns
         ----------
@@ -302,10 +790,17 @@ class AshlockFingerprint(object):
             A dictionary where the keys are coordinates of the form (x, y) and
             the values are the mean score for the corresponding interactions.
         """
-
-        temp_file_descriptor = None
-        if filename is None:
-            temp_file_descriptor, filename = mkstemp()
+        self.exact = False
+        if exact:
+            machine = create_machine(self.strategy)
+            probe_machine = create_machine(self.probe)
+            if machine is not None and probe_machine is not None:
+                self.exact = True
+                self.step = step
+                self.points = create_points(step, progress_bar=progress_bar)
+                self.data = exact_data(machine, probe_machine, self.points,
+                                       turns)
+                return self.data
 
         edges, tourn_players = self.construct_tournament_elements(
             step, progress_bar=progress_bar)
@@ -314,6 +809,11 @@ class AshlockFingerprint(object):
         self.spatial_tournament = axl.Tournament(tourn_players, turns=turns,
                                                  repetitions=repetitions,
                                                  edges=edges)
+        if filename is None:
+            self.interactions = None
+            self.data = self._stream_data(edges, processes, progress_bar)
+            return self.data
+
         self.spatial_tournament.play(build_results=False,
                                      filename=filename,
                                      processes=processes,
@@ -322,13 +822,180 @@ class AshlockFingerprint(object):
         self.interactions = read_interactions_from_file(
             filename, progress_bar=progress_bar)
 
-        if temp_file_descriptor is not None:
-            os.close(temp_file_descriptor)
-            os.remove(filename)
-
         self.data = generate_data(self.interactions, self.points, edges)
         return self.data
 
+    def _stream_data(self, edges: list, processes: int,
+                     progress_bar: bool) -> dict:
+        """Plays the spatial tournament and accumulates the mean score of the
+        strategy against each probe as the matches are played."""
+        means, _ = stream_scores(self.spatial_tournament, edges,
+                                 processes=processes,
+                                 progress_bar=progress_bar)
+        return dict(zip(self.points, means.tolist()))
+
+    def _sample(self, points: list, turns: int, repetitions: int,
+                processes: int, progress_bar: bool,
+                machines: tuple = None) -> tuple:
+        """The mean and variance of the score per turn of the strategy
+        against the probes of the points, computed exactly if the machines of
+        the strategy and the probe are given."""
+        if machines is not None:
+            data = exact_data(machines[0], machines[1], points, turns)
+            return (np.array([data[point] for point in points]),
+                    np.zeros(len(points)))
+        probes = create_probes(self.probe, points, progress_bar=False)
+        if isinstance(self.strategy, axl.Player):
+            players = [self.strategy] + probes
+        else:
+            players = [self.strategy()] + probes
+        edges = create_edges(points, progress_bar=False)
+        tournament = axl.Tournament(players, turns=turns,
+                                    repetitions=repetitions, edges=edges)
+        return stream_scores(tournament, edges, processes=processes,
+                             progress_bar=progress_bar)
+
+    def adaptive_fingerprint(
+        self, turns: int = 50, repetitions: int = 10,
+        initial_step: float = 0.25, min_step: float = 0.005,
+        tolerance: float = 0.1, max_probes: int = None,
+        processes: int = None, progress_bar: bool = True,
+        exact: bool = False
+    ) -> dict:
+        """Build the fingerprint by refining a coarse grid where it changes.
+
+        The unit square is split into the cells of a grid of step
+        `initial_step` and the probes of their corners are played. A cell is
+        split into four (adding the probes of its centre and the middle of
+        its sides) when the scores of its corners differ by more than
+        `tolerance` or when the standard error of the mean score of one of
+        its corners is more than `tolerance`. Cells are refined in rounds,
+        those with the largest differences first, until no cell needs
+        refining, the cells are smaller than `min_step` or `max_probes`
+        probes have been played. The scores are then linearly interpolated
+        on a uniform grid of the smallest cell size, which is used by `plot`.
+
+        Parameters
+        ----------
+        turns : int, optional
+            The number of turns per match
+        repetitions : int, optional
+            The number of times each match is repeated
+        initial_step : float, optional
+            The separation between the points of the initial grid. 1 /
+            initial_step must be an integer.
+        min_step : float, optional
+            The smallest separation between points: cells are halved until
+            their side is at most min_step.
+        tolerance : float, optional
+            The difference in scores (or standard error) above which a cell is
+            refined
+        max_probes : int, optional
+            The largest number of probes to play. If None there is no limit.
+        processes : int, optional
+            The number of processes to be used for parallel processing
+        progress_bar : bool
+            Whether or not to create a progress bar which will be updated
+        exact : bool, optional
+            If True and both the strategy and the probe can be analysed by
+            `create_machine`, the scores of the probes are computed exactly
+            (see `fingerprint`).
+
+        Returns
+        ----------
+        self.data : dict
+            A dictionary where the keys are the coordinates (x, y) of the
+            uniform grid and the values are the interpolated mean scores.
+            The scores of the probes that were played are in
+            self.sampled_data.
+        """
+        size = int(round(1 / initial_step))
+        if not np.isclose(size * initial_step, 1):
+            raise ValueError("1 / initial_step must be an integer.")
+        levels = max(int(np.ceil(np.log2(initial_step / min_step))), 0)
+        finest = size * 2 ** levels
+        grid = np.linspace(0, 1, finest + 1)
+
+        machines = None
+        self.exact = False
+        if exact:
+            machines = (create_machine(self.strategy),
+                        create_machine(self.probe))
+            if None in machines:
+                machines = None
+            else:
+                self.exact = True
+
+        # Points are indexed by integer coordinates on the finest grid
+        means = {}  # type: Dict[tuple, float]
+        errors = {}  # type: Dict[tuple, float]
+
+        def sample(indices):
+            points = [Point(grid[i], grid[j]) for i, j in indices]
+            point_means, point_variances = self._sample(
+                points, turns, repetitions, processes, progress_bar,
+                machines)
+            for index, mean, variance in zip(indices, point_means,
+                                             point_variances):
+                means[index] = mean
+                errors[index] = np.sqrt(variance / repetitions)
+
+        def corners(cell):
+            i, j, side = cell
+            return [(i, j), (i + side, j), (i, j + side), (i + side, j + side)]
+
+        def priority(cell):
+            cell_means = [means[corner] for corner in corners(cell)]
+            return max(max(cell_means) - min(cell_means),
+                       max(errors[corner] for corner in corners(cell)))
+
+        def children(cell):
+            i, j, side = cell
+            half = side // 2
+            return [(i, j, half), (i + half, j, half),
+                    (i, j + half, half), (i + half, j + half, half)]
+
+        side = 2 ** levels
+        cells = [(i * side, j * side, side)
+                 for i in range(size) for j in range(size)]
+        sample(sorted(set(corner for cell in cells
+                          for corner in corners(cell))))
+
+        budget_reached = False
+        while cells and not budget_reached:
+            candidates = sorted(
+                (cell for cell in cells
+                 if cell[2] > 1 and priority(cell) > tolerance),
+                key=priority, reverse=True)
+            new_points = []  # type: List[tuple]
+            cells = []
+            for cell in candidates:
+                points = sorted(set(
+                    corner for child in children(cell)
+                    for corner in corners(child)
+                    if corner not in means) - set(new_points))
+                if (max_probes is not None and
+                        len(means) + len(new_points) + len(points) >
+                        max_probes):
+                    budget_reached = True
+                    break
+                new_points.extend(points)
+                cells.extend(children(cell))
+            if new_points:
+                sample(new_points)
+
+        indices = sorted(means)
+        self.sampled_data = {Point(grid[i], grid[j]): means[(i, j)]
+                             for i, j in indices}
+        self.step = 1 / finest
+        self.points = [Point(x, y) for x in grid for y in grid]
+        values = griddata(np.array(indices, dtype=float) / finest,
+                          [means[index] for index in indices],
+                          np.array(self.points, dtype=float),
+                          method='linear')
+        self.data = dict(zip(self.points, values.tolist()))
+        return self.data
+
     def plot(self, cmap: str = 'seismic', interpolation: str = 'none',
              title: str = None, colorbar: bool = True,
              labels: bool = True) -> plt.Figure:
@@ -354,7 +1021,7 @@ class AshlockFingerprint(object):
         figure : matplotlib figure
             A heat plot of the results of the spatial tournament
         """
-        size = int((1 / self.step) // 1) + 1
+        size = int(round(np.sqrt(len(self.points))))
         plotting_data = reshape_data(self.data, self.points, size)
         fig, ax = plt.subplots()
         cax = ax.imshow(
@@ -380,6 +1047,325 @@ class AshlockFingerprint(object):
         return fig
 
 
+FingerprintKey = tuple
+
+
+class FingerprintStore(UserDict):
+    """A persistent store of Ashlock fingerprints.
+
+    The store is a dictionary mapping the identity of a fingerprint to its
+    data (a dictionary mapping Points to mean scores). The identity of a
+    fingerprint is given by `FingerprintStore.key`: the representation of
+    the strategy and of the probe (which include their parameters), the
+    parameters of the fingerprint and the version of the library, so that
+    fingerprints are recomputed after each release.
+
+    If a file name is given the store is read from it when it exists and
+    `save` writes it back.
+    """
+
+    def __init__(self, file_name: str = None) -> None:
+        """
+        Parameters
+        ----------
+        file_name : string
+            Path to the file of the store
+        """
+        super().__init__()
+        self.file_name = file_name
+        if file_name is not None and os.path.exists(file_name):
+            self.load(file_name)
+
+    @staticmethod
+    def key(strategy: Union[type, Player], probe: Union[type, Player],
+            step: float, turns: int, repetitions: int,
+            exact: bool = False) -> FingerprintKey:
+        """The key of the fingerprint of a strategy.
+
+        Parameters
+        ----------
+        strategy : class or instance
+            The fingerprinted strategy
+        probe : class or instance
+            The probe of the fingerprint
+        step, turns, repetitions, exact
+            The parameters of `AshlockFingerprint.fingerprint`
+
+        Returns
+        ----------
+        key : tuple
+        """
+        if not isinstance(strategy, Player):
+            strategy = strategy()
+        if not isinstance(probe, Player):
+            probe = probe()
+        return (repr(strategy), repr(probe), float(step), turns, repetitions,
+                bool(exact), axl.__version__)
+
+    def save(self, file_name: str = None) -> bool:
+        """Serialise the store to a file.
+
+        Parameters
+        ----------
+        file_name : string
+            File path to which the store should be saved, the file name of
+            the store if None
+        """
+        if file_name is None:
+            file_name = self.file_name
+        with open(file_name, 'wb') as io:
+            pickle.dump(self.data, io)
+        return True
+
+    def load(self, file_name: str) -> bool:
+        """Load a previously saved store.
+
+        Parameters
+        ----------
+        file_name : string
+            Path to a previously saved store
+        """
+        with open(file_name, 'rb') as io:
+            data = pickle.load(io)
+
+        if isinstance(data, dict):
+            self.data = data
+        else:
+            raise ValueError(
+                "Store file exists but is not the correct format. "
+                "Try deleting and re-building the store file.")
+        return True
+
+
+def fingerprint_strategies(
+    strategies: List[Union[type, Player]],
+    probe: Union[type, Player] = axl.TitForTat, turns: int = 50,
+    repetitions: int = 10, step: float = 0.01, processes: int = None,
+    progress_bar: bool = True, exact: bool = False,
+    store: FingerprintStore = None
+) -> List[dict]:
+    """Computes the Ashlock fingerprints of a list of strategies in one run.
+
+    The probes are created once and the matches of all the strategies that
+    are not in the store are played by a single spatial tournament, sharing
+    its worker processes. Strategies that can be analysed exactly are not
+    played if `exact` is True (see `AshlockFingerprint.fingerprint`). The
+    new fingerprints are added to the store, which is saved if it has a file
+    name.
+
+    Parameters
+    ----------
+    strategies : list
+        A list of classes descended from axelrod.Player or instances of
+        axelrod.Player
+    probe : class or instance
+        The probe of the fingerprints
+        Default: Tit For Tat
+    turns : int, optional
+        The number of turns per match
+    repetitions : int, optional
+        The number of times each match is repeated
+    step : float, optional
+        The separation between each Point
+    processes : int, optional
+        The number of processes to be used for parallel processing
+    progress_bar : bool
+        Whether or not to create a progress bar which will be updated
+    exact : bool, optional
+        Whether to compute the fingerprints exactly when possible
+    store : FingerprintStore, optional
+        The store of previously computed fingerprints
+
+    Returns
+    ----------
+    data : list
+        The fingerprint of each strategy: a dictionary where the keys are
+        coordinates of the form (x, y) and the values are the mean scores.
+    """
+    if store is None:
+        store = FingerprintStore()
+    keys = [FingerprintStore.key(strategy, probe, step, turns, repetitions,
+                                 exact) for strategy in strategies]
+    missing = [index for index, key in enumerate(keys) if key not in store]
+
+    if missing:
+        points = create_points(step, progress_bar=False)
+        probe_machine = create_machine(probe) if exact else None
+        played = []
+        for index in missing:
+            machine = None
+            if probe_machine is not None:
+                machine = create_machine(strategies[index])
+            if machine is None:
+                played.append(index)
+            else:
+                store[keys[index]] = exact_data(machine, probe_machine,
+                                                points, turns)
+
+        if played:
+            players = [strategy if isinstance(strategy, Player)
+                       else strategy()
+                       for strategy in (strategies[index]
+                                        for index in played)]
+            players += create_probes(probe, points, progress_bar=progress_bar)
+            edges = [(player_index, len(played) + point_index)
+                     for player_index in range(len(played))
+                     for point_index in range(len(points))]
+            tournament = axl.Tournament(players, turns=turns,
+                                        repetitions=repetitions, edges=edges)
+            means, _ = stream_scores(tournament, edges, processes=processes,
+                                     progress_bar=progress_bar)
+            means = means.reshape(len(played), len(points))
+            for index, scores in zip(played, means):
+                store[keys[index]] = dict(zip(points, scores.tolist()))
+
+        if store.file_name is not None:
+            store.save()
+
+    return [store[key] for key in keys]
+
+
+def _fingerprint_vector(data: Union[dict, np.ndarray]) -> np.ndarray:
+    """The data of a fingerprint as a vector: the scores of an Ashlock
+    fingerprint ordered by point or the flattened array of a transitive
+    fingerprint."""
+    if isinstance(data, dict):
+        return np.array([data[point] for point in sorted(data)], dtype=float)
+    return np.asarray(data, dtype=float).ravel()
+
+
+class FingerprintIndex(object):
+    """An index of fingerprints to find the strategies that behave most like
+    a given one.
+
+    The fingerprints (all computed with the same parameters) are flattened
+    and projected on their principal components so that queries are
+    vectorised distance computations in a space of a few dimensions.
+    Distances are root mean square differences between the fingerprints
+    (for Ashlock fingerprints, a difference in score per turn), measured in
+    the reduced space.
+    """
+
+    def __init__(self, fingerprints: Dict[str, Union[dict, np.ndarray]],
+                 dimensions: int = 10) -> None:
+        """
+        Parameters
+        ----------
+        fingerprints : dict
+            Mapping names of strategies to the data of their fingerprints
+            (`AshlockFingerprint.data` or `TransitiveFingerprint.data`)
+        dimensions : int, optional
+            The number of principal components kept. It is reduced to the
+            rank of the fingerprints if larger.
+        """
+        self.names = list(fingerprints)
+        vectors = [_fingerprint_vector(data)
+                   for data in fingerprints.values()]
+        if len(set(len(vector) for vector in vectors)) > 1:
+            raise ValueError(
+                "The fingerprints must all have the same number of values.")
+        vectors = np.array(vectors)
+        self.size = vectors.shape[1]
+        self.mean = vectors.mean(axis=0)
+        _, singular_values, components = np.linalg.svd(
+            vectors - self.mean, full_matrices=False)
+        largest = singular_values.max() if singular_values.size else 0
+        rank = int((singular_values > 1e-10 * max(largest, 1)).sum())
+        self.components = components[:max(min(dimensions, rank), 1)]
+        self.coordinates = self.project(vectors)
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """The coordinates of flattened fingerprints in the reduced space,
+        scaled so that distances are root mean square differences."""
+        return np.matmul(vectors - self.mean, self.components.T) / np.sqrt(
+            self.size)
+
+    def query(self, fingerprints: List[Union[dict, np.ndarray]],
+              k: int = 5) -> List[List[tuple]]:
+        """Finds the k nearest strategies to each of a list of fingerprints.
+
+        Parameters
+        ----------
+        fingerprints : list
+            The data of the fingerprints, computed with the same parameters
+            as those of the index
+        k : int, optional
+            The number of strategies returned for each fingerprint
+
+        Returns
+        ----------
+        nearest : list
+            For each fingerprint, a list of (name, distance) tuples for the
+            k nearest strategies, the nearest first.
+        """
+        vectors = np.array([_fingerprint_vector(data)
+                            for data in fingerprints]).reshape(
+                                len(fingerprints), -1)
+        if vectors.shape[1] != self.size:
+            raise ValueError(
+                "The fingerprints must have the same number of values as "
+                "those of the index.")
+        coordinates = self.project(vectors)
+        distances = np.sqrt(np.maximum(
+            (coordinates ** 2).sum(axis=1)[:, np.newaxis] -
+            2 * np.matmul(coordinates, self.coordinates.T) +
+            (self.coordinates ** 2).sum(axis=1)[np.newaxis, :], 0))
+        k = min(k, len(self.names))
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        rows = np.arange(len(vectors))[:, np.newaxis]
+        order = np.argsort(distances[rows, nearest], axis=1, kind='stable')
+        nearest = nearest[rows, order]
+        return [[(self.names[index], float(distances[row, index]))
+                 for index in indices]
+                for row, indices in enumerate(nearest)]
+
+    def nearest(self, fingerprint: Union[dict, np.ndarray],
+                k: int = 5) -> List[tuple]:
+        """Finds the k nearest strategies to a fingerprint.
+
+        Parameters
+        ----------
+        fingerprint : dict or np.array
+            The data of a fingerprint
+        k : int, optional
+            The number of strategies returned
+
+        Returns
+        ----------
+        nearest : list
+            A list of (name, distance) tuples, the nearest first.
+        """
+        return self.query([fingerprint], k=k)[0]
+
+    def clusters(self, threshold: float = 0.05) -> List[List[str]]:
+        """Groups the strategies whose fingerprints are close.
+
+        Two strategies are in the same cluster if they are linked by a chain
+        of strategies whose fingerprints are at most `threshold` apart
+        (single linkage).
+
+        Parameters
+        ----------
+        threshold : float, optional
+            The largest distance between neighbouring fingerprints of a
+            cluster
+
+        Returns
+        ----------
+        clusters : list
+            The lists of names of the strategies of each cluster, the largest
+            clusters first.
+        """
+        if len(self.names) < 2:
+            return [list(self.names)]
+        labels = fcluster(linkage(self.coordinates, method='single'),
+                          t=threshold, criterion='distance')
+        groups = {}  # type: Dict[int, List[str]]
+        for name, label in zip(self.names, labels):
+            groups.setdefault(label, []).append(name)
+        return sorted(groups.values(), key=len, reverse=True)
+
+
 class TransitiveFingerprint(object):
     def __init__(self, strategy, opponents=None, number_of_opponents=50):
         """
@@ -406,12 +1392,18 @@ class TransitiveFingerprint(object):
     def fingerprint(self, turns: int = 50, repetitions: int = 1000,
                     noise: float = None, processes: int = None,
                     filename: str = None,
-                    progress_bar: bool = True) -> np.array:
+                    progress_bar: bool = True,
+                    exact: bool = False) -> np.array:
         """Creates a spatial tournament to run the necessary matches to obtain
         fingerprint data.
 
           Creates the opponents and their edges then builds a spatial tournament.
 
+          If exact is True and the strategy and all the opponents can be
+          written as finite Markov chains (see `create_machine`), the
+          probability of cooperating in each turn is computed directly and no
+          matches are played.
+
         Parameters
         ----------
         turns : int, optional
@@ -424,9 +1416,14 @@ class TransitiveFingerprint(object):
             The number of processes to be used for parallel processing
         filename: str, optional
             The name of the file for spatial tournament's interactions.
-            if None, a filename will be generated.
+            If None, the interactions are not written to a file: the
+            cooperation of the strategy is accumulated as the matches are
+            played.
         progress_bar : bool
             Whether or not to create a progress bar which will be updated
+        exact : bool, optional
+            Whether to compute the cooperation probabilities exactly when
+            possible instead of playing matches
 
         Returns
         ----------
@@ -441,25 +1438,46 @@ class TransitiveFingerprint(object):
         else:
             players = [self.strategy()] + self.opponents
 
-        temp_file_descriptor = None
-        if filename is None:
-            temp_file_descriptor, filename = mkstemp()
+        self.exact = False
+        if exact:
+            machines = [create_machine(player) for player in players]
+            if all(machine is not None for machine in machines):
+                self.exact = True
+                self.data = exact_cooperation(machines[0], machines[1:],
+                                              turns, noise or 0)
+                return self.data
 
         edges = [(0, k + 1) for k in range(len(self.opponents))]
         tournament = axl.Tournament(players=players,
                                     edges=edges, turns=turns, noise=noise,
                                     repetitions=repetitions)
+        if filename is None:
+            self.data = self._stream_cooperation_ratio(
+                tournament, turns, processes, progress_bar)
+            return self.data
+
         tournament.play(filename=filename, build_results=False,
                         progress_bar=progress_bar, processes=processes)
 
         self.data = self.analyse_cooperation_ratio(filename)
-
-        if temp_file_descriptor is not None:
-            os.close(temp_file_descriptor)
-            os.remove(filename)
-
         return self.data
 
+    def _stream_cooperation_ratio(self, tournament: axl.Tournament,
+                                  turns: int, processes: int,
+                                  progress_bar: bool) -> np.ndarray:
+        """Plays the tournament and accumulates the cooperation of the
+        strategy in each turn against each opponent as the matches are
+        played."""
+        cooperations = np.zeros((len(self.opponents), turns))
+        counts = np.zeros(len(self.opponents))
+        for (_, opponent_index), interactions in tournament.stream(
+                processes=processes, progress_bar=progress_bar):
+            for interaction in interactions:
+                cooperations[opponent_index - 1] += [
+                    action == C for action, _ in interaction]
+                counts[opponent_index - 1] += 1
+        return cooperations / counts[:, np.newaxis]
+
     @staticmethod
     def analyse_cooperation_ratio(filename):
         """Generates the data used from the tournament
@@ -479,27 +1497,30 @@ class TransitiveFingerprint(object):
             opponent in each turn. The ith row corresponds to the ith opponent
             and the jth column the jth turn.
         """
-        did_c = np.vectorize(lambda actions: [int(action == 'C')
-                                              for action in actions])
-
-        cooperation_rates = {}
-        df = dd.read_csv(filename)
+        df = pd.read_csv(filename,
+                         usecols=["Player index", "Opponent index", "Actions"],
+                         dtype={"Actions": str})
         # We ignore the actions of all opponents. So we filter the dataframe to
         # only include the results of the player with index `0`.
-        df = df[df["Player index"] == 0][["Opponent index", "Actions"]]
-
-        for _, row in df.iterrows():
-            opponent_index, player_history = row["Opponent index"], row["Actions"]
-            if opponent_index in cooperation_rates:
-                cooperation_rates[opponent_index].append(did_c(player_history))
-            else:
-                cooperation_rates[opponent_index] = [did_c(player_history)]
-
-        for index, rates in cooperation_rates.items():
-            cooperation_rates[index] = np.mean(rates, axis=0)
-
-        return np.array([cooperation_rates[index]
-                         for index in sorted(cooperation_rates)])
+        df = df[df["Player index"] == 0]
+        actions = df["Actions"].values
+        turns = len(actions[0])
+
+        # Decode all the action strings at once: every match has the same
+        # number of turns so the characters form a matrix.
+        cooperations = (np.frombuffer("".join(actions).encode("ascii"),
+                                      dtype=np.uint8) == ord(C.name))
+        cooperations = cooperations.reshape(len(actions), turns)
+
+        # Average the rows of each opponent, in order of opponent index
+        opponents, inverse = np.unique(df["Opponent index"].values,
+                                       return_inverse=True)
+        order = np.argsort(inverse, kind="mergesort")
+        starts = np.searchsorted(inverse[order], np.arange(len(opponents)))
+        totals = np.add.reduceat(cooperations[order].astype(float), starts,
+                                 axis=0)
+        counts = np.bincount(inverse)
+        return totals / counts[:, np.newaxis]
 
     def plot(self, cmap: str = 'viridis', interpolation: str = 'none',
              title: str = None, colorbar: bool = True, labels: bool = True,
@@ -6,6 +6,10 @@ https://github.com/marcharper/stationary/blob/master/stationary/utils/graph.py
 """
 
 from collections import defaultdict
+import random
+
+import numpy as np
+from scipy.sparse import csr_matrix
 
 
 class Graph(object):
@@ -21,6 +25,9 @@ class Graph(object):
     For efficiency, neighbors are cached in dictionaries. Undirected graphs
     are implemented as directed graphs in which every edge (s, t) has the
     opposite edge (t, s).
+
+    The sorted outgoing vertices of each vertex and the adjacency matrix are
+    cached until an edge is added.
     """
 
     def __init__(self, edges=None, directed=False):
@@ -29,19 +36,27 @@ class Graph(object):
         self.out_mapping = defaultdict(lambda: defaultdict(float))
         self.in_mapping = defaultdict(lambda: defaultdict(float))
         self._edges = []
+        self._edge_set = set()
+        self._clear_cache()
         if edges:
             self.add_edges(edges)
 
-    def add_edge(self, source, target, weight=None):
-        if (source, target) not in self._edges:
+    def _clear_cache(self):
+        self._sorted_out_vertices = dict()
+        self._adjacency_matrix = None
+
+    def _add_directed_edge(self, source, target, weight):
+        if (source, target) not in self._edge_set:
             self._edges.append((source, target))
+            self._edge_set.add((source, target))
             self.out_mapping[source][target] = weight
             self.in_mapping[target][source] = weight
-        if not self.directed and (source != target) and \
-                (target, source) not in self._edges:
-            self._edges.append((target, source))
-            self.out_mapping[target][source] = weight
-            self.in_mapping[source][target] = weight
+
+    def add_edge(self, source, target, weight=None):
+        self._add_directed_edge(source, target, weight)
+        if not self.directed and (source != target):
+            self._add_directed_edge(target, source, weight)
+        self._clear_cache()
 
     def add_edges(self, edges):
         for edge in edges:
@@ -68,6 +83,44 @@ class Graph(object):
         """Returns a list of the outgoing vertices."""
         return list(self.out_mapping[source].keys())
 
+    def sorted_out_vertices(self, source):
+        """Returns a cached sorted list of the outgoing vertices."""
+        try:
+            return self._sorted_out_vertices[source]
+        except KeyError:
+            vertices = sorted(self.out_mapping.get(source, {}).keys())
+            self._sorted_out_vertices[source] = vertices
+            return vertices
+
+    def random_out_vertex(self, source):
+        """Returns an outgoing vertex of source chosen uniformly at random."""
+        return random.choice(self.sorted_out_vertices(source))
+
+    def adjacency_matrix(self):
+        """
+        Returns the cached adjacency matrix of the graph as a
+        `scipy.sparse.csr_matrix`, with rows and columns in the order of the
+        sorted vertices and entries the weights of the edges (1 for an
+        unweighted edge).
+        """
+        if self._adjacency_matrix is None:
+            vertices = sorted(set(self.out_mapping) | set(self.in_mapping))
+            index = {vertex: i for i, vertex in enumerate(vertices)}
+            indptr = [0]
+            indices = []
+            data = []
+            for vertex in vertices:
+                for target in self.sorted_out_vertices(vertex):
+                    weight = self.out_mapping[vertex][target]
+                    indices.append(index[target])
+                    data.append(1 if weight is None else weight)
+                indptr.append(len(indices))
+            self._adjacency_matrix = csr_matrix(
+                (np.array(data, dtype=float), np.array(indices, dtype=int),
+                 np.array(indptr, dtype=int)),
+                shape=(len(vertices), len(vertices)))
+        return self._adjacency_matrix
+
     def in_dict(self, target):
         """Returns a dictionary of the incoming edges of source with weights."""
         return self.in_mapping[target]
@@ -133,3 +186,165 @@ def complete_graph(length, loops=True):
         graph.add_loops()
 
     return graph
+
+
+def lattice(rows, columns, periodic=True):
+    """
+    Produces a square lattice in which each vertex is connected to its four
+    nearest neighbours (its von Neumann neighbourhood). The vertex in row i
+    and column j is i * columns + j.
+
+    Parameters
+    ----------
+    rows: int
+        Number of rows of the lattice
+    columns: int
+        Number of columns of the lattice
+    periodic: bool, True
+        Whether the lattice wraps around (a torus)
+    Returns
+    -------
+    a Graph object
+    """
+    graph = Graph(directed=False)
+    edges = []
+    for i in range(rows):
+        for j in range(columns):
+            vertex = i * columns + j
+            if j + 1 < columns:
+                edges.append((vertex, vertex + 1))
+            elif periodic and columns > 2:
+                edges.append((vertex, i * columns))
+            if i + 1 < rows:
+                edges.append((vertex, vertex + columns))
+            elif periodic and rows > 2:
+                edges.append((vertex, j))
+    graph.add_edges(edges)
+    return graph
+
+
+def random_regular_graph(length, degree, max_attempts=100):
+    """
+    Produces a random regular graph: each vertex is connected to `degree`
+    others chosen at random, with no loops or multiple edges.
+
+    The edges are obtained by randomly pairing the `degree` stubs of each
+    vertex, rejecting pairs that would form a loop or a multiple edge and
+    starting again if no valid pair remains.
+
+    Parameters
+    ----------
+    length: int
+        Number of vertices
+    degree: int
+        Degree of each vertex
+    max_attempts: int, 100
+        Number of times the pairing is attempted
+    Returns
+    -------
+    a Graph object
+    """
+    if (length * degree) % 2 or degree >= length:
+        raise ValueError("There is no regular graph with {} vertices of "
+                         "degree {}.".format(length, degree))
+    for _ in range(max_attempts):
+        stubs = [vertex for vertex in range(length) for _ in range(degree)]
+        edges = set()
+        while stubs:
+            random.shuffle(stubs)
+            remaining = []
+            for source, target in zip(stubs[::2], stubs[1::2]):
+                edge = (min(source, target), max(source, target))
+                if source == target or edge in edges:
+                    remaining.extend((source, target))
+                else:
+                    edges.add(edge)
+            if len(remaining) == len(stubs):
+                break
+            stubs = remaining
+        if not stubs:
+            graph = Graph(directed=False)
+            graph.add_edges(sorted(edges))
+            return graph
+    raise ValueError("Could not build a regular graph in {} attempts.".format(
+        max_attempts))
+
+
+def small_world_graph(length, neighbours, probability):
+    """
+    Produces a Watts-Strogatz small world graph: a cycle in which each vertex
+    is connected to its `neighbours` nearest vertices, with each edge
+    rewired to a random vertex with probability `probability`.
+    https://en.wikipedia.org/wiki/Watts%E2%80%93Strogatz_model
+
+    Parameters
+    ----------
+    length: int
+        Number of vertices
+    neighbours: int
+        Even number of nearest vertices each vertex is connected to
+    probability: float
+        Probability of rewiring each edge
+    Returns
+    -------
+    a Graph object
+    """
+    if neighbours % 2 or not 0 < neighbours < length:
+        raise ValueError("neighbours must be an even number between 2 and "
+                         "{}.".format(length - 1))
+    edges = set()
+    for vertex in range(length):
+        for step in range(1, neighbours // 2 + 1):
+            target = (vertex + step) % length
+            edges.add((min(vertex, target), max(vertex, target)))
+    for vertex in range(length):
+        for step in range(1, neighbours // 2 + 1):
+            target = (vertex + step) % length
+            edge = (min(vertex, target), max(vertex, target))
+            if random.random() >= probability or edge not in edges:
+                continue
+            new_target = random.randrange(length)
+            new_edge = (min(vertex, new_target), max(vertex, new_target))
+            if new_target == vertex or new_edge in edges:
+                continue
+            edges.remove(edge)
+            edges.add(new_edge)
+    graph = Graph(directed=False)
+    graph.add_edges(sorted(edges))
+    return graph
+
+
+def scale_free_graph(length, edges_per_vertex):
+    """
+    Produces a Barabasi-Albert scale free graph: vertices are added one at a
+    time and connected to `edges_per_vertex` existing vertices chosen
+    proportionally to their degree.
+    https://en.wikipedia.org/wiki/Barab%C3%A1si%E2%80%93Albert_model
+
+    Parameters
+    ----------
+    length: int
+        Number of vertices
+    edges_per_vertex: int
+        Number of edges from each new vertex
+    Returns
+    -------
+    a Graph object
+    """
+    if not 1 <= edges_per_vertex < length:
+        raise ValueError("edges_per_vertex must be between 1 and {}.".format(
+            length - 1))
+    # Start from a star so that every initial vertex has a degree
+    edges = [(0, vertex) for vertex in range(1, edges_per_vertex + 1)]
+    # Each vertex appears once for each of its edges
+    degrees = [vertex for edge in edges for vertex in edge]
+    for vertex in range(edges_per_vertex + 1, length):
+        targets = set()
+        while len(targets) < edges_per_vertex:
+            targets.add(random.choice(degrees))
+        for target in sorted(targets):
+            edges.append((target, vertex))
+            degrees.extend((target, vertex))
+    graph = Graph(directed=False)
+    graph.add_edges(edges)
+    return graph
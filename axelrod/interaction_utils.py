@@ -9,15 +9,21 @@ interactions.
 """
 from collections import Counter, defaultdict
 import csv
+import os
 import tqdm
+import numpy as np
 import pandas as pd
 
-from axelrod.action import Action, str_to_actions
+from axelrod.action import Action
 from .game import Game
 
 
 C, D = Action.C, Action.D
 
+# The four states indexed by 2 * (player action is D) + (opponent action is D)
+STATES = np.empty(4, dtype=object)  # type: np.ndarray
+STATES[:] = [(C, C), (C, D), (D, C), (D, D)]
+
 
 def compute_scores(interactions, game=None):
     """Returns the scores of a given set of interactions."""
@@ -240,25 +246,199 @@ def compute_sparklines(interactions, c_symbol='█', d_symbol=' '):
         sparkline(histories[1], c_symbol, d_symbol))
 
 
+def decode_states(player_actions, opponent_actions):
+    """
+    Decodes two equal length strings of actions to an array of states.
+
+    The strings are decoded in bulk: each character is compared to 'D' in a
+    single numpy operation.
+    """
+    player_defections = np.frombuffer(
+        player_actions.encode("ascii"), dtype=np.uint8) == ord(D.name)
+    opponent_defections = np.frombuffer(
+        opponent_actions.encode("ascii"), dtype=np.uint8) == ord(D.name)
+    return STATES[2 * player_defections + opponent_defections]
+
+
 def read_interactions_from_file(filename, progress_bar=True):
     """
     Reads a file and returns a dictionary mapping tuples of player pairs to
     lists of interactions
     """
-    df = pd.read_csv(filename)[["Interaction index", "Player index",
-                                "Opponent index", "Actions"]]
-    groupby = df.groupby("Interaction index")
+    df = pd.read_csv(filename,
+                     usecols=["Interaction index", "Player index",
+                              "Opponent index", "Actions"],
+                     dtype={"Actions": str})
+    df = df.sort_values("Interaction index", kind="mergesort")
+    # The first row of each interaction gives the pair of players and the
+    # second row the actions of the opponent.
+    _, first_rows = np.unique(df["Interaction index"].values,
+                              return_index=True)
+    keys = df[["Player index", "Opponent index"]].values[first_rows].tolist()
+    actions = df["Actions"].values
+    player_actions = actions[first_rows]
+    opponent_actions = actions[first_rows + 1]
+
+    lengths = np.fromiter(map(len, player_actions), dtype=int,
+                          count=len(player_actions))
+    states = decode_states("".join(player_actions),
+                           "".join(opponent_actions))
+    interactions = np.split(states, np.cumsum(lengths)[:-1])
+
+    pairs = zip(keys, interactions)
     if progress_bar:
-        groupby = tqdm.tqdm(groupby)
+        pairs = tqdm.tqdm(pairs, total=len(keys))
 
     pairs_to_interactions = defaultdict(list)
-    for _, d in tqdm.tqdm(groupby):
-        key = tuple(d[["Player index", "Opponent index"]].iloc[0])
-        value = list(map(str_to_actions, zip(*d["Actions"])))
-        pairs_to_interactions[key].append(value)
+    for key, interaction in pairs:
+        pairs_to_interactions[tuple(key)].append(interaction.tolist())
     return pairs_to_interactions
 
 
+# The version of the format of the index written by build_interactions_index
+INDEX_VERSION = 1
+
+
+def index_filename_for(filename):
+    """Returns the default filename of the index of an interactions file."""
+    return filename + ".index.npy"
+
+
+def build_interactions_index(filename, index_filename=None):
+    """
+    Builds an index of an interactions file and saves it to disk.
+
+    The file is read a line at a time so that it is never held in memory. The
+    index is an integer array with a row for each row of the file:
+
+        [Interaction index, Player index, Opponent index, Offset, Length]
+
+    where the offset and length are in bytes. The rows are sorted by player
+    index, opponent index and interaction index (and otherwise kept in the
+    order of the file) so that the rows of a pair of players can be found by
+    binary search.
+
+    The saved array starts with a header row [-1, INDEX_VERSION, 0, 0, 0] so
+    that indices written in another format (such as unsorted indices written
+    by earlier versions) are rebuilt rather than reused.
+
+    Parameters
+    ----------
+    filename : str
+        The interactions file written by a tournament.
+    index_filename : str
+        Where to save the index, by default the interactions filename with
+        `.index.npy` appended.
+
+    Returns
+    -------
+    str
+        The filename of the index.
+    """
+    if index_filename is None:
+        index_filename = index_filename_for(filename)
+
+    rows = []
+    with open(filename, "rb") as interactions_file:
+        offset = len(interactions_file.readline())
+        for line in interactions_file:
+            interaction, player, opponent = line.split(b",", 3)[:3]
+            rows.append((int(interaction), int(player), int(opponent), offset,
+                         len(line)))
+            offset += len(line)
+
+    index = np.array(rows, dtype=np.int64).reshape(-1, 5)
+    index = index[np.lexsort((index[:, 0], index[:, 2], index[:, 1]))]
+    header = np.array([[-1, INDEX_VERSION, 0, 0, 0]], dtype=np.int64)
+    with open(index_filename, "wb") as index_file:
+        np.save(index_file, np.concatenate([header, index]))
+    return index_filename
+
+
+def read_interactions_index(filename, index_filename=None):
+    """
+    Returns the index of an interactions file (without its header row),
+    building it if it does not exist, is older than the file or was written in
+    another format.
+
+    The index is memory mapped rather than read in to memory.
+    """
+    if index_filename is None:
+        index_filename = index_filename_for(filename)
+    if (not os.path.exists(index_filename) or
+            os.path.getmtime(index_filename) < os.path.getmtime(filename) or
+            not _is_current_index(np.load(index_filename, mmap_mode="r"))):
+        build_interactions_index(filename, index_filename)
+    return np.load(index_filename, mmap_mode="r")[1:]
+
+
+def _is_current_index(index):
+    """Whether an index was written in the current format."""
+    return (index.ndim == 2 and index.shape[1] == 5 and len(index) > 0 and
+            index[0, 0] == -1 and index[0, 1] == INDEX_VERSION)
+
+
+def read_pair_interactions(filename, player_index, opponent_index,
+                           index_filename=None):
+    """
+    Reads the interactions between a given pair of players from a file
+    without reading the rest of the file.
+
+    Parameters
+    ----------
+    filename : str
+        The interactions file written by a tournament.
+    player_index : int
+    opponent_index : int
+        The indices of the pair of players, in the same order as the keys
+        returned by `read_interactions_from_file`.
+    index_filename : str
+        The index of the file as written by `build_interactions_index`. It is
+        built if it does not exist.
+
+    Returns
+    -------
+    list
+        A list of interactions, one for each repetition.
+    """
+    index = read_interactions_index(filename, index_filename)
+    player_rows = _pair_rows(index, player_index, opponent_index)
+    if player_index == opponent_index:
+        # Both rows of an interaction of a player with itself have the same
+        # key and are in the order of the file.
+        player_rows, opponent_rows = player_rows[0::2], player_rows[1::2]
+    else:
+        opponent_rows = _pair_rows(index, opponent_index, player_index)
+        # Only keep the interactions written with the player first
+        first = player_rows[:, 3] < opponent_rows[:, 3]
+        player_rows, opponent_rows = player_rows[first], opponent_rows[first]
+
+    interactions = []
+    with open(filename, "rb") as interactions_file:
+        header = next(csv.reader([interactions_file.readline().decode()]))
+        actions_column = header.index("Actions")
+        for rows in zip(player_rows, opponent_rows):
+            actions = []
+            for offset, length in (row[3:] for row in rows):
+                interactions_file.seek(offset)
+                line = interactions_file.read(length).decode()
+                actions.append(next(csv.reader([line]))[actions_column])
+            interactions.append(decode_states(*actions).tolist())
+    return interactions
+
+
+def _pair_rows(index, player_index, opponent_index):
+    """
+    Returns the rows of an index (as built by `build_interactions_index`)
+    with the given player and opponent indices.
+    """
+    start, end = np.searchsorted(index[:, 1], [player_index, player_index + 1])
+    offsets = np.searchsorted(index[start:end, 2],
+                              [opponent_index, opponent_index + 1])
+    start, end = start + offsets
+    return index[start:end]
+
+
 def string_to_interactions(string):
     """
     Converts a compact string representation of an interaction to an
@@ -1,18 +1,34 @@
 """Implementation of the Moran process on Graphs."""
 
-from collections import Counter
+from collections import Counter, defaultdict, namedtuple
+import csv
+from itertools import combinations
+from multiprocessing import Pool, cpu_count
+import os
 import random
+from tempfile import mkstemp
 
 import matplotlib.pyplot as plt
 import numpy as np
+from scipy.sparse import csr_matrix, identity
+from scipy.sparse.linalg import spsolve
+from scipy.special import logsumexp
+from scipy.stats import norm
 
 from axelrod import DEFAULT_TURNS, Player, Game
 from .deterministic_cache import DeterministicCache
 from .graph import complete_graph, Graph
-from .match import Match
-from .random_ import randrange
+from .player import type_registry
+from .match import Match, is_stochastic
+from .moran_history import RECORDS, PopulationHistory, new_history
+from .random_ import randrange, Pdf
+from .tournament import Tournament
+import axelrod.interaction_utils as iu
 
-from typing import List, Tuple, Set
+from typing import Dict, Iterator, List, Tuple, Set
+
+FixationEstimate = namedtuple(
+    'FixationEstimate', 'probabilities mean_times intervals trials')
 
 
 def fitness_proportionate_selection(scores: List) -> int:
@@ -44,7 +60,9 @@ class MoranProcess(object):
                  deterministic_cache: DeterministicCache = None,
                  mutation_rate: float = 0., mode: str = 'bd',
                  interaction_graph: Graph = None,
-                 reproduction_graph: Graph = None) -> None:
+                 reproduction_graph: Graph = None, record: str = "all",
+                 record_size: int = None,
+                 record_filename: str = None) -> None:
         """
         An agent based Moran process class. In each round, each player plays a
         Match with each other player. Players are assigned a fitness score by
@@ -92,16 +110,31 @@ class MoranProcess(object):
         reproduction_graph: Axelrod.graph.Graph
             The reproduction graph, set equal to the interaction graph if not
             given
+        record:
+            How the populations and scores of each step are kept: "all" keeps
+            lists of every population and list of scores, "every" keeps every
+            `record_size`-th step, "ring" keeps the last `record_size` steps
+            and "file" writes every step to a file. Except with "all",
+            populations are stored as counts over `type_names` (see
+            axelrod.moran_history).
+        record_size:
+            The number of steps between kept steps ("every") or the number of
+            kept steps ("ring")
+        record_filename:
+            With "file", the prefix of the files the populations and scores
+            are written to. Temporary files are used if not given.
         """
         self.turns = turns
         self.prob_end = prob_end
         self.game = game
         self.noise = noise
         self.initial_players = players  # save initial population
+        self.type_names = sorted(set(str(player) for player in players))
+        self._set_record(record, record_size, record_filename)
         self.players = []  # type: List
         self.populations = []  # type: List
         self.set_players()
-        self.score_history = []  # type: List
+        self.score_history = self._new_score_history(len(players))
         self.winning_strategy_name = None  # type: str
         self.mutation_rate = mutation_rate
         assert (mutation_rate >= 0) and (mutation_rate <= 1)
@@ -125,6 +158,9 @@ class MoranProcess(object):
         for key in sorted(keys):
             mutation_targets[key] = [v for (k, v) in sorted(d.items()) if k != key]
         self.mutation_targets = mutation_targets
+        # The same targets keyed by the type ID of the players
+        self._mutation_targets_by_id = {
+            p.type_id: mutation_targets[str(p)] for p in players}
 
         if interaction_graph is None:
             interaction_graph = complete_graph(len(players), loops=False)
@@ -142,6 +178,18 @@ class MoranProcess(object):
         self.locations = sorted(interaction_graph.vertices())
         self.index = dict(zip(sorted(interaction_graph.vertices()),
                               range(len(players))))
+        # The birth death matchups, computed on the first round
+        self._global_indices = None  # type: Set
+
+        # Per turn scores of the deterministic matches, keyed by the pair of
+        # player types, so that each such match is only played once
+        self.payoffs = dict()  # type: Dict
+        # With no mutation to a stochastic type every match is deterministic
+        # and the scores of the matches of the last round can be kept: after
+        # a replacement only the matches of the replaced player change.
+        self._deterministic = (prob_end is None and
+                               not is_stochastic(players, noise))
+        self._reset_scores()
 
     def set_players(self) -> None:
         """Copy the initial players into the first population."""
@@ -149,7 +197,38 @@ class MoranProcess(object):
         for player in self.initial_players:
             player.reset()
             self.players.append(player)
-        self.populations = [self.population_distribution()]
+        self.populations = self._new_populations()
+        self.populations.append(self.population_distribution())
+
+    def _set_record(self, record: str, record_size: int = None,
+                    record_filename: str = None) -> None:
+        """Set how the populations and scores are kept."""
+        if record not in RECORDS:
+            raise ValueError("Unknown record: {}".format(record))
+        self.record = record
+        self.record_size = record_size
+        self.record_filename = record_filename
+
+    def _record_filename(self, suffix: str) -> str:
+        if self.record_filename is None:
+            return None
+        return self.record_filename + suffix
+
+    def _new_populations(self):
+        """Returns an empty record of the populations."""
+        if self.record == "all":
+            return []
+        return PopulationHistory(self.type_names, new_history(
+            self.record, len(self.type_names), dtype=np.int64,
+            size=self.record_size,
+            filename=self._record_filename(".populations")))
+
+    def _new_score_history(self, width: int):
+        """Returns an empty record of the scores of each player."""
+        if self.record == "all":
+            return []
+        return new_history(self.record, width, size=self.record_size,
+                           filename=self._record_filename(".scores"))
 
     def mutate(self, index: int) -> Player:
         """Mutate the player at index.
@@ -162,9 +241,9 @@ class MoranProcess(object):
         # Choose another strategy at random from the initial population
         r = random.random()
         if r < self.mutation_rate:
-            s = str(self.players[index])
-            j = randrange(0, len(self.mutation_targets[s]))
-            p = self.mutation_targets[s][j]
+            targets = self._mutation_targets_by_id[
+                self.players[index].type_id]
+            p = targets[randrange(0, len(targets))]
             new_player = p.clone()
         else:
             # Just clone the player
@@ -192,8 +271,8 @@ class MoranProcess(object):
         else:
             # Select locally
             # index is not None in this case
-            vertex = random.choice(sorted(
-                self.reproduction_graph.out_vertices(self.locations[index])))
+            vertex = self.reproduction_graph.random_out_vertex(
+                self.locations[index])
             i = self.index[vertex]
         return i
 
@@ -230,10 +309,10 @@ class MoranProcess(object):
         """
         if self.mutation_rate > 0:
             return False
-        classes = set(str(p) for p in self.players)
-        if len(classes) == 1:
+        type_id = self.players[0].type_id
+        if all(p.type_id == type_id for p in self.players):
             # Set the winning strategy name variable
-            self.winning_strategy_name = str(self.players[0])
+            self.winning_strategy_name = type_registry.name(type_id)
             return True
         return False
 
@@ -270,6 +349,9 @@ class MoranProcess(object):
         else:
             new_player = self.players[j].clone()
         # Replace player i with clone of player j
+        if (self.players[i] is None or
+                self.players[i].type_id != new_player.type_id):
+            self._replaced.add(i)
         self.players[i] = new_player
         self.populations.append(self.population_distribution())
         # Check again for fixation
@@ -286,18 +368,28 @@ class MoranProcess(object):
             A set of 2 tuples of matchup pairs: the collection of all players
             who play each other.
         """
-        indices = set()  # type: Set
         # For death-birth we only want the neighbors of the dead node
         # The other calculations are unnecessary
         if self.mode == "db":
             source = self.index[self.dead]
             self.dead = None
-            sources = sorted(self.interaction_graph.out_vertices(source))
+            sources = self.interaction_graph.sorted_out_vertices(source)
         else:
-            # birth-death is global
-            sources = sorted(self.locations)
+            # birth-death is global and every player is present, so the
+            # matchups only depend on the interaction graph
+            if self._global_indices is None:
+                self._global_indices = self._source_indices(self.locations)
+            return self._global_indices
+        return self._source_indices(sources)
+
+    def _source_indices(self, sources: List) -> Set[Tuple[int, int]]:
+        """
+        Returns the matchup pairs of the players at the given vertices of the
+        interaction graph with their neighbors.
+        """
+        indices = set()  # type: Set
         for i, source in enumerate(sources):
-            for target in sorted(self.interaction_graph.out_vertices(source)):
+            for target in self.interaction_graph.sorted_out_vertices(source):
                 j = self.index[target]
                 if (self.players[i] is None) or (self.players[j] is None):
                     continue
@@ -307,29 +399,89 @@ class MoranProcess(object):
                 indices.add((i, j))
         return indices
 
+    def _reset_scores(self) -> None:
+        """Discard the scores of the matches of the last round."""
+        self._pair_scores = None  # type: Dict
+        self._pairs_of = defaultdict(list)  # type: Dict
+        self._scores = None  # type: List
+        self._replaced = set()  # type: Set
+
+    def _match_scores(self, i: int, j: int) -> Tuple:
+        """
+        Returns the per turn scores of the match between players i and j,
+        playing it only if it is stochastic or its pair of types has not been
+        seen before.
+        """
+        player1 = self.players[i]
+        player2 = self.players[j]
+        deterministic = (self.prob_end is None and
+                         not is_stochastic((player1, player2), self.noise))
+        key = (type_registry.name(player1.type_id),
+               type_registry.name(player2.type_id))
+        if deterministic and key in self.payoffs:
+            return self.payoffs[key]
+        match = Match((player1, player2),
+                      turns=self.turns, prob_end=self.prob_end,
+                      noise=self.noise,
+                      game=self.game,
+                      deterministic_cache=self.deterministic_cache)
+        match.play()
+        match_scores = match.final_score_per_turn()
+        if deterministic:
+            self.payoffs[key] = match_scores
+        return match_scores
+
+    def _update_scores(self) -> List:
+        """
+        Returns the scores of a birth death round of deterministic matches,
+        replaying only the matches of the players replaced since the last
+        round.
+        """
+        if self._pair_scores is None:
+            self._pair_scores = dict()
+            self._scores = [0] * len(self.players)
+            for i, j in self._matchup_indices():
+                match_scores = self._match_scores(i, j)
+                self._pair_scores[(i, j)] = match_scores
+                self._scores[i] += match_scores[0]
+                self._scores[j] += match_scores[1]
+                self._pairs_of[i].append((i, j))
+                if i != j:
+                    self._pairs_of[j].append((i, j))
+        else:
+            pairs = set(pair for index in self._replaced
+                        for pair in self._pairs_of[index])
+            for i, j in pairs:
+                old_scores = self._pair_scores[(i, j)]
+                match_scores = self._match_scores(i, j)
+                self._pair_scores[(i, j)] = match_scores
+                self._scores[i] += match_scores[0] - old_scores[0]
+                self._scores[j] += match_scores[1] - old_scores[1]
+        self._replaced = set()
+        return list(self._scores)
+
     def score_all(self) -> List:
         """Plays the next round of the process. Every player is paired up
         against every other player and the total scores are recorded.
 
+        The scores of deterministic matches are reused for every pair of
+        players of the same types and, in the birth death case, only the
+        matches of the players replaced since the last round are replayed.
+
         Returns
         -------
         scores:
             List of scores for each player
         """
-        N = len(self.players)
-        scores = [0] * N
-        for i, j in self._matchup_indices():
-            player1 = self.players[i]
-            player2 = self.players[j]
-            match = Match((player1, player2),
-                          turns=self.turns, prob_end=self.prob_end,
-                          noise=self.noise,
-                          game=self.game,
-                          deterministic_cache=self.deterministic_cache)
-            match.play()
-            match_scores = match.final_score_per_turn()
-            scores[i] += match_scores[0]
-            scores[j] += match_scores[1]
+        if self.mode == "bd" and self._deterministic:
+            scores = self._update_scores()
+        else:
+            N = len(self.players)
+            scores = [0] * N
+            for i, j in self._matchup_indices():
+                match_scores = self._match_scores(i, j)
+                scores[i] += match_scores[0]
+                scores[j] += match_scores[1]
         self.score_history.append(scores)
         return scores
 
@@ -341,9 +493,9 @@ class MoranProcess(object):
         counter:
             The counts of each strategy in the population of the last iteration
         """
-        player_names = [str(player) for player in self.players]
-        counter = Counter(player_names)
-        return counter
+        counter = Counter(player.type_id for player in self.players)
+        return Counter({type_registry.name(type_id): count
+                        for type_id, count in counter.items()})
 
     def __iter__(self) -> object:
         """
@@ -356,7 +508,8 @@ class MoranProcess(object):
     def reset(self) -> None:
         """Reset the process to replay."""
         self.winning_strategy_name = None
-        self.score_history = []
+        self.score_history = self._new_score_history(len(self.players))
+        self._reset_scores()
         # Reset all the players
         self.set_players()
 
@@ -387,6 +540,8 @@ class MoranProcess(object):
         -------
             The length of the Moran process: the number of populations
         """
+        if isinstance(self.populations, PopulationHistory):
+            return self.populations.total
         return len(self.populations)
 
     def populations_plot(self, ax=None):
@@ -405,7 +560,6 @@ class MoranProcess(object):
         A matplotlib axis object
 
         """
-        player_names = self.populations[0].keys()
         if ax is None:
             _, ax = plt.subplots()
         else:
@@ -413,11 +567,20 @@ class MoranProcess(object):
 
         plot_data = []
         labels = []
-        for name in player_names:
-            labels.append(name)
-            values = [counter[name] for counter in self.populations]
-            plot_data.append(values)
-            domain = range(len(values))
+        if isinstance(self.populations, PopulationHistory):
+            counts = self.populations.counts()
+            domain = self.populations.steps()
+            for name, values in zip(self.populations.names, counts.T):
+                if values.any():
+                    labels.append(name)
+                    plot_data.append(values)
+        else:
+            player_names = self.populations[0].keys()
+            for name in player_names:
+                labels.append(name)
+                values = [counter[name] for counter in self.populations]
+                plot_data.append(values)
+                domain = range(len(values))
 
         ax.stackplot(domain, plot_data, labels=labels)
         ax.set_title("Moran Process Population by Iteration")
@@ -436,7 +599,9 @@ class ApproximateMoranProcess(MoranProcess):
     from a dictionary of player tuples to distribution of match outcomes
     """
     def __init__(self, players: List[Player], cached_outcomes: dict,
-                 mutation_rate: float = 0) -> None:
+                 mutation_rate: float = 0, record: str = "all",
+                 record_size: int = None,
+                 record_filename: str = None) -> None:
         """
         Parameters
         ----------
@@ -446,32 +611,120 @@ class ApproximateMoranProcess(MoranProcess):
         mutation_rate:
             The rate of mutation. Replicating players are mutated with
             probability `mutation_rate`
+        record:
+            How the populations and scores are kept (see MoranProcess)
+        record_size:
+            The number of steps between kept steps or of kept steps
+        record_filename:
+            The prefix of the files the populations and scores are written to
         """
         super(ApproximateMoranProcess, self).__init__(
             players, turns=0, noise=0, deterministic_cache=None,
-            mutation_rate=mutation_rate)
+            mutation_rate=mutation_rate, record=record,
+            record_size=record_size, record_filename=record_filename)
         self.cached_outcomes = cached_outcomes
+        self.type_index = {name: i for i, name in
+                           enumerate(self.type_names)}
+        # The index of each type keyed by the type ID of the players
+        self._type_id_index = {player.type_id: self.type_index[str(player)]
+                               for player in players}
+        self._build_outcome_tables()
+        # Every player is paired up against every other player
+        self._pairs = np.triu_indices(len(players), 1)
+
+    def _build_outcome_tables(self) -> None:
+        """
+        Concatenates the alias tables and outcomes of the cached
+        distributions, indexed by the integer pair of types of the players.
+        """
+        size = len(self.type_names)
+        # The distribution of the outcomes of each pair of types, -1 if the
+        # pair is not in the cache
+        self._pair_pdf = np.full(
+            (size, size), -1, dtype=int)  # type: np.ndarray
+        # Whether the outcomes of each pair are stored in opposite order
+        self._pair_swapped = np.zeros(
+            (size, size), dtype=bool)  # type: np.ndarray
+        pdfs = []  # type: List
+        for i, name1 in enumerate(self.type_names):
+            for j, name2 in enumerate(self.type_names):
+                if (name1, name2) in self.cached_outcomes:
+                    pdf = self.cached_outcomes[(name1, name2)]
+                elif (name2, name1) in self.cached_outcomes:
+                    pdf = self.cached_outcomes[(name2, name1)]
+                    self._pair_swapped[i, j] = True
+                else:
+                    continue
+                if pdf not in pdfs:
+                    pdfs.append(pdf)
+                self._pair_pdf[i, j] = pdfs.index(pdf)
+        self._pdf_offsets = np.cumsum([0] + [pdf.size for pdf in pdfs])
+        self._pdf_sizes = np.array([pdf.size for pdf in pdfs], dtype=int)
+        self._alias_probability = np.concatenate(
+            [pdf.alias_probability for pdf in pdfs] + [np.zeros(0)])
+        self._alias = np.concatenate(
+            [pdf.alias + offset for pdf, offset
+             in zip(pdfs, self._pdf_offsets)] + [np.zeros(0, dtype=int)])
+        outcomes = [outcome for pdf in pdfs for outcome in pdf.sample_space]
+        self._outcomes = np.array(outcomes, dtype=float).reshape(-1, 2)
+
+    def _reset_scores(self) -> None:
+        """Discard the types of the players of the last round."""
+        super(ApproximateMoranProcess, self)._reset_scores()
+        self._player_types = None  # type: np.ndarray
+
+    def _update_player_types(self) -> np.ndarray:
+        """
+        Returns the integer type of each player, only looking up the players
+        replaced since the last round.
+        """
+        if self._player_types is None:
+            self._player_types = np.array(
+                [self._type_id_index[player.type_id]
+                 for player in self.players], dtype=int)
+        else:
+            for index in self._replaced:
+                self._player_types[index] = self._type_id_index[
+                    self.players[index].type_id]
+        self._replaced = set()
+        return self._player_types
 
     def score_all(self) -> List:
         """Plays the next round of the process. Every player is paired up
         against every other player and the total scores are obtained from the
         cached outcomes.
 
+        The outcomes of all the pairs are sampled at once from the alias
+        tables of the cached distributions.
+
         Returns
         -------
         scores:
             List of scores for each player
         """
         N = len(self.players)
-        scores = [0] * N
-        for i in range(N):
-            for j in range(i + 1, N):
-                player_names = tuple([str(self.players[i]),
-                                      str(self.players[j])])
-
-                cached_score = self._get_scores_from_cache(player_names)
-                scores[i] += cached_score[0]
-                scores[j] += cached_score[1]
+        types = self._update_player_types()
+        first, second = self._pairs
+        first_types, second_types = types[first], types[second]
+        pdfs = self._pair_pdf[first_types, second_types]
+        if np.any(pdfs < 0):
+            k = int(np.flatnonzero(pdfs < 0)[0])
+            raise KeyError((self.type_names[first_types[k]],
+                            self.type_names[second_types[k]]))
+        offsets = self._pdf_offsets[pdfs]
+        columns = offsets + (np.random.random(len(pdfs)) *
+                             self._pdf_sizes[pdfs]).astype(int)
+        uniform = np.random.random(len(pdfs))
+        indices = np.where(uniform < self._alias_probability[columns],
+                           columns, self._alias[columns])
+        swapped = self._pair_swapped[first_types, second_types]
+        first_scores = np.where(swapped, self._outcomes[indices, 1],
+                                self._outcomes[indices, 0])
+        second_scores = np.where(swapped, self._outcomes[indices, 0],
+                                 self._outcomes[indices, 1])
+        scores = (np.bincount(first, weights=first_scores, minlength=N) +
+                  np.bincount(second, weights=second_scores, minlength=N))
+        scores = scores.tolist()
         self.score_history.append(scores)
         return scores
 
@@ -495,3 +748,928 @@ class ApproximateMoranProcess(MoranProcess):
         except KeyError:  # If players are stored in opposite order
             match_scores = self.cached_outcomes[player_names[::-1]].sample()
             return match_scores[::-1]
+
+
+def build_cached_outcomes(players: List[Player], turns: int = DEFAULT_TURNS,
+                          repetitions: int = 10, prob_end: float = None,
+                          noise: float = 0, game: Game = None,
+                          deterministic_cache: DeterministicCache = None,
+                          processes: int = None, decimals: int = None,
+                          progress_bar: bool = False) -> Dict[Tuple, Pdf]:
+    """
+    Builds the cached outcomes of an ApproximateMoranProcess: the
+    distribution of the per turn scores of the matches between every pair of
+    types of players (including a type and itself).
+
+    The matches are played by tournaments on the edges of the pairs, so that
+    they can be played in parallel. Deterministic matches are played once,
+    or read from the deterministic cache, and stochastic matches are played
+    `repetitions` times.
+
+    Parameters
+    ----------
+    players:
+        The players, the outcomes are built for each type (name)
+    turns:
+        The number of turns in each pairwise interaction
+    repetitions:
+        The number of times each stochastic match is played
+    prob_end :
+        The probability of a given turn ending a match
+    noise:
+        The background noise, if any.
+    game:
+        The game the matches are played with
+    deterministic_cache:
+        A optional prebuilt deterministic cache, updated with the
+        deterministic matches played
+    processes:
+        The number of processes to be used for parallel processing
+    decimals:
+        If given, the scores are rounded to this number of decimals to bin
+        the outcomes
+    progress_bar:
+        Whether or not to show a progress bar
+
+    Returns
+    -------
+    cached_outcomes:
+        Mapping the pairs of names of the types to instances of the Pdf class
+    """
+    if game is None:
+        game = Game()
+    if deterministic_cache is None:
+        deterministic_cache = DeterministicCache()
+    types = dict()  # type: Dict
+    for player in players:
+        types.setdefault(str(player), player)
+    names = sorted(types)
+    representatives = [types[name] for name in names]
+
+    outcomes = defaultdict(Counter)  # type: Dict
+    deterministic_edges, stochastic_edges = [], []
+    for i, player1 in enumerate(representatives):
+        for j in range(i, len(representatives)):
+            player2 = representatives[j]
+            if prob_end is not None or is_stochastic((player1, player2),
+                                                     noise):
+                stochastic_edges.append((i, j))
+            elif (player1, player2, turns) in deterministic_cache:
+                interaction = deterministic_cache[(player1, player2, turns)]
+                outcomes[(names[i], names[j])][
+                    _binned_scores(interaction, game, decimals)] += 1
+            else:
+                deterministic_edges.append((i, j))
+
+    for edges, edge_repetitions in [(deterministic_edges, 1),
+                                    (stochastic_edges, repetitions)]:
+        if not edges:
+            continue
+        # The tournament is played by the players of the edges only
+        indices = sorted(set(index for edge in edges for index in edge))
+        position = {index: k for k, index in enumerate(indices)}
+        tournament = Tournament(
+            [representatives[index].clone() for index in indices],
+            game=game, turns=turns, prob_end=prob_end, noise=noise,
+            repetitions=edge_repetitions,
+            edges=[(position[i], position[j]) for i, j in edges])
+        file_descriptor, filename = mkstemp()
+        try:
+            tournament.play(build_results=False, filename=filename,
+                            processes=processes, progress_bar=progress_bar)
+            interactions = iu.read_interactions_from_file(
+                filename, progress_bar=False)
+        finally:
+            os.close(file_descriptor)
+            os.remove(filename)
+        for (k1, k2), pair_interactions in interactions.items():
+            i, j = indices[k1], indices[k2]
+            for interaction in pair_interactions:
+                outcomes[(names[i], names[j])][
+                    _binned_scores(interaction, game, decimals)] += 1
+                if edge_repetitions == 1 and deterministic_cache.mutable:
+                    deterministic_cache[(representatives[i],
+                                         representatives[j],
+                                         turns)] = interaction
+    return {pair: Pdf(counter) for pair, counter in outcomes.items()}
+
+
+def _binned_scores(interaction: List, game: Game,
+                   decimals: int = None) -> Tuple[float, float]:
+    """Returns the per turn scores of an interaction, possibly rounded."""
+    scores = iu.compute_final_score_per_turn(interaction, game)
+    if decimals is not None:
+        scores = tuple(round(score, decimals) for score in scores)
+    return scores
+
+
+def save_cached_outcomes(cached_outcomes: Dict[Tuple, Pdf],
+                         filename: str) -> None:
+    """
+    Writes cached outcomes to a csv file with a row for each distinct outcome
+    of each pair of types.
+
+    Parameters
+    ----------
+    cached_outcomes:
+        Mapping the pairs of names of the types to instances of the Pdf class
+    filename:
+        The name of the file
+    """
+    with open(filename, "w", newline="") as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(["Player name", "Opponent name", "Score",
+                         "Opponent score", "Count"])
+        for (name1, name2), pdf in cached_outcomes.items():
+            for (score1, score2), count in zip(pdf.sample_space, pdf.counts):
+                writer.writerow([name1, name2, score1, score2, count])
+
+
+def load_cached_outcomes(filename: str) -> Dict[Tuple, Pdf]:
+    """
+    Reads cached outcomes written by save_cached_outcomes.
+
+    Parameters
+    ----------
+    filename:
+        The name of the file
+
+    Returns
+    -------
+    cached_outcomes:
+        Mapping the pairs of names of the types to instances of the Pdf class
+    """
+    outcomes = defaultdict(Counter)  # type: Dict
+    with open(filename, "r", newline="") as infile:
+        reader = csv.reader(infile)
+        next(reader)
+        for name1, name2, score1, score2, count in reader:
+            outcomes[(name1, name2)][(float(score1), float(score2))] += int(
+                count)
+    return {pair: Pdf(counter) for pair, counter in outcomes.items()}
+
+
+def expected_payoff_matrix(players: List[Player], turns: int = DEFAULT_TURNS,
+                           prob_end: float = None, noise: float = 0,
+                           game: Game = None,
+                           deterministic_cache: DeterministicCache = None,
+                           repetitions: int = 10) -> np.ndarray:
+    """
+    Returns the matrix of expected per turn scores of each player against each
+    other player (including a copy of itself).
+
+    Deterministic matches are played once, stochastic matches are played
+    `repetitions` times and their scores averaged.
+
+    Parameters
+    ----------
+    players:
+        The players, one of each type
+    turns:
+        The number of turns in each pairwise interaction
+    prob_end :
+        The probability of a given turn ending a match
+    noise:
+        The background noise, if any.
+    game:
+        The game the matches are played with
+    deterministic_cache:
+        A optional prebuilt deterministic cache
+    repetitions:
+        The number of times each stochastic match is played
+
+    Returns
+    -------
+    payoffs:
+        An array with element [i, j] the expected per turn score of player i
+        against player j
+    """
+    if deterministic_cache is None:
+        deterministic_cache = DeterministicCache()
+    size = len(players)
+    payoffs = np.zeros((size, size))
+    for i in range(size):
+        for j in range(i, size):
+            pair = (players[i].clone(), players[j].clone())
+            stochastic = prob_end is not None or is_stochastic(pair, noise)
+            number_of_matches = repetitions if stochastic else 1
+            for _ in range(number_of_matches):
+                match = Match(pair, turns=turns, prob_end=prob_end,
+                              noise=noise, game=game,
+                              deterministic_cache=deterministic_cache)
+                match.play()
+                match_scores = match.final_score_per_turn()
+                if i == j:
+                    payoffs[i, i] += sum(match_scores) / (
+                        2 * number_of_matches)
+                else:
+                    payoffs[i, j] += match_scores[0] / number_of_matches
+                    payoffs[j, i] += match_scores[1] / number_of_matches
+    return payoffs
+
+
+class TypeCountMoranProcess(MoranProcess):
+    """
+    A Moran process on a well mixed population represented by the number of
+    individuals of each type.
+
+    Rather than playing the matches of each round, the fitness of each type is
+    obtained from a matrix of the expected scores of each type against each
+    other type, computed once. Each step then takes a time proportional to
+    the number of types, independently of the size of the population.
+
+    Near fixation most steps replace an individual with an individual of the
+    same type. With `skip_no_op_steps` each iteration samples the number of
+    such steps from a geometric distribution and then the next step that
+    changes the population, conditional on a change. The sequence of
+    populations has the same distribution as that of the original process.
+    """
+    def __init__(self, players: List[Player], counts: List[int] = None,
+                 turns: int = DEFAULT_TURNS, prob_end: float = None,
+                 noise: float = 0, game: Game = None,
+                 deterministic_cache: DeterministicCache = None,
+                 mutation_rate: float = 0., mode: str = 'bd',
+                 payoff_matrix: np.ndarray = None,
+                 repetitions: int = 10, skip_no_op_steps: bool = False,
+                 run_length_encode: bool = False, record: str = "all",
+                 record_size: int = None,
+                 record_filename: str = None) -> None:
+        """
+        Parameters
+        ----------
+        players:
+            The players. If counts are not given, the players are grouped by
+            type (as given by their names) to obtain the counts.
+        counts:
+            The number of individuals of the type of each player
+        turns:
+            The number of turns in each pairwise interaction
+        prob_end :
+            The probability of a given turn ending a match
+        noise:
+            The background noise, if any. Randomly flips plays with probability
+            `noise`.
+        game:
+            The game the matches are played with
+        deterministic_cache:
+            A optional prebuilt deterministic cache
+        mutation_rate:
+            The rate of mutation. Replicating players are mutated with
+            probability `mutation_rate`
+        mode:
+            Birth-Death (bd) or Death-Birth (db)
+        payoff_matrix:
+            The expected per turn score of each type against each type. If not
+            given this is obtained with `expected_payoff_matrix`.
+        repetitions:
+            The number of times each stochastic match is played to estimate
+            the payoff matrix
+        skip_no_op_steps:
+            Whether each iteration jumps to the next step that changes the
+            population. The skipped steps are still counted in `steps`.
+        run_length_encode:
+            Whether to only record a population when it differs from the
+            previous one. The step at which each recorded population arose is
+            then kept in `population_steps`.
+        record:
+            How the populations and scores are kept (see MoranProcess)
+        record_size:
+            The number of steps between kept steps or of kept steps
+        record_filename:
+            The prefix of the files the populations and scores are written to
+        """
+        if counts is None:
+            counter = Counter(str(player) for player in players)
+            types = dict()  # type: Dict
+            for player in players:
+                types.setdefault(str(player), player)
+            players = list(types.values())
+            counts = [counter[str(player)] for player in players]
+        if len(counts) != len(players):
+            raise ValueError("There must be a count for each player.")
+        assert (mutation_rate >= 0) and (mutation_rate <= 1)
+        assert (noise >= 0) and (noise <= 1)
+        mode = mode.lower()
+        assert mode in ['bd', 'db']
+
+        self.turns = turns
+        self.prob_end = prob_end
+        self.game = game
+        self.noise = noise
+        self.mutation_rate = mutation_rate
+        self.mode = mode
+        if deterministic_cache is not None:
+            self.deterministic_cache = deterministic_cache
+        else:
+            self.deterministic_cache = DeterministicCache()
+
+        self.types = players
+        self.names = [str(player) for player in players]
+        self.type_names = self.names
+        self._set_record(record, record_size, record_filename)
+        self.initial_counts = np.array(counts, dtype=np.int64)
+        self.population_size = int(self.initial_counts.sum())
+        if payoff_matrix is None:
+            payoff_matrix = expected_payoff_matrix(
+                players, turns=turns, prob_end=prob_end, noise=noise,
+                game=game, deterministic_cache=self.deterministic_cache,
+                repetitions=repetitions)
+        self.payoff_matrix = np.array(payoff_matrix, dtype=float)
+        self.skip_no_op_steps = skip_no_op_steps
+        self.run_length_encode = run_length_encode
+        self.dead = None  # type: int
+        self.reset()
+
+    def set_players(self) -> None:
+        """Set the counts to the initial counts."""
+        self.counts = self.initial_counts.copy()
+        self._population = self.population_distribution()
+        self.populations = self._new_populations()
+        self.populations.append(self._population)
+        self.steps = 0
+        self.population_steps = [0] if self.run_length_encode else None
+
+    def reset(self) -> None:
+        """Reset the process to replay."""
+        self.winning_strategy_name = None
+        self.score_history = self._new_score_history(len(self.types))
+        self.set_players()
+
+    def _select(self, weights: np.ndarray) -> int:
+        """Select a type with probability proportional to weights."""
+        csums = np.cumsum(weights)
+        r = random.random() * csums[-1]
+        return min(int(np.searchsorted(csums, r, side="right")),
+                   len(csums) - 1)
+
+    def mutate(self, index: int) -> int:
+        """Returns the type of the offspring of an individual of a type.
+
+        Parameters
+        ----------
+        index:
+            The index of the type of the reproducing individual
+        """
+        r = random.random()
+        if r < self.mutation_rate and len(self.types) > 1:
+            j = randrange(0, len(self.types) - 1)
+            return j if j < index else j + 1
+        return index
+
+    def death(self, index: int = None) -> int:
+        """
+        Selects the type of the individual to be removed, uniformly at random
+        across the population.
+
+        Parameters
+        ----------
+        index:
+            The index of the type of the reproducing individual (unused)
+        """
+        i = self._select(self.counts)
+        if self.mode == "db":
+            self.dead = i
+        return i
+
+    def birth(self, index: int = None) -> int:
+        """The birth event: selects the type of the individual to reproduce.
+
+        Parameters
+        ----------
+        index:
+            In the death-birth case, the index of the type of the individual
+            that has died.
+        """
+        counts = self.counts.copy()
+        if index is not None:
+            counts[index] -= 1
+        fitness = self.score_all(counts)
+        weights = counts * fitness
+        if weights.sum() <= 0:
+            # No fitness: select an individual uniformly at random
+            weights = counts
+        return self._select(weights)
+
+    def score_all(self,  # type: ignore
+                  counts: np.ndarray = None) -> np.ndarray:
+        """
+        Returns the fitness of an individual of each type: its total expected
+        score against every other individual of the population.
+
+        Parameters
+        ----------
+        counts:
+            The number of individuals of each type, by default the current
+            counts.
+        """
+        if counts is None:
+            counts = self.counts
+        fitness = self._fitness(counts)
+        self.score_history.append(fitness)
+        return fitness
+
+    def _fitness(self, counts: np.ndarray) -> np.ndarray:
+        """Returns the fitness of an individual of each type."""
+        return self.payoff_matrix.dot(counts) - np.diag(self.payoff_matrix)
+
+    def fixation_check(self) -> bool:
+        """
+        Checks if the population is all of a single type
+
+        Returns
+        -------
+        Boolean:
+            True if fixation has occurred (population all of a single type)
+        """
+        if self.mutation_rate > 0:
+            return False
+        if np.count_nonzero(self.counts) == 1:
+            self.winning_strategy_name = self.names[
+                int(np.flatnonzero(self.counts)[0])]
+            return True
+        return False
+
+    def __next__(self) -> object:
+        """
+        Iterate the population:
+
+        - choose a type proportionally to fitness to reproduce
+        - mutate, if appropriate
+        - choose an individual uniformly at random to be replaced
+        - update the counts
+
+        Returns
+        -------
+        TypeCountMoranProcess:
+            Returns itself with a new population
+        """
+        if self.fixation_check():
+            raise StopIteration
+        if self.skip_no_op_steps:
+            i, j, skipped = self._next_change()
+        else:
+            skipped = 0
+            if self.mode == "bd":
+                j = self.birth()
+                i = self.death(j)
+            else:
+                i = self.death()
+                j = self.birth(i)
+            if self.mutation_rate:
+                j = self.mutate(j)
+        self._record(i, j, skipped)
+        self.fixation_check()
+        return self
+
+    def _record(self, i: int, j: int, skipped: int = 0) -> None:
+        """
+        Replaces an individual of type i by an individual of type j after
+        `skipped` steps that did not change the population, and records the
+        new population.
+        """
+        previous = self._population
+        if not self.run_length_encode:
+            self.populations.extend(Counter(previous) for _ in range(skipped))
+        self.steps += skipped + 1
+        self.counts[i] -= 1
+        self.counts[j] += 1
+        self._population = self.population_distribution()
+        if not self.run_length_encode:
+            self.populations.append(self._population)
+        elif self._population != previous:
+            self.populations.append(self._population)
+            self.population_steps.append(self.steps)
+
+    def _mutation_matrix(self) -> np.ndarray:
+        """
+        Returns the matrix with element [j, k] the probability that the
+        offspring of an individual of type j is of type k.
+        """
+        size = len(self.types)
+        if size == 1 or not self.mutation_rate:
+            return np.eye(size)
+        matrix = np.full((size, size), self.mutation_rate / (size - 1))
+        np.fill_diagonal(matrix, 1 - self.mutation_rate)
+        return matrix
+
+    def transition_probabilities(self, counts: np.ndarray = None
+                                 ) -> np.ndarray:
+        """
+        Returns the probabilities of the possible replacements of the next
+        step.
+
+        Parameters
+        ----------
+        counts:
+            The number of individuals of each type, by default the current
+            counts.
+
+        Returns
+        -------
+        transitions:
+            An array with element [i, j] the probability that an individual of
+            type i is replaced by an individual of type j
+        """
+        size = len(self.types)
+        if counts is None:
+            counts = self.counts
+        counts = np.asarray(counts)
+        death = counts / self.population_size
+        fitness = self._fitness(counts)
+        if self.mode == "bd":
+            weights = counts * fitness
+            if weights.sum() <= 0:
+                weights = counts
+            birth = weights / weights.sum()
+            return np.outer(death, birth.dot(self._mutation_matrix()))
+        # Column i holds the counts and fitness of each type once an
+        # individual of type i has died
+        alive = np.flatnonzero(counts)
+        remaining = counts[:, None] - np.eye(size)[:, alive]
+        fitnesses = fitness[:, None] - self.payoff_matrix[:, alive]
+        weights = remaining * fitnesses
+        unfit = weights.sum(axis=0) <= 0
+        weights[:, unfit] = remaining[:, unfit]
+        births = weights / weights.sum(axis=0)
+        transitions = np.zeros((size, size))
+        transitions[alive] = births.T.dot(self._mutation_matrix())
+        return transitions * death[:, None]
+
+    def _next_change(self) -> Tuple[int, int, int]:
+        """
+        Samples the next step that changes the population.
+
+        Returns
+        -------
+        i, j, skipped:
+            The individual of type i is replaced by one of type j after
+            `skipped` steps that did not change the population
+        """
+        self.score_all()
+        changes = self.transition_probabilities()
+        np.fill_diagonal(changes, 0)
+        probability = changes.sum()
+        if probability <= 0:
+            # No step can change the population
+            i = self._select(self.counts)
+            return i, i, 0
+        skipped = np.random.geometric(min(probability, 1)) - 1
+        i, j = divmod(self._select(changes.ravel()), len(self.types))
+        return i, j, int(skipped)
+
+    def population_distribution(self) -> Counter:
+        """Returns the population distribution of the last iteration.
+
+        Returns
+        -------
+        counter:
+            The counts of each strategy in the population of the last iteration
+        """
+        return Counter({name: int(count)
+                        for name, count in zip(self.names, self.counts)
+                        if count > 0})
+
+
+
+class AnalyticMoranProcess(TypeCountMoranProcess):
+    """
+    Exact results for the Moran process on a well mixed population.
+
+    The counts of each type form a Markov chain with transition probabilities
+    given by the expected payoff matrix. Without mutation the fixation
+    probabilities and expected absorption times are obtained by solving the
+    absorbing chain (with the closed product formula for the fixation
+    probabilities of two types). With mutation the stationary distribution of
+    the chain is computed. As the number of states grows quickly with the
+    size of the population and the number of types, the chain is only
+    tractable for small populations of more than two types.
+    """
+
+    def states(self) -> List[Tuple[int, ...]]:
+        """
+        Returns every population of the chain: the possible numbers of
+        individuals of each type.
+        """
+        size = len(self.types)
+        states = []
+        for bars in combinations(range(self.population_size + size - 1),
+                                 size - 1):
+            edges = (-1,) + bars + (self.population_size + size - 1,)
+            states.append(tuple(edges[k + 1] - edges[k] - 1
+                                for k in range(size)))
+        return states
+
+    def transition_matrix(self) -> csr_matrix:
+        """
+        Returns the sparse transition matrix of the chain between the
+        populations given by `states`.
+        """
+        states = self.states()
+        index = {state: k for k, state in enumerate(states)}
+        rows, columns, probabilities = [], [], []
+        for k, state in enumerate(states):
+            transitions = self.transition_probabilities(np.array(state))
+            np.fill_diagonal(transitions, 0)
+            for i, j in zip(*np.nonzero(transitions)):
+                target = list(state)
+                target[i] -= 1
+                target[j] += 1
+                rows.append(k)
+                columns.append(index[tuple(target)])
+                probabilities.append(transitions[i, j])
+            rows.append(k)
+            columns.append(k)
+            probabilities.append(1 - transitions.sum())
+        return csr_matrix((probabilities, (rows, columns)),
+                          shape=(len(states), len(states)))
+
+    def _check_no_mutation(self) -> None:
+        if self.mutation_rate != 0:
+            raise ValueError(
+                "A Moran process with a nonzero mutation_rate never fixates. "
+                "Use stationary_distribution instead.")
+
+    def _absorbing_chain(self) -> Tuple:
+        """
+        Returns the index of the initial population among the transient
+        populations (None if it is absorbing), the fundamental system of the
+        transient populations and the probabilities of moving to each
+        absorbing population, ordered as the types.
+        """
+        states = self.states()
+        initial = tuple(int(count) for count in self.initial_counts)
+        absorbing = [states.index(tuple(self.population_size * (k == i)
+                                        for k in range(len(self.types))))
+                     for i in range(len(self.types))]
+        transient = sorted(set(range(len(states))) - set(absorbing))
+        matrix = self.transition_matrix()
+        fundamental = (identity(len(transient), format="csc") -
+                       matrix[transient][:, transient].tocsc())
+        exits = matrix[transient][:, absorbing].toarray()
+        position = dict(zip((states[k] for k in transient),
+                            range(len(transient))))
+        return position.get(initial), fundamental, exits
+
+    def fixation_probabilities(self) -> Dict[str, float]:
+        """
+        Returns the probability that the population fixates on each type,
+        starting from the initial counts.
+        """
+        self._check_no_mutation()
+        if len(self.types) == 2:
+            probability = self._two_type_fixation_probability()
+            if probability is not None:
+                return {self.names[0]: probability,
+                        self.names[1]: 1 - probability}
+        initial, fundamental, exits = self._absorbing_chain()
+        if initial is None:
+            return {name: float(count > 0)
+                    for name, count in zip(self.names, self.initial_counts)}
+        absorption = spsolve(fundamental, exits).reshape(exits.shape)
+        return {name: float(probability) for name, probability
+                in zip(self.names, absorption[initial])}
+
+    def _two_type_fixation_probability(self) -> float:
+        """
+        Returns the fixation probability of the first of two types with the
+        closed product formula, or None if a population of the chain can not
+        gain an individual of the first type.
+        """
+        size = self.population_size
+        first = int(self.initial_counts[0])
+        if first in (0, size):
+            return float(first == size)
+        ratios = []
+        for count in range(1, size):
+            transitions = self.transition_probabilities(
+                np.array((count, size - count)))
+            if transitions[1, 0] <= 0:
+                return None
+            ratios.append(transitions[0, 1] / transitions[1, 0])
+        with np.errstate(divide="ignore"):
+            products = np.concatenate(([0], np.cumsum(np.log(ratios))))
+        return float(np.exp(logsumexp(products[:first]) -
+                            logsumexp(products)))
+
+    def absorption_time(self) -> float:
+        """
+        Returns the expected number of steps until the population fixates,
+        starting from the initial counts.
+        """
+        self._check_no_mutation()
+        initial, fundamental, _ = self._absorbing_chain()
+        if initial is None:
+            return 0.
+        times = spsolve(fundamental, np.ones(fundamental.shape[0]))
+        return float(np.atleast_1d(times)[initial])
+
+    def fixation_times(self) -> Dict[str, float]:
+        """
+        Returns the expected number of steps until the population fixates on
+        each type, given that it does, starting from the initial counts. The
+        time is nan for a type that can not fixate.
+        """
+        self._check_no_mutation()
+        initial, fundamental, exits = self._absorbing_chain()
+        if initial is None:
+            return {name: 0. if count > 0 else np.nan
+                    for name, count in zip(self.names, self.initial_counts)}
+        absorption = spsolve(fundamental, exits).reshape(exits.shape)
+        weighted = spsolve(fundamental, absorption).reshape(exits.shape)
+        times = {}
+        for k, name in enumerate(self.names):
+            probability = absorption[initial, k]
+            times[name] = (float(weighted[initial, k] / probability)
+                           if probability > 0 else np.nan)
+        return times
+
+    def stationary_distribution(self) -> Dict[Tuple[int, ...], float]:
+        """
+        Returns the stationary distribution of the populations of a process
+        with mutation, mapping the number of individuals of each type to its
+        long run probability.
+        """
+        if self.mutation_rate == 0:
+            raise ValueError(
+                "The stationary distribution of a Moran process is only "
+                "unique with a nonzero mutation_rate.")
+        states = self.states()
+        matrix = (self.transition_matrix().T -
+                  identity(len(states), format="csr")).tolil()
+        # Replace one balance equation by the normalisation
+        matrix[0, :] = np.ones(len(states))
+        right = np.zeros(len(states))
+        right[0] = 1
+        distribution = spsolve(matrix.tocsc(), right)
+        return {state: float(probability)
+                for state, probability in zip(states, distribution)}
+
+
+def _fixation_trials(arguments: Tuple) -> List[Tuple[str, int]]:
+    """
+    Plays a number of Moran processes to fixation with a given seed. The
+    state of the global random number generators is restored afterwards so
+    that playing the trials in the current process does not reseed them.
+
+    Parameters
+    ----------
+    arguments:
+        A tuple of the Moran process class, the players, the keyword
+        arguments of the process, the seed and the number of trials
+
+    Returns
+    -------
+    outcomes:
+        A list of the name of the fixated type and the number of steps to
+        fixation of each trial
+    """
+    process_class, players, kwargs, seed, trials = arguments
+    state, np_state = random.getstate(), np.random.get_state()
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        mp = process_class([player.clone() for player in players], **kwargs)
+        outcomes = []
+        for _ in range(trials):
+            mp.play()
+            # The populations may only be partially recorded
+            steps = mp.steps if hasattr(mp, "steps") else len(mp) - 1
+            outcomes.append((mp.winning_strategy_name, steps))
+            mp.reset()
+    finally:
+        random.setstate(state)
+        np.random.set_state(np_state)
+    return outcomes
+
+
+def _wilson_interval(successes: int, trials: int,
+                     confidence: float) -> Tuple[float, float]:
+    """Returns the Wilson score interval of a binomial proportion."""
+    z = norm.ppf(1 - (1 - confidence) / 2)
+    proportion = successes / trials
+    denominator = 1 + z ** 2 / trials
+    centre = (proportion + z ** 2 / (2 * trials)) / denominator
+    half_width = z * np.sqrt(proportion * (1 - proportion) / trials +
+                             z ** 2 / (4 * trials ** 2)) / denominator
+    lower = max(centre - half_width, 0)
+    upper = min(centre + half_width, 1)
+    return float(lower), float(upper)
+
+
+def estimate_fixation(players: List[Player], trials: int = 1000,
+                      processes: int = None, seed: int = None,
+                      confidence: float = 0.95, tolerance: float = None,
+                      chunk_size: int = 100, process_class: type = MoranProcess,
+                      **kwargs) -> FixationEstimate:
+    """
+    Estimates the fixation probabilities and mean fixation times of the types
+    of players by playing independent Moran processes to fixation.
+
+    The trials are played in chunks, each with its own seed drawn from
+    `seed`, so that the estimates do not depend on the number of processes.
+    The results of deterministic matches are computed once and shared by all
+    the chunks.
+
+    Parameters
+    ----------
+    players:
+        The initial population
+    trials:
+        The maximum number of Moran processes to play
+    processes:
+        The number of processes to use. If None the trials are played in the
+        current process, if 0 all available cpus are used.
+    seed:
+        The seed from which the seed of each chunk is drawn
+    confidence:
+        The confidence level of the intervals
+    tolerance:
+        If given, stop once the half width of the confidence interval of every
+        fixation probability is at most `tolerance`
+    chunk_size:
+        The number of trials played with each seed
+    process_class:
+        The Moran process class, `MoranProcess` or `TypeCountMoranProcess`
+    kwargs:
+        The keyword arguments of the Moran process (turns, noise, mode...)
+
+    Returns
+    -------
+    estimate:
+        A FixationEstimate of the fixation probability, the mean number of
+        steps to fixation given fixation and the confidence interval of the
+        fixation probability of each type, and the number of trials played
+    """
+    if kwargs.get("mutation_rate", 0) != 0:
+        raise ValueError(
+            "Fixation can not be estimated if mutation_rate is nonzero.")
+    names = sorted(set(str(player) for player in players))
+    kwargs["deterministic_cache"] = _deterministic_payoff_cache(
+        players, kwargs.get("turns", DEFAULT_TURNS), kwargs.get("noise", 0),
+        kwargs.get("game"), kwargs.get("prob_end"),
+        kwargs.get("deterministic_cache"))
+
+    seeds = np.random.RandomState(seed).randint(
+        0, 2 ** 31, size=-(-trials // chunk_size))
+    tasks = [(process_class, players, kwargs, int(chunk_seed),
+              min(chunk_size, trials - index * chunk_size))
+             for index, chunk_seed in enumerate(seeds)]
+
+    if processes is None:
+        pool = None
+        chunks = map(_fixation_trials, tasks)  # type: Iterator
+    else:
+        pool = Pool(processes if processes > 0 else cpu_count())
+        chunks = pool.imap(_fixation_trials, tasks)
+
+    wins = Counter()  # type: Counter
+    times = Counter()  # type: Counter
+    played = 0
+    try:
+        for outcomes in chunks:
+            for name, steps in outcomes:
+                wins[name] += 1
+                times[name] += steps
+            played += len(outcomes)
+            if tolerance is not None:
+                half_widths = [(upper - lower) / 2 for lower, upper in (
+                    _wilson_interval(wins[name], played, confidence)
+                    for name in names)]
+                if max(half_widths) <= tolerance:
+                    break
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    probabilities = {name: wins[name] / played for name in names}
+    mean_times = {name: times[name] / wins[name] if wins[name] else np.nan
+                  for name in names}
+    intervals = {name: _wilson_interval(wins[name], played, confidence)
+                 for name in names}
+    return FixationEstimate(probabilities, mean_times, intervals, played)
+
+
+def _deterministic_payoff_cache(players: List[Player], turns: int,
+                                noise: float, game: Game, prob_end: float,
+                                deterministic_cache: DeterministicCache = None
+                                ) -> DeterministicCache:
+    """
+    Returns a deterministic cache holding the deterministic matches between
+    every pair of types of players.
+    """
+    if deterministic_cache is None:
+        deterministic_cache = DeterministicCache()
+    if prob_end is not None:
+        return deterministic_cache
+    types = dict()  # type: Dict
+    for player in players:
+        types.setdefault(str(player), player)
+    representatives = list(types.values())
+    for i, player1 in enumerate(representatives):
+        for player2 in representatives[i:]:
+            pair = (player1.clone(), player2.clone())
+            if not is_stochastic(pair, noise):
+                Match(pair, turns=turns, noise=noise, game=game,
+                      deterministic_cache=deterministic_cache).play()
+    return deterministic_cache
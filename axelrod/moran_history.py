@@ -0,0 +1,312 @@
+"""
+Records of the populations and scores of a Moran process with bounded memory.
+
+A Moran process with mutation never stops, so keeping the population and the
+scores of every step eventually exhausts memory. The records in this module
+hold a fixed width row of numbers per step and either keep every k-th row,
+the last rows in a ring buffer or stream all the rows to a file on disk.
+Populations are stored as counts over a fixed list of type names.
+"""
+from collections import Counter
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+from typing import Iterator, List
+
+RECORDS = ["all", "every", "ring", "file"]
+
+# The number of rows held in memory before they are written to a file
+DEFAULT_BUFFER_SIZE = 1024
+
+
+class History(object):
+    """
+    A record of fixed width rows, one for each step.
+
+    Subclasses decide which rows are kept and how. The kept rows can be
+    accessed as an array of shape (rows, width) with `array` and the step of
+    each of them with `steps`.
+    """
+
+    def __init__(self, width: int, dtype: type = float) -> None:
+        """
+        Parameters
+        ----------
+        width : int
+            The number of values in each row
+        dtype : type
+            The type of the values
+        """
+        self.width = width
+        self.dtype = np.dtype(dtype)
+        self.total = 0
+
+    def append(self, row) -> None:
+        """Record the row of the next step."""
+        self._append(np.asarray(row, dtype=self.dtype), self.total)
+        self.total += 1
+
+    def extend(self, rows) -> None:
+        """Record the rows of the next steps."""
+        for row in rows:
+            self.append(row)
+
+    def clear(self) -> None:
+        """Discard all the rows."""
+        self.total = 0
+        self._clear()
+
+    def _append(self, row: np.ndarray, step: int) -> None:
+        raise NotImplementedError
+
+    def _clear(self) -> None:
+        raise NotImplementedError
+
+    def array(self) -> np.ndarray:
+        """Returns the kept rows as an array of shape (rows, width)."""
+        raise NotImplementedError
+
+    def steps(self) -> np.ndarray:
+        """Returns the step of each of the kept rows."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return len(self.steps())
+
+    def __getitem__(self, index):
+        return self.array()[index]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.array())
+
+
+class KeepEveryHistory(History):
+    """Keeps the rows of every k-th step (starting with the first)."""
+
+    def __init__(self, width: int, dtype: type = float,
+                 every: int = 1) -> None:
+        """
+        Parameters
+        ----------
+        width : int
+            The number of values in each row
+        dtype : type
+            The type of the values
+        every : int
+            The number of steps between kept rows
+        """
+        if every < 1:
+            raise ValueError("every must be a positive integer.")
+        super().__init__(width, dtype)
+        self.every = every
+        self._rows = []  # type: List
+
+    def _append(self, row: np.ndarray, step: int) -> None:
+        if step % self.every == 0:
+            self._rows.append(row)
+
+    def _clear(self) -> None:
+        self._rows = []
+
+    def array(self) -> np.ndarray:
+        if not self._rows:
+            return np.zeros((0, self.width), dtype=self.dtype)
+        return np.array(self._rows, dtype=self.dtype)
+
+    def steps(self) -> np.ndarray:
+        return np.arange(len(self._rows)) * self.every
+
+
+class RingBufferHistory(History):
+    """Keeps the rows of the last `size` steps in a preallocated array."""
+
+    def __init__(self, width: int, dtype: type = float,
+                 size: int = 1000) -> None:
+        """
+        Parameters
+        ----------
+        width : int
+            The number of values in each row
+        dtype : type
+            The type of the values
+        size : int
+            The number of rows kept
+        """
+        if size < 1:
+            raise ValueError("size must be a positive integer.")
+        super().__init__(width, dtype)
+        self.size = size
+        self._buffer = np.zeros(
+            (size, width), dtype=self.dtype)  # type: np.ndarray
+
+    def _append(self, row: np.ndarray, step: int) -> None:
+        self._buffer[step % self.size] = row
+
+    def _clear(self) -> None:
+        pass
+
+    def array(self) -> np.ndarray:
+        if self.total <= self.size:
+            return self._buffer[:self.total].copy()
+        start = self.total % self.size
+        return np.concatenate((self._buffer[start:], self._buffer[:start]))
+
+    def steps(self) -> np.ndarray:
+        return np.arange(max(self.total - self.size, 0), self.total)
+
+
+class FileHistory(History):
+    """
+    Keeps every row in a binary file on disk. Rows are buffered in memory and
+    written in blocks, and read back as a memory mapped array.
+    """
+
+    def __init__(self, width: int, dtype: type = float,
+                 filename: str = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        """
+        Parameters
+        ----------
+        width : int
+            The number of values in each row
+        dtype : type
+            The type of the values
+        filename : string
+            The file to write the rows to. If None a temporary file is used
+            which is removed once the history is garbage collected.
+        buffer_size : int
+            The number of rows held in memory before they are written
+        """
+        super().__init__(width, dtype)
+        if filename is None:
+            descriptor, filename = tempfile.mkstemp(prefix="axelrod_")
+            os.close(descriptor)
+            self._finalizer = weakref.finalize(self, os.remove, filename)
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self._buffer = []  # type: List
+        self._written = 0
+        self._clear()
+
+    def _append(self, row: np.ndarray, step: int) -> None:
+        self._buffer.append(row)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def _clear(self) -> None:
+        self._buffer = []
+        self._written = 0
+        open(self.filename, "wb").close()
+
+    def flush(self) -> None:
+        """Write the buffered rows to the file."""
+        if self._buffer:
+            with open(self.filename, "ab") as outfile:
+                outfile.write(np.array(self._buffer,
+                                       dtype=self.dtype).tobytes())
+            self._written += len(self._buffer)
+            self._buffer = []
+
+    def array(self) -> np.ndarray:
+        self.flush()
+        if self._written == 0:
+            return np.zeros((0, self.width), dtype=self.dtype)
+        return np.memmap(self.filename, dtype=self.dtype, mode="r",
+                         shape=(self._written, self.width))
+
+    def steps(self) -> np.ndarray:
+        return np.arange(self.total)
+
+
+class PopulationHistory(object):
+    """
+    A record of populations, stored as counts over a fixed list of type
+    names. Rows are read back as Counters, as for the populations of a Moran
+    process.
+    """
+
+    def __init__(self, names: List[str], history: History) -> None:
+        """
+        Parameters
+        ----------
+        names : list
+            The names of the types
+        history : History
+            The record of the counts of each type
+        """
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.history = history
+
+    def append(self, population: Counter) -> None:
+        """Record the population of the next step."""
+        counts = np.zeros(
+            len(self.names), dtype=self.history.dtype)  # type: np.ndarray
+        for name, count in population.items():
+            counts[self.index[name]] = count
+        self.history.append(counts)
+
+    def extend(self, populations) -> None:
+        """Record the populations of the next steps."""
+        for population in populations:
+            self.append(population)
+
+    def counts(self) -> np.ndarray:
+        """Returns the counts of each type of the kept populations."""
+        return self.history.array()
+
+    def steps(self) -> np.ndarray:
+        """Returns the step of each of the kept populations."""
+        return self.history.steps()
+
+    @property
+    def total(self) -> int:
+        """The number of recorded populations, kept or not."""
+        return self.history.total
+
+    def _counter(self, counts: np.ndarray) -> Counter:
+        return Counter({name: int(count)
+                        for name, count in zip(self.names, counts) if count})
+
+    def __len__(self) -> int:
+        return len(self.history)
+
+    def __getitem__(self, index):
+        counts = self.counts()[index]
+        if isinstance(index, slice):
+            return [self._counter(row) for row in counts]
+        return self._counter(counts)
+
+    def __iter__(self) -> Iterator:
+        return (self._counter(row) for row in self.counts())
+
+
+def new_history(record: str, width: int, dtype: type = float,
+                size: int = None, filename: str = None) -> History:
+    """
+    Returns an empty record of rows.
+
+    Parameters
+    ----------
+    record : string
+        "every" to keep every `size`-th row, "ring" to keep the last `size`
+        rows or "file" to write the rows to `filename`
+    width : int
+        The number of values in each row
+    dtype : type
+        The type of the values
+    size : int
+        The number of steps between kept rows or the number of kept rows
+    filename : string
+        The file to write the rows to, a temporary file if None
+    """
+    if record == "every":
+        return KeepEveryHistory(width, dtype, every=size or 1)
+    if record == "ring":
+        return RingBufferHistory(width, dtype, size=size or 1000)
+    if record == "file":
+        return FileHistory(width, dtype, filename=filename)
+    raise ValueError("Unknown record: {}".format(record))
@@ -0,0 +1,407 @@
+"""
+Analysis of the results of very large tournaments with bounded memory.
+
+The interactions file written by a tournament is read in chunks and aggregated
+into memory mapped numpy arrays stored on disk. Derived metrics are then
+computed in blocks of players so that neither the interactions nor any of the
+players x players x repetitions arrays are ever fully held in memory.
+"""
+from collections import namedtuple
+import csv
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+from scipy.sparse.linalg import LinearOperator
+import tqdm
+
+from axelrod.action import Action
+from . import eigen
+
+from typing import List
+
+
+C, D = Action.C, Action.D
+
+DEFAULT_MEMORY_LIMIT = 2 ** 28  # 256MB
+
+# Upper bound on the memory used by pandas to parse a row of an interactions
+# file (including the columns that are parsed but not kept).
+BYTES_PER_ROW = 1024
+
+STATE_COLUMNS = ["CC count", "CD count", "DC count", "DD count"]
+STATE_TO_ACTION_COLUMNS = ["CC to C count", "CC to D count",
+                           "CD to C count", "CD to D count",
+                           "DC to C count", "DC to D count",
+                           "DD to C count", "DD to D count"]
+COLUMNS = (["Player index", "Opponent index", "Repetition", "Score", "Turns",
+            "Score per turn", "Score difference per turn", "Win",
+            "Initial cooperation", "Cooperation count", "Good partner"] +
+           STATE_COLUMNS + STATE_TO_ACTION_COLUMNS)
+
+
+def _accumulate(array: np.ndarray, index: np.ndarray,
+                values: np.ndarray = None) -> None:
+    """
+    Add values to the entries of the flattened array given by index, summing
+    over repeated indices. If no values are given, counts the occurrences of
+    each index.
+    """
+    unique, inverse = np.unique(index, return_inverse=True)
+    totals = np.bincount(inverse, weights=values)
+    flat = array.reshape(-1)
+    flat[unique] += totals.astype(array.dtype)
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray,
+            alternative: float = 0) -> np.ndarray:
+    """Divide two arrays, using alternative where the denominator is 0."""
+    out = np.full(np.broadcast(numerator, denominator).shape, alternative,
+                  dtype=float)
+    return np.divide(numerator, denominator, out=out,
+                     where=np.asarray(denominator) != 0)
+
+
+class OutOfCoreResultSet(object):
+    """
+    A class to hold the results of a tournament with a large number of
+    players. Reads in the CSV file produced by the tournament class in chunks.
+
+    The attributes have the same meaning as those of `axelrod.ResultSet` but
+    are numpy arrays (memory mapped to files in `directory` for all the arrays
+    with a players x players dimension) instead of lists:
+
+    - The entries of `payoffs` corresponding to pairs of players that have not
+      interacted are `nan`.
+    - `match_lengths` has shape (repetitions, players, players).
+    - The state and state to action distributions are arrays of shape
+      (players, players, 4) and (players, players, 8) ordered as
+      `STATE_COLUMNS` and `STATE_TO_ACTION_COLUMNS`.
+    """
+
+    def __init__(self, filename: str, players: List[str], repetitions: int,
+                 directory: str = None,
+                 memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                 progress_bar: bool = True) -> None:
+        """
+        Parameters
+        ----------
+            filename : string
+                the file from which to read the interactions
+            players : list
+                A list of the names of players.
+            repetitions : int
+                The number of repetitions of each match.
+            directory : string
+                The directory in which to store the memory mapped arrays. If
+                None a temporary directory is used which is removed once the
+                result set is garbage collected.
+            memory_limit : int
+                The approximate number of bytes to hold in memory at any one
+                time, used to choose the size of the chunks of interactions
+                and of the blocks of players.
+            progress_bar : bool
+                Whether or not to create a progress bar which will be updated
+        """
+        self.filename = filename
+        self.players, self.repetitions = players, repetitions
+        self.num_players = len(self.players)
+        self.memory_limit = memory_limit
+
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="axelrod_")
+            self._finalizer = weakref.finalize(self, shutil.rmtree, directory,
+                                               ignore_errors=True)
+        self.directory = directory
+
+        self.chunksize = max(1, memory_limit // BYTES_PER_ROW)
+        # A block of players requires a few players x repetitions arrays for
+        # each opponent.
+        bytes_per_player = 8 * 8 * self.num_players * max(self.repetitions, 4)
+        self.block_size = max(1, memory_limit // bytes_per_player)
+
+        if progress_bar:
+            self.progress_bar = tqdm.tqdm(desc="Analysing", unit=" rows")
+
+        self._allocate()
+        for chunk in pd.read_csv(filename, usecols=COLUMNS,
+                                 chunksize=self.chunksize):
+            self._aggregate_chunk(chunk)
+            if progress_bar:
+                self.progress_bar.update(len(chunk))
+        self._build_metrics()
+
+        if progress_bar:
+            self.progress_bar.close()
+
+    def _memmap(self, name: str, shape: tuple, dtype=float) -> np.memmap:
+        """Create a zero filled memory mapped array in the directory."""
+        path = os.path.join(self.directory, "{}.npy".format(name))
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype,
+                                         shape=shape)
+
+    def _blocks(self):
+        """Yield slices of consecutive blocks of players."""
+        for start in range(0, self.num_players, self.block_size):
+            yield slice(start, min(start + self.block_size, self.num_players))
+
+    def _allocate(self):
+        """Create the arrays in which the interactions are aggregated."""
+        n, r = self.num_players, self.repetitions
+
+        self._interaction_counts = self._memmap("interaction_counts",
+                                                (n, n, r), dtype=np.uint8)
+        self.payoffs = self._memmap("payoffs", (n, n, r))
+        self.score_diffs = self._memmap("score_diffs", (n, n, r))
+        self._turns = self._memmap("turns", (n, n, r))
+
+        self.cooperation = self._memmap("cooperation", (n, n), dtype=np.int64)
+        self.good_partner_matrix = self._memmap("good_partner_matrix", (n, n),
+                                                dtype=np.int64)
+        self.state_distribution = self._memmap(
+            "state_distribution", (n, n, len(STATE_COLUMNS)), dtype=np.int64)
+        self.state_to_action_distribution = self._memmap(
+            "state_to_action_distribution",
+            (n, n, len(STATE_TO_ACTION_COLUMNS)), dtype=np.int64)
+
+        self.wins = np.zeros((n, r), dtype=np.int64)
+        self.scores = np.zeros((n, r))
+        self._score_per_turn_sums = np.zeros((n, r))
+        self._score_per_turn_counts = np.zeros((n, r), dtype=np.int64)
+        self.initial_cooperation_count = np.zeros(n, dtype=np.int64)
+        self._interactions_count = np.zeros(n, dtype=np.int64)
+
+    def _aggregate_chunk(self, chunk: pd.DataFrame):
+        """Add a chunk of rows of the interactions file to the aggregates."""
+        n, r = self.num_players, self.repetitions
+        player = chunk["Player index"].values
+        opponent = chunk["Opponent index"].values
+        repetition = chunk["Repetition"].values
+
+        triplet = (player * n + opponent) * r + repetition
+        _accumulate(self._interaction_counts, triplet)
+        _accumulate(self.payoffs, triplet, chunk["Score per turn"].values)
+        _accumulate(self.score_diffs, triplet,
+                    chunk["Score difference per turn"].values)
+        _accumulate(self._turns, triplet, chunk["Turns"].values)
+
+        pair = player * n + opponent
+        _accumulate(self.cooperation, pair, chunk["Cooperation count"].values)
+        _accumulate(self.good_partner_matrix, pair,
+                    chunk["Good partner"].values)
+        for array, columns in [
+                (self.state_distribution, STATE_COLUMNS),
+                (self.state_to_action_distribution, STATE_TO_ACTION_COLUMNS)]:
+            for column_index, column in enumerate(columns):
+                _accumulate(array, pair * len(columns) + column_index,
+                            chunk[column].values)
+
+        not_self = player != opponent
+        player, repetition = player[not_self], repetition[not_self]
+        chunk = chunk[not_self]
+        player_repetition = player * r + repetition
+        _accumulate(self.wins, player_repetition, chunk["Win"].values)
+        _accumulate(self.scores, player_repetition, chunk["Score"].values)
+        _accumulate(self._score_per_turn_sums, player_repetition,
+                    chunk["Score per turn"].values)
+        _accumulate(self._score_per_turn_counts, player_repetition)
+        _accumulate(self.initial_cooperation_count, player,
+                    chunk["Initial cooperation"].values.astype(int))
+        _accumulate(self._interactions_count, player)
+
+    def _build_metrics(self):
+        """Compute all metrics from the aggregates, block by block."""
+        n = self.num_players
+        self.payoff_matrix = self._memmap("payoff_matrix", (n, n))
+        self.payoff_stddevs = self._memmap("payoff_stddevs", (n, n))
+        self.payoff_diffs_means = self._memmap("payoff_diffs_means", (n, n))
+        self.normalised_cooperation = self._memmap("normalised_cooperation",
+                                                   (n, n))
+        self.vengeful_cooperation = self._memmap("vengeful_cooperation",
+                                                 (n, n))
+        self.normalised_state_distribution = self._memmap(
+            "normalised_state_distribution", (n, n, len(STATE_COLUMNS)))
+        self.normalised_state_to_action_distribution = self._memmap(
+            "normalised_state_to_action_distribution",
+            (n, n, len(STATE_TO_ACTION_COLUMNS)))
+
+        self.cooperating_rating = np.zeros(n)
+        good_partner_totals = np.zeros(n)
+        for block in self._blocks():
+            self._build_block(block)
+            indices = np.arange(block.start, block.stop)
+            rows = indices - block.start
+
+            cooperation = np.array(self.cooperation[block], dtype=float)
+            total_turns = self._turns[block].sum(axis=2)
+            cooperation[rows, indices] = 0
+            total_turns[rows, indices] = 0
+            self.cooperating_rating[block] = (
+                cooperation.sum(axis=1) /
+                np.maximum(1, total_turns.sum(axis=1)))
+            good_partner_totals[block] = self.good_partner_matrix[block].sum(
+                axis=1)
+
+        self.normalised_scores = _divide(self._score_per_turn_sums,
+                                         self._score_per_turn_counts)
+        self.initial_cooperation_rate = _divide(self.initial_cooperation_count,
+                                                self._interactions_count)
+        self.good_partner_rating = (good_partner_totals /
+                                    np.maximum(1, self._interactions_count))
+
+        medians = np.nanmedian(self.normalised_scores, axis=1)
+        self.ranking = sorted(range(n), key=lambda i: -medians[i])
+        self.ranked_names = [str(self.players[i]) for i in self.ranking]
+
+        self.eigenjesus_rating = self._principal_eigenvector(
+            self.normalised_cooperation)
+        self.eigenmoses_rating = self._principal_eigenvector(
+            self.vengeful_cooperation)
+
+        for array in [self.payoffs, self.score_diffs, self._turns,
+                      self.cooperation, self.good_partner_matrix,
+                      self.state_distribution,
+                      self.state_to_action_distribution]:
+            array.flush()
+
+    def _build_block(self, block: slice):
+        """
+        Turn the sums of a block of players into means and build the
+        corresponding rows of the players x players metrics.
+        """
+        indices = np.arange(block.start, block.stop)
+        rows = indices - block.start
+
+        counts = np.array(self._interaction_counts[block])
+        played = counts > 0
+        number_played = played.sum(axis=2)
+
+        payoffs = _divide(self.payoffs[block], counts, alternative=np.nan)
+        self.payoffs[block] = payoffs
+        self.score_diffs[block] = _divide(self.score_diffs[block], counts)
+        turns = _divide(self._turns[block], counts)
+        self._turns[block] = turns
+
+        payoffs_played = np.where(played, payoffs, 0)
+        payoff_matrix = _divide(payoffs_played.sum(axis=2), number_played)
+        deviations = np.where(
+            played, payoffs_played - payoff_matrix[:, :, np.newaxis], 0)
+        self.payoff_matrix[block] = payoff_matrix
+        self.payoff_stddevs[block] = np.sqrt(
+            _divide((deviations ** 2).sum(axis=2), number_played))
+        self.payoff_diffs_means[block] = self.score_diffs[block].mean(axis=2)
+
+        # Self interactions are counted twice in the interactions file.
+        cooperation = np.array(self.cooperation[block])
+        cooperation[rows, indices] //= 2
+        self.cooperation[block] = cooperation
+        normalised_cooperation = _divide(cooperation, turns.sum(axis=2))
+        self.normalised_cooperation[block] = normalised_cooperation
+        self.vengeful_cooperation[block] = 2 * (normalised_cooperation - 0.5)
+
+        for array in [self.good_partner_matrix, self.state_distribution,
+                      self.state_to_action_distribution]:
+            values = np.array(array[block])
+            values[rows, indices] = 0
+            array[block] = values
+
+        state_distribution = self.state_distribution[block]
+        self.normalised_state_distribution[block] = _divide(
+            state_distribution,
+            state_distribution.sum(axis=2)[:, :, np.newaxis])
+
+        state_to_action = self.state_to_action_distribution[block]
+        shape = state_to_action.shape[:2] + (len(STATE_COLUMNS), 2)
+        state_to_action = state_to_action.reshape(shape)
+        self.normalised_state_to_action_distribution[block] = _divide(
+            state_to_action,
+            state_to_action.sum(axis=3)[:, :, :, np.newaxis]).reshape(
+                shape[:2] + (-1,))
+
+    @property
+    def match_lengths(self) -> np.ndarray:
+        """The match lengths indexed by repetition, player and opponent."""
+        return self._turns.transpose(2, 0, 1)
+
+    def _dot(self, matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+        """Multiply a players x players array by a vector, block by block."""
+        return np.concatenate([np.dot(matrix[block], vector)
+                               for block in self._blocks()])
+
+    def _principal_eigenvector(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Compute the principal eigenvector of a memory mapped matrix, multiplying
+        it by vectors block by block.
+        """
+        operator = LinearOperator(matrix.shape, dtype=float,
+                                  matvec=lambda vector: self._dot(matrix,
+                                                                  vector))
+        eigenvector, eigenvalue = eigen.principal_eigenvector(operator)
+        return eigenvector
+
+    def summarise(self):
+        """
+        Obtain summary of performance of each strategy:
+        ordered by rank, including median normalised score and cooperation
+        rating.
+
+        Output
+        ------
+
+            A list of the form:
+
+            [[player name, median score, cooperation_rating],...]
+
+        """
+        median_scores = np.nanmedian(self.normalised_scores, axis=1)
+        median_wins = np.nanmedian(self.wins, axis=1)
+
+        self.player = namedtuple("Player", ["Rank", "Name", "Median_score",
+                                            "Cooperation_rating", "Wins",
+                                            "Initial_C_rate", "CC_rate",
+                                            "CD_rate", "DC_rate", "DD_rate",
+                                            "CC_to_C_rate", "CD_to_C_rate",
+                                            "DC_to_C_rate", "DD_to_C_rate"])
+
+        state_prob = np.zeros((self.num_players, len(STATE_COLUMNS)))
+        state_to_C_prob = np.zeros((self.num_players, len(STATE_COLUMNS)))
+        for block in self._blocks():
+            counts = self.normalised_state_distribution[block].sum(axis=1)
+            state_prob[block] = _divide(counts,
+                                        counts.sum(axis=1)[:, np.newaxis])
+
+            to_C = self.normalised_state_to_action_distribution[block][:, :,
+                                                                      ::2]
+            state_to_C_prob[block] = _divide(to_C.sum(axis=1),
+                                             (to_C > 0).sum(axis=1))
+
+        summary_data = []
+        for rank, i in enumerate(self.ranking):
+            data = ([self.players[i], median_scores[i],
+                     self.cooperating_rating[i], median_wins[i],
+                     self.initial_cooperation_rate[i]] +
+                    list(state_prob[i]) + list(state_to_C_prob[i]))
+            summary_data.append(self.player(rank, *data))
+
+        return summary_data
+
+    def write_summary(self, filename: str):
+        """
+        Write a csv file containing summary data of the results of the form:
+
+            "Rank", "Name", "Median-score-per-turn", "Cooperation-rating", "Initial_C_Rate", "Wins", "CC-Rate", "CD-Rate", "DC-Rate", "DD-rate","CC-to-C-Rate", "CD-to-C-Rate", "DC-to-C-Rate", "DD-to-C-rate"
+
+
+        Parameters
+        ----------
+            filename : a filepath to which to write the data
+        """
+        summary_data = self.summarise()
+        with open(filename, 'w') as csvfile:
+            writer = csv.writer(csvfile, lineterminator='\n')
+            writer.writerow(self.player._fields)
+            for player in summary_data:
+                writer.writerow(player)
@@ -3,6 +3,8 @@ import copy
 import inspect
 import itertools
 import random
+import uuid
+import weakref
 
 import numpy as np
 
@@ -10,7 +12,7 @@ from axelrod.action import Action
 from .game import DefaultGame
 
 import types
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 C, D = Action.C, Action.D
 
@@ -70,6 +72,96 @@ def update_state_distribution(player, action, reply):
     player.state_distribution[last_turn] += 1
 
 
+class TypeEntry(object):
+    """
+    The integer ID of a strategy configuration, shared by all the players
+    with that configuration.
+
+    Copies of an entry are the entry itself and unpickling an entry looks its
+    name up again in the `type_registry` of the current process.
+    """
+
+    __slots__ = ("type_id", "name", "__weakref__")
+
+    def __init__(self, type_id: int, name: str) -> None:
+        self.type_id = type_id
+        self.name = name
+
+    def __copy__(self) -> "TypeEntry":
+        return self
+
+    def __deepcopy__(self, memo: Dict) -> "TypeEntry":
+        return self
+
+    def __reduce__(self):
+        return _intern_type, (self.name,)
+
+
+class TypeRegistry(object):
+    """
+    Assigns each distinct strategy configuration (the string representation
+    of a player) a compact integer ID.
+
+    IDs are only meaningful within the process that assigned them: each
+    registry has a random token that is stored alongside the cached ID of a
+    player so that IDs of players pickled into another process are looked up
+    again.
+
+    Players hold the entry of their configuration and the registry only
+    references entries weakly, so that the registry only grows with the
+    number of distinct configurations of live players: once no player holds
+    an entry it is forgotten. The IDs returned by `type_id` are kept for the
+    lifetime of the registry. IDs are never reused.
+    """
+
+    def __init__(self) -> None:
+        self.token = uuid.uuid4().hex
+        self._entries = weakref.WeakValueDictionary(
+        )  # type: weakref.WeakValueDictionary
+        self._entries_by_id = weakref.WeakValueDictionary(
+        )  # type: weakref.WeakValueDictionary
+        self._kept = {}  # type: Dict[str, TypeEntry]
+        self._count = itertools.count()
+
+    def entry(self, name: str) -> TypeEntry:
+        """Returns the entry of the name, creating a new one if needed."""
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = TypeEntry(next(self._count), name)
+            self._entries[name] = entry
+            self._entries_by_id[entry.type_id] = entry
+        return entry
+
+    def type_id(self, name: str) -> int:
+        """Returns the ID of the name, assigning a new one if needed."""
+        entry = self._kept.get(name)
+        if entry is None:
+            entry = self._kept[name] = self.entry(name)
+        return entry.type_id
+
+    def name(self, type_id: int) -> str:
+        """Returns the name of the ID."""
+        return self._entries_by_id[type_id].name
+
+    @property
+    def names(self) -> List[str]:
+        """The registered names, in order of ID."""
+        return [self._entries_by_id[type_id].name
+                for type_id in sorted(self._entries_by_id.keys())]
+
+    def __len__(self) -> int:
+        return len(self._entries_by_id)
+
+
+type_registry = TypeRegistry()
+
+
+def _intern_type(name: str) -> TypeEntry:
+    """Returns the entry of a name in the `type_registry`, used to unpickle
+    entries."""
+    return type_registry.entry(name)
+
+
 class Player(object):
     """A class for a player in the tournament.
 
@@ -135,6 +227,10 @@ class Player(object):
         for attribute in set(list(self.__dict__.keys()) +
                              list(other.__dict__.keys())):
 
+            # The cached type ID is derived from the representation
+            if attribute == "_type_id":
+                continue
+
             value = getattr(self, attribute, None)
             other_value = getattr(other, attribute, None)
 
@@ -208,6 +304,17 @@ class Player(object):
             prefix = ', '
         return name
 
+    @property
+    def type_id(self) -> int:
+        """The integer ID of the configuration of the player in the
+        `type_registry`, computed once from its string representation."""
+        cached = self.__dict__.get("_type_id")
+        if cached is not None and cached[0] == type_registry.token:
+            return cached[1].type_id
+        entry = type_registry.entry(str(self))
+        self._type_id = (type_registry.token, entry)
+        return entry.type_id
+
     @staticmethod
     def _add_noise(noise, s1, s2):
         r = random.random()
@@ -243,6 +350,8 @@ class Player(object):
         cls = self.__class__
         new_player = cls(**self.init_kwargs)
         new_player.match_attributes = copy.copy(self.match_attributes)
+        if "_type_id" in self.__dict__:
+            new_player._type_id = self._type_id
         return new_player
 
     def reset(self):
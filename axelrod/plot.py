@@ -22,6 +22,16 @@ def default_cmap(version: str = "2.0") -> str:
     return 'YlGnBu'
 
 
+def reorder(matrix, ordering: List[int]) -> dataType:
+    """
+    Reorders the rows and columns of a players x players matrix (a list of
+    lists or a scipy sparse matrix).
+    """
+    if hasattr(matrix, "tocsr"):
+        return matrix.tocsr()[ordering][:, ordering].toarray().tolist()
+    return [[matrix[r1][r2] for r2 in ordering] for r1 in ordering]
+
+
 class Plot(object):
     def __init__(self, result_set: ResultSet) -> None:
         self.result_set = result_set
@@ -45,6 +55,9 @@ class Plot(object):
         spacing = 4
         positions = spacing * arange(1, self.num_players + 1, 1)
         figure.set_size_inches(width, height)
+        # Players without any interactions (possible in a sparse result set)
+        # are drawn at zero, as in the dense matrices.
+        data = [values if len(values) else [0] for values in data]
         ax.violinplot(data, positions=positions, widths=spacing / 2,
                       showmedians=True, showextrema=False)
         ax.set_xticks(positions)
@@ -146,19 +159,15 @@ class Plot(object):
 
     @property
     def _payoff_dataset(self):
-        pm = self.result_set.payoff_matrix
-        return [[pm[r1][r2]
-                 for r2 in self.result_set.ranking]
-                for r1 in self.result_set.ranking]
+        return reorder(self.result_set.payoff_matrix,
+                       self.result_set.ranking)
 
     @property
     def _pdplot_dataset(self):
         # Order like the sdv_plot
         ordering = self._sd_ordering
-        pdm = self.result_set.payoff_diffs_means
         # Reorder and grab names
-        matrix = [[pdm[r1][r2] for r2 in ordering]
-                  for r1 in ordering]
+        matrix = reorder(self.result_set.payoff_diffs_means, ordering)
         players = self.result_set.players
         ranked_names = [str(players[i]) for i in ordering]
         return matrix, ranked_names
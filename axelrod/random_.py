@@ -45,17 +45,82 @@ def seed(seed_):
 
 
 class Pdf(object):
-    """A class for a probability distribution"""
+    """A class for a probability distribution
+
+    Samples are drawn in constant time with an alias table built when the
+    distribution is created (Vose's alias method).
+    """
     def __init__(self, counter):
         """Take as an instance of collections.counter"""
         self.sample_space, self.counts = zip(*counter.items())
         self.size = len(self.sample_space)
         self.total = sum(self.counts)
         self.probability = list([v / self.total for v in self.counts])
+        self.alias_probability, self.alias = alias_table(self.probability)
+
+    def sample_indices(self, size=None):
+        """Sample indices of the sample space
+
+        Parameters
+        ----------
+        size : int
+            The number of indices to sample. If None a single index is
+            returned.
+        """
+        columns = numpy.random.randint(self.size, size=size)
+        uniform = numpy.random.random(size=size)
+        return numpy.where(uniform < self.alias_probability[columns],
+                           columns, self.alias[columns])
 
-    def sample(self):
-        """Sample from the pdf"""
-        index = numpy.random.choice(a=range(self.size), p=self.probability)
+    def sample(self, size=None):
+        """Sample from the pdf
+
+        Parameters
+        ----------
+        size : int
+            The number of samples to draw. If None a single sample is
+            returned, otherwise a list of samples.
+        """
+        indices = self.sample_indices(size)
         # Numpy cannot sample from a list of n dimensional objects for n > 1,
         # need to sample an index.
-        return self.sample_space[index]
+        if size is None:
+            return self.sample_space[int(indices)]
+        return [self.sample_space[index] for index in indices]
+
+
+def alias_table(probability):
+    """
+    Returns the alias table of a discrete distribution: sampling a column
+    uniformly at random and then either the column, with the probability of
+    the column, or its alias gives a sample of the distribution.
+
+    Parameters
+    ----------
+    probability : list
+        The probabilities of the outcomes, summing to 1
+
+    Returns
+    -------
+    alias_probability : numpy.array
+        The probability of keeping each column
+    alias : numpy.array
+        The alias of each column
+    """
+    size = len(probability)
+    scaled = numpy.array(probability, dtype=float) * size
+    alias_probability = numpy.ones(size)
+    alias = numpy.arange(size)
+    small = [i for i in range(size) if scaled[i] < 1]
+    large = [i for i in range(size) if scaled[i] >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        alias_probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] += scaled[less] - 1
+        if scaled[more] < 1:
+            small.append(more)
+        else:
+            large.append(more)
+    # Any remaining columns are kept with probability 1 (up to rounding)
+    return alias_probability, alias
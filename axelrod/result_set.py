@@ -2,12 +2,14 @@ from collections import namedtuple, Counter
 from multiprocessing import cpu_count
 import csv
 import itertools
+import os
 
 import numpy as np
 import tqdm
 
 import dask as da
 import dask.dataframe as dd
+import pandas as pd
 
 from axelrod.action import Action, str_to_actions
 import axelrod.interaction_utils as iu
@@ -17,6 +19,110 @@ from .game import Game
 
 C, D = Action.C, Action.D
 
+# The columns of an interactions file read to build a result set
+AGGREGATED_COLUMNS = ["Repetition",
+                      "Player index",
+                      "Opponent index",
+                      "Score",
+                      "Turns",
+                      "Score per turn",
+                      "Score difference per turn",
+                      "Win",
+                      "Initial cooperation",
+                      "Cooperation count",
+                      "CC count",
+                      "CD count",
+                      "DC count",
+                      "DD count",
+                      "CC to C count",
+                      "CC to D count",
+                      "CD to C count",
+                      "CD to D count",
+                      "DC to C count",
+                      "DC to D count",
+                      "DD to C count",
+                      "DD to D count",
+                      "Good partner"]
+
+# The largest interactions files (in bytes) analysed by the numpy and pandas
+# backends when no backend is given. Larger files are analysed with dask.
+NUMPY_MAX_FILE_SIZE = 2 ** 20
+PANDAS_MAX_FILE_SIZE = 2 ** 28
+
+
+def choose_backend(filename):
+    """
+    Returns the name of the aggregation backend to use for a given
+    interactions file based on its size.
+
+    The in memory numpy backend has the least overhead and is used for small
+    files, pandas is used for medium sized files and dask (which reads the
+    file in partitions and can use several processes) for files that are too
+    large to comfortably read in to memory.
+
+    The backends sum and average the floating point columns in different
+    orders (numpy adds the rows in the order of the file, pandas uses
+    compensated summation and dask combines partial sums of each partition)
+    so the float attributes of the result sets they build can differ in the
+    last bits. Result sets of the same interactions analysed with different
+    backends should be compared with a tolerance rather than with `==`.
+    """
+    size = os.path.getsize(filename)
+    if size <= NUMPY_MAX_FILE_SIZE:
+        return "numpy"
+    if size <= PANDAS_MAX_FILE_SIZE:
+        return "pandas"
+    return "dask"
+
+
+def _group(keys, values, names, columns, mean=False):
+    """
+    Sums (or averages) the columns of values over the unique rows of keys
+    using numpy.
+
+    The output is the same pandas object as the corresponding pandas groupby
+    operation: a series if `columns` is a string and a data frame otherwise.
+
+    Parameters
+    ----------
+        keys : list
+            A list of integer arrays to group by
+        values : numpy.array
+            The values, with a column for each of columns
+        names : list
+            The names of the keys
+        columns : str or list
+            The names of the columns of values
+        mean : bool
+            Whether to average the values rather than sum them
+    """
+    keys = [np.asarray(key, dtype=np.int64) for key in keys]
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+    dims = tuple(int(key.max()) + 1 if len(key) else 1 for key in keys)
+    unique, inverse = np.unique(np.ravel_multi_index(keys, dims),
+                                return_inverse=True)
+
+    output = np.empty((len(unique), values.shape[1]))
+    for column, column_values in enumerate(values.T):
+        output[:, column] = np.bincount(inverse,
+                                        weights=column_values.astype(float),
+                                        minlength=len(unique))
+    if mean:
+        output /= np.bincount(inverse, minlength=len(unique))[:, np.newaxis]
+    elif np.issubdtype(values.dtype, np.integer):
+        output = output.astype(np.int64)
+
+    if len(keys) == 1:
+        index = pd.Index(unique, name=names[0])
+    else:
+        index = pd.MultiIndex.from_arrays(np.unravel_index(unique, dims),
+                                          names=names)
+    if isinstance(columns, str):
+        return pd.Series(output[:, 0], index=index, name=columns)
+    return pd.DataFrame(output, index=index, columns=columns)
+
 
 def update_progress_bar(method):
     """A decorator to update a progress bar if it exists"""
@@ -39,9 +145,12 @@ class ResultSet():
     by the tournament class.
     """
 
+    # The number of steps of the progress bar (one for each built attribute)
+    _progress_bar_total = 25
+
     def __init__(self, filename,
                  players, repetitions,
-                 processes=None, progress_bar=True):
+                 processes=None, progress_bar=True, backend=None):
         """
         Parameters
         ----------
@@ -54,29 +163,129 @@ class ResultSet():
                 The number of repetitions of each match. If not know will be
                 efficiently read from file.
             processes : integer
-                The number of processes to be used for parallel processing
+                The number of processes used by the dask backend. The numpy
+                and pandas backends aggregate the interactions in memory in
+                the current process and ignore it.
+            progress_bar : bool
+                Whether or not to create a progress bar which will be updated
+            backend : string
+                The library used to aggregate the interactions: "numpy",
+                "pandas" or "dask". If not given this is chosen from the size
+                of the file (see `choose_backend`), so the float attributes
+                of the same tournament may differ in the last bits depending
+                on the size of its interactions file.
         """
+        if backend is None:
+            backend = choose_backend(filename)
+        aggregate = getattr(self, "_aggregate_with_{}".format(backend), None)
+        if aggregate is None:
+            raise ValueError("Unknown backend: {}".format(backend))
+
         self.filename = filename
+        self.backend = backend
         self.players, self.repetitions = players, repetitions
         self.num_players = len(self.players)
 
         if progress_bar:
-            self.progress_bar = tqdm.tqdm(total=25,
+            self.progress_bar = tqdm.tqdm(total=self._progress_bar_total,
                                           desc="Analysing")
 
-        df = dd.read_csv(filename)
-        dask_tasks = self._build_tasks(df)
-
         if processes == 0:
             processes = cpu_count()
 
-        out = self._compute_tasks(tasks=dask_tasks, processes=processes)
+        out = aggregate(filename, processes=processes)
 
+        self._aggregates = out
         self._reshape_out(*out)
 
         if progress_bar:
             self.progress_bar.close()
 
+    @classmethod
+    def _from_aggregates(cls, aggregates, players, repetitions,
+                         progress_bar=True):
+        """
+        Build a result set directly from the aggregated data (as returned by
+        `_compute_tasks`) without reading an interactions file.
+
+        Parameters
+        ----------
+            aggregates : tuple
+                The six pandas objects obtained from the tasks of
+                `_build_tasks`
+            players : list
+                A list of the names of players.
+            repetitions : int
+                The number of repetitions of each match.
+            progress_bar : bool
+                Whether or not to create a progress bar which will be updated
+        """
+        result_set = cls.__new__(cls)
+        result_set.filename = None
+        result_set.players, result_set.repetitions = players, repetitions
+        result_set.num_players = len(players)
+
+        if progress_bar:
+            result_set.progress_bar = tqdm.tqdm(
+                total=cls._progress_bar_total, desc="Analysing")
+
+        result_set._aggregates = tuple(aggregates)
+        result_set._reshape_out(*aggregates)
+
+        if progress_bar:
+            result_set.progress_bar.close()
+        return result_set
+
+    def merge(self, other, axis="repetitions", progress_bar=False):
+        """
+        Combine this result set with the result set of another part of the
+        same tournament, without re-reading any interactions.
+
+        Parameters
+        ----------
+            other : axelrod.ResultSet
+                The result set to merge with. It must have been obtained with
+                the same players.
+            axis : string
+                Either "repetitions": `other` holds further repetitions of the
+                same matches (which are appended after the repetitions of this
+                result set) or "pairs": `other` holds the same number of
+                repetitions of a disjoint set of player pairs (for example
+                another block of edges).
+            progress_bar : bool
+                Whether or not to create a progress bar which will be updated
+
+        Returns
+        -------
+            axelrod.ResultSet
+
+        Note that when merging along "pairs" the normalised scores are
+        recomputed from the score per turn of each match, summed in order of
+        opponent index. If the interactions file of a single tournament lists
+        the matches in another order its normalised scores can differ in the
+        last digits.
+        """
+        if self.players != other.players:
+            raise ValueError("Can only merge result sets with the same players.")
+
+        if axis == "repetitions":
+            aggregates = _merge_repetitions(self._aggregates,
+                                            other._aggregates,
+                                            offset=self.repetitions)
+            repetitions = self.repetitions + other.repetitions
+        elif axis == "pairs":
+            if self.repetitions != other.repetitions:
+                raise ValueError("Can only merge pairs of result sets with "
+                                 "the same number of repetitions.")
+            aggregates = _merge_pairs(self._aggregates, other._aggregates)
+            repetitions = self.repetitions
+        else:
+            raise ValueError("axis must be one of 'repetitions' or 'pairs'.")
+
+        return type(self)._from_aggregates(aggregates, players=self.players,
+                                           repetitions=repetitions,
+                                           progress_bar=progress_bar)
+
     def _reshape_out(self,
                      mean_per_reps_player_opponent_df,
                      sum_per_player_opponent_df,
@@ -474,19 +683,106 @@ class ResultSet():
                                for player in range(self.num_players)]
         return good_partner_rating
 
+    def _aggregate_with_numpy(self, filename, processes=None):
+        """
+        Read the interactions in to memory and aggregate them with numpy.
+        """
+        df = pd.read_csv(filename, usecols=AGGREGATED_COLUMNS)
+        return self._build_arrays(df)
+
+    def _aggregate_with_pandas(self, filename, processes=None):
+        """
+        Read the interactions in to memory and aggregate them with pandas.
+        """
+        df = pd.read_csv(filename, usecols=AGGREGATED_COLUMNS)
+        return self._build_tasks(df)
+
+    def _aggregate_with_dask(self, filename, processes=None):
+        """
+        Aggregate the interactions with dask, reading the file in partitions.
+        """
+        df = dd.read_csv(filename, usecols=AGGREGATED_COLUMNS)
+        dask_tasks = self._build_tasks(df)
+        return self._compute_tasks(tasks=dask_tasks, processes=processes)
+
     def _compute_tasks(self, tasks, processes):
         """
         Compute all dask tasks
         """
         if processes is None:
-            out = da.compute(*tasks, get=da.get)
+            out = da.compute(*tasks, scheduler="synchronous")
         else:
-            out = da.compute(*tasks, num_workers=processes)
+            out = da.compute(*tasks, scheduler="processes",
+                             num_workers=processes)
         return out
 
+    def _build_arrays(self, df):
+        """
+        Returns the same tuple of aggregates as the tasks of `_build_tasks`
+        computed with numpy rather than pandas groupby operations.
+        """
+        repetition = df["Repetition"].values
+        player = df["Player index"].values
+        opponent = df["Opponent index"].values
+
+        groups = ["Repetition", "Player index", "Opponent index"]
+        columns = ["Turns", "Score per turn", "Score difference per turn"]
+        mean_per_reps_player_opponent_df = _group(
+            [repetition, player, opponent], df[columns].values, groups,
+            columns, mean=True)
+
+        groups = ["Player index", "Opponent index"]
+        columns = ["Cooperation count",
+                   "CC count",
+                   "CD count",
+                   "DC count",
+                   "DD count",
+                   "CC to C count",
+                   "CC to D count",
+                   "CD to C count",
+                   "CD to D count",
+                   "DC to C count",
+                   "DC to D count",
+                   "DD to C count",
+                   "DD to D count",
+                   "Good partner"]
+        sum_per_player_opponent_df = _group(
+            [player, opponent], df[columns].values, groups, columns)
+
+        ignore_self_interactions = player != opponent
+        adf = df[ignore_self_interactions]
+        repetition = repetition[ignore_self_interactions]
+        player = player[ignore_self_interactions]
+
+        groups = ["Player index", "Repetition"]
+        columns = ["Win", "Score"]
+        sum_per_player_repetition_df = _group(
+            [player, repetition], adf[columns].values, groups, columns)
+
+        column = "Score per turn"
+        normalised_scores_series = _group(
+            [player, repetition], adf[column].values, groups, column,
+            mean=True)
+
+        groups = ["Player index"]
+        column = "Initial cooperation"
+        initial_cooperation_count_series = _group(
+            [player], adf[column].values, groups, column)
+        column = "Player index"
+        interactions_count_series = _group(
+            [player], np.ones(len(player), dtype=np.int64), groups, column)
+
+        return (mean_per_reps_player_opponent_df,
+                sum_per_player_opponent_df,
+                sum_per_player_repetition_df,
+                normalised_scores_series,
+                initial_cooperation_count_series,
+                interactions_count_series)
+
     def _build_tasks(self, df):
         """
-        Returns a tuple of dask tasks
+        Returns a tuple of dask tasks (or of the computed pandas objects if df
+        is a pandas data frame)
         """
         groups = ["Repetition", "Player index", "Opponent index"]
         columns = ["Turns", "Score per turn", "Score difference per turn"]
@@ -538,6 +834,9 @@ class ResultSet():
         """
         Check equality of results set
 
+        The float attributes are compared exactly so result sets built with
+        different backends may not be equal (see `choose_backend`).
+
         Parameters
         ----------
 
@@ -601,6 +900,25 @@ class ResultSet():
                                             "CC_to_C_rate", "CD_to_C_rate",
                                             "DC_to_C_rate", "DD_to_C_rate"])
 
+        state_prob = self._summarise_state_prob()
+        state_to_C_prob = self._summarise_state_to_C_prob()
+
+        summary_measures = list(zip(self.players, median_scores,
+                                    self.cooperating_rating, median_wins,
+                                    self.initial_cooperation_rate))
+
+        summary_data = []
+        for rank, i in enumerate(self.ranking):
+            data = list(summary_measures[i]) + state_prob[i] + state_to_C_prob[i]
+            summary_data.append(self.player(rank, *data))
+
+        return summary_data
+
+    def _summarise_state_prob(self):
+        """
+        Returns a list (for each player) of the probabilities of each state,
+        as used by `summarise`.
+        """
         states = [(C, C), (C, D), (D, C), (D, D)]
         state_prob = []
         for i, player in enumerate(self.normalised_state_distribution):
@@ -613,7 +931,14 @@ class ResultSet():
             except ZeroDivisionError:
                 counts = [0 for c in counts]
             state_prob.append(counts)
+        return state_prob
 
+    def _summarise_state_to_C_prob(self):
+        """
+        Returns a list (for each player) of the mean probabilities of
+        cooperating after each state, as used by `summarise`.
+        """
+        states = [(C, C), (C, D), (D, C), (D, D)]
         state_to_C_prob = []
         for player in self.normalised_state_to_action_distribution:
             rates = []
@@ -628,17 +953,7 @@ class ResultSet():
 
                 rates.append(rate)
             state_to_C_prob.append(rates)
-
-        summary_measures = list(zip(self.players, median_scores,
-                                    self.cooperating_rating, median_wins,
-                                    self.initial_cooperation_rate))
-
-        summary_data = []
-        for rank, i in enumerate(self.ranking):
-            data = list(summary_measures[i]) + state_prob[i] + state_to_C_prob[i]
-            summary_data.append(self.player(rank, *data))
-
-        return summary_data
+        return state_to_C_prob
 
     def write_summary(self, filename):
         """
@@ -659,6 +974,146 @@ class ResultSet():
                 writer.writerow(player)
 
 
+def combine(result_sets, axis="repetitions", progress_bar=False):
+    """
+    Merge a sequence of result sets (for example the shards of a tournament
+    played on different machines) into a single result set.
+
+    Parameters
+    ----------
+        result_sets : iterable
+            The axelrod.ResultSet objects to combine, in order.
+        axis : string
+            The axis along which to combine: see `ResultSet.merge`.
+        progress_bar : bool
+            Whether or not to create a progress bar for the final result set
+
+    Returns
+    -------
+        axelrod.ResultSet
+    """
+    result_sets = list(result_sets)
+    if not result_sets:
+        raise ValueError("At least one result set is required.")
+
+    merged = result_sets[0]
+    for index, result_set in enumerate(result_sets[1:], start=2):
+        merged = merged.merge(
+            result_set, axis=axis,
+            progress_bar=progress_bar and index == len(result_sets))
+    return merged
+
+
+def _shift_repetitions(aggregate, offset):
+    """Offset the "Repetition" level of the index of a pandas object."""
+    names = aggregate.index.names
+    frame = aggregate.reset_index()
+    frame["Repetition"] += offset
+    shifted = frame.set_index(names)
+    if isinstance(aggregate, pd.Series):
+        shifted = shifted[aggregate.name]
+    return shifted
+
+
+def _concatenate(aggregate, other):
+    """Concatenate two pandas objects with disjoint indices."""
+    return pd.concat([aggregate, other]).sort_index()
+
+
+def _add(aggregate, other):
+    """Add two pandas objects, treating missing entries as zeros."""
+    total = aggregate.add(other, fill_value=0)
+    if isinstance(total, pd.Series):
+        return total.astype(aggregate.dtype)
+    return total.astype(aggregate.dtypes.to_dict())
+
+
+def _merge_repetitions(aggregates, other_aggregates, offset):
+    """
+    Combine the aggregates of two result sets holding distinct repetitions of
+    the same matches.
+    """
+    (mean_per_reps_player_opponent_df,
+     sum_per_player_opponent_df,
+     sum_per_player_repetition_df,
+     normalised_scores_series,
+     initial_cooperation_count_series,
+     interactions_count_series) = aggregates
+
+    (other_mean_per_reps_player_opponent_df,
+     other_sum_per_player_opponent_df,
+     other_sum_per_player_repetition_df,
+     other_normalised_scores_series,
+     other_initial_cooperation_count_series,
+     other_interactions_count_series) = other_aggregates
+
+    return (_concatenate(mean_per_reps_player_opponent_df,
+                         _shift_repetitions(
+                             other_mean_per_reps_player_opponent_df, offset)),
+            _add(sum_per_player_opponent_df, other_sum_per_player_opponent_df),
+            _concatenate(sum_per_player_repetition_df,
+                         _shift_repetitions(
+                             other_sum_per_player_repetition_df, offset)),
+            _concatenate(normalised_scores_series,
+                         _shift_repetitions(
+                             other_normalised_scores_series, offset)),
+            _add(initial_cooperation_count_series,
+                 other_initial_cooperation_count_series),
+            _add(interactions_count_series, other_interactions_count_series))
+
+
+def _merge_pairs(aggregates, other_aggregates):
+    """
+    Combine the aggregates of two result sets holding the same repetitions of
+    disjoint sets of matches.
+    """
+    (mean_per_reps_player_opponent_df,
+     sum_per_player_opponent_df,
+     sum_per_player_repetition_df,
+     _,
+     initial_cooperation_count_series,
+     interactions_count_series) = aggregates
+
+    (other_mean_per_reps_player_opponent_df,
+     other_sum_per_player_opponent_df,
+     other_sum_per_player_repetition_df,
+     _,
+     other_initial_cooperation_count_series,
+     other_interactions_count_series) = other_aggregates
+
+    overlap = sum_per_player_opponent_df.index.intersection(
+        other_sum_per_player_opponent_df.index)
+    if len(overlap) > 0:
+        raise ValueError("Can only merge result sets with disjoint pairs of "
+                         "players. Common pairs: {}".format(list(overlap)))
+
+    mean_per_reps_player_opponent_df = _concatenate(
+        mean_per_reps_player_opponent_df,
+        other_mean_per_reps_player_opponent_df)
+
+    # Every (repetition, player, opponent) triplet corresponds to a single
+    # interaction so the normalised scores are the means over opponents. They
+    # are summed and divided once by `_group` (as the numpy backend does)
+    # rather than with a pandas mean, which uses compensated summation.
+    df = mean_per_reps_player_opponent_df.reset_index()
+    df = df[df["Player index"] != df["Opponent index"]]
+    groups = ["Player index", "Repetition"]
+    column = "Score per turn"
+    normalised_scores_series = _group(
+        [df["Player index"].values, df["Repetition"].values],
+        df[column].values, groups, column, mean=True)
+
+    return (mean_per_reps_player_opponent_df,
+            _concatenate(sum_per_player_opponent_df,
+                         other_sum_per_player_opponent_df),
+            _add(sum_per_player_repetition_df,
+                 other_sum_per_player_repetition_df),
+            normalised_scores_series,
+            _add(initial_cooperation_count_series,
+                 other_initial_cooperation_count_series),
+            _add(interactions_count_series, other_interactions_count_series))
+
+
 def create_counter_dict(df, player_index, opponent_index, key_map):
     """
     Create a Counter object mapping states (corresponding to columns of df) for
@@ -0,0 +1,322 @@
+"""
+A result set for tournaments in which only some pairs of players interact (for
+example spatial tournaments built with `edges`).
+
+All data is stored against the (player, opponent) edges, in the compressed
+sparse row order, so that memory use and computation time scale with the number
+of edges rather than with the square of the number of players.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator
+
+from . import eigen
+from .out_of_core import STATE_COLUMNS, STATE_TO_ACTION_COLUMNS, _divide
+from .result_set import ResultSet, update_progress_bar
+
+
+class SparseResultSet(ResultSet):
+    """
+    A class to hold the results of a tournament, indexed by edges. Reads in a
+    CSV file produced by the tournament class.
+
+    The edges (including self interactions) are the rows of `edges`, sorted
+    by player and then by opponent, and `indptr` gives the position of the
+    first edge of each player (as for a `scipy.sparse.csr_matrix`). The
+    attributes have the same meaning as those of `axelrod.ResultSet` but:
+
+    - `edge_payoffs`, `edge_score_diffs` and `edge_match_lengths` are arrays
+      of shape (edges, repetitions). The payoffs of repetitions that were not
+      played are `nan`.
+    - `payoffs` and `score_diffs` are lists, for each player, of the rows of
+      the corresponding edge arrays for that player. Similarly `match_lengths`
+      is a list, for each repetition, of lists of arrays for each player.
+    - The players x players matrices (`payoff_matrix`, `cooperation`,
+      `normalised_cooperation`...) are `scipy.sparse.csr_matrix` objects
+      whose stored entries correspond to `edges`. Entries of
+      `vengeful_cooperation` that are not stored are -1.
+    - The state and state to action distributions are arrays of shape
+      (edges, 4) and (edges, 8) ordered as `STATE_COLUMNS` and
+      `STATE_TO_ACTION_COLUMNS`.
+    - The remaining attributes are numpy arrays.
+    """
+
+    _progress_bar_total = 14
+
+    def _reshape_out(self,
+                     mean_per_reps_player_opponent_df,
+                     sum_per_player_opponent_df,
+                     sum_per_player_repetition_df,
+                     normalised_scores_series,
+                     initial_cooperation_count_series,
+                     interactions_count_series):
+        """
+        Reshape the various pandas series objects to arrays indexed by edges
+        and set the corresponding attributes.
+        """
+        self._build_edges(sum_per_player_opponent_df.index)
+        self._build_edge_repetition_arrays(mean_per_reps_player_opponent_df)
+
+        self.wins = self._build_player_repetition_array(
+            sum_per_player_repetition_df["Win"])
+        self.scores = self._build_player_repetition_array(
+            sum_per_player_repetition_df["Score"])
+        self.normalised_scores = self._build_player_repetition_array(
+            normalised_scores_series)
+
+        self._build_edge_sums(sum_per_player_opponent_df)
+        self._build_player_sums(initial_cooperation_count_series,
+                                interactions_count_series)
+        self._build_payoff_matrices()
+        self._build_cooperation_matrices()
+        self._build_state_distributions()
+        self.ranking = self._build_ranking()
+        self.ranked_names = self._build_ranked_names()
+        self.eigenjesus_rating = self._build_eigenjesus_rating()
+        self.eigenmoses_rating = self._build_eigenmoses_rating()
+
+    def _edge_index(self, players: np.ndarray,
+                    opponents: np.ndarray) -> np.ndarray:
+        """Returns the position in `edges` of the given pairs of players."""
+        return np.asarray(np.searchsorted(
+            self._keys, players * self.num_players + opponents))
+
+    def _split(self, array: np.ndarray) -> list:
+        """Split an array indexed by edges into one view per player."""
+        return np.split(array, self.indptr[1:-1])
+
+    def _csr_matrix(self, data: np.ndarray) -> csr_matrix:
+        """Returns a players x players matrix with the given edge values."""
+        return csr_matrix((data, self.edges[:, 1], self.indptr),
+                          shape=(self.num_players, self.num_players))
+
+    @staticmethod
+    def _levels(index) -> list:
+        """Returns the values of each level of a pandas (multi) index."""
+        return [index.get_level_values(level).values
+                for level in range(index.nlevels)]
+
+    @update_progress_bar
+    def _build_edges(self, index):
+        players, opponents = self._levels(index)
+        keys = np.unique(players * self.num_players + opponents)
+        self._keys = keys
+        self.edges = np.column_stack([keys // self.num_players,
+                                      keys % self.num_players])
+        self.indptr = np.concatenate(
+            [[0], np.cumsum(np.bincount(self.edges[:, 0],
+                                        minlength=self.num_players))])
+        self._self_interactions = self.edges[:, 0] == self.edges[:, 1]
+
+    @update_progress_bar
+    def _build_edge_repetition_arrays(self, mean_per_reps_player_opponent_df):
+        repetitions, players, opponents = self._levels(
+            mean_per_reps_player_opponent_df.index)
+        position = (self._edge_index(players, opponents), repetitions)
+        shape = (len(self.edges), self.repetitions)
+
+        self.edge_payoffs = np.full(shape, np.nan)
+        self.edge_payoffs[position] = mean_per_reps_player_opponent_df[
+            "Score per turn"].values
+        self.edge_score_diffs = np.zeros(shape)
+        self.edge_score_diffs[position] = mean_per_reps_player_opponent_df[
+            "Score difference per turn"].values
+        self.edge_match_lengths = np.zeros(shape)
+        self.edge_match_lengths[position] = mean_per_reps_player_opponent_df[
+            "Turns"].values
+
+        self.payoffs = self._split(self.edge_payoffs)
+        self.score_diffs = self._split(self.edge_score_diffs)
+        self.match_lengths = [self._split(lengths)
+                              for lengths in self.edge_match_lengths.T]
+
+    @update_progress_bar
+    def _build_player_repetition_array(self, series):
+        players, repetitions = self._levels(series.index)
+        array = np.zeros((self.num_players, self.repetitions),
+                         dtype=series.dtype)
+        array[players, repetitions] = series.values
+        return array
+
+    def _player_array(self, series):
+        """Returns an array indexed by players from a pandas series."""
+        array = np.zeros(self.num_players, dtype=series.dtype)
+        array[series.index.values] = series.values
+        return array
+
+    @update_progress_bar
+    def _build_edge_sums(self, sum_per_player_opponent_df):
+        players, opponents = self._levels(sum_per_player_opponent_df.index)
+        position = self._edge_index(players, opponents)
+
+        def edge_values(columns):
+            values = np.zeros((len(self.edges), len(columns)), dtype=np.int64)
+            values[position] = sum_per_player_opponent_df[columns].values
+            return values
+
+        # Self interactions are counted twice in the interactions file.
+        cooperation = edge_values(["Cooperation count"])[:, 0]
+        cooperation[self._self_interactions] //= 2
+        self._edge_cooperation = cooperation
+
+        good_partner = edge_values(["Good partner"])[:, 0]
+        good_partner[self._self_interactions] = 0
+        self._edge_good_partner = good_partner
+
+        self.state_distribution = edge_values(STATE_COLUMNS)
+        self.state_to_action_distribution = edge_values(
+            STATE_TO_ACTION_COLUMNS)
+        for distribution in [self.state_distribution,
+                             self.state_to_action_distribution]:
+            distribution[self._self_interactions] = 0
+
+    @update_progress_bar
+    def _build_player_sums(self, initial_cooperation_count_series,
+                           interactions_count_series):
+        self.initial_cooperation_count = self._player_array(
+            initial_cooperation_count_series)
+        interactions = self._player_array(interactions_count_series)
+        self.initial_cooperation_rate = _divide(
+            self.initial_cooperation_count, interactions)
+
+        self.good_partner_matrix = self._csr_matrix(self._edge_good_partner)
+        self.good_partner_rating = (
+            np.bincount(self.edges[:, 0], weights=self._edge_good_partner,
+                        minlength=self.num_players) /
+            np.maximum(1, interactions))
+
+    @update_progress_bar
+    def _build_payoff_matrices(self):
+        played = ~np.isnan(self.edge_payoffs)
+        number_played = played.sum(axis=1)
+        payoffs = np.where(played, self.edge_payoffs, 0)
+        means = _divide(payoffs.sum(axis=1), number_played)
+        deviations = np.where(played, payoffs - means[:, np.newaxis], 0)
+        stddevs = np.sqrt(_divide((deviations ** 2).sum(axis=1),
+                                  number_played))
+
+        self.payoff_matrix = self._csr_matrix(means)
+        self.payoff_stddevs = self._csr_matrix(stddevs)
+        self.payoff_diffs_means = self._csr_matrix(
+            self.edge_score_diffs.mean(axis=1))
+
+    @update_progress_bar
+    def _build_cooperation_matrices(self):
+        lengths = self.edge_match_lengths.sum(axis=1)
+        normalised_cooperation = _divide(self._edge_cooperation, lengths)
+
+        self.cooperation = self._csr_matrix(self._edge_cooperation)
+        self.normalised_cooperation = self._csr_matrix(normalised_cooperation)
+        self.vengeful_cooperation = self._csr_matrix(
+            2 * (normalised_cooperation - 0.5))
+
+        not_self = ~self._self_interactions
+        players = self.edges[not_self, 0]
+        cooperation = np.bincount(players,
+                                  weights=self._edge_cooperation[not_self],
+                                  minlength=self.num_players)
+        lengths = np.bincount(players, weights=lengths[not_self],
+                              minlength=self.num_players)
+        # Max is to deal with edge cases of matches that have no turns
+        self.cooperating_rating = cooperation / np.maximum(1, lengths)
+
+    @update_progress_bar
+    def _build_state_distributions(self):
+        self.normalised_state_distribution = _divide(
+            self.state_distribution,
+            self.state_distribution.sum(axis=1)[:, np.newaxis])
+
+        shape = (len(self.edges), len(STATE_COLUMNS), 2)
+        state_to_action = self.state_to_action_distribution.reshape(shape)
+        self.normalised_state_to_action_distribution = _divide(
+            state_to_action,
+            state_to_action.sum(axis=2)[:, :, np.newaxis]).reshape(
+                len(self.edges), -1)
+
+    @update_progress_bar
+    def _build_ranking(self):
+        medians = np.nanmedian(self.normalised_scores, axis=1)
+        return sorted(range(self.num_players), key=lambda i: -medians[i])
+
+    @update_progress_bar
+    def _build_eigenjesus_rating(self):
+        """
+        Returns:
+        --------
+
+        The eigenjesus rating as defined in:
+        http://www.scottaaronson.com/morality.pdf
+        """
+        eigenvector, eigenvalue = eigen.principal_eigenvector(
+            self.normalised_cooperation)
+        return eigenvector
+
+    @update_progress_bar
+    def _build_eigenmoses_rating(self):
+        """
+        Returns:
+        --------
+
+        The eigenmoses rating as defined in:
+        http://www.scottaaronson.com/morality.pdf
+
+        The vengeful cooperation of pairs of players that have not interacted
+        is -1 so the matrix is applied as 2 * normalised_cooperation - 1
+        without being made dense.
+        """
+        normalised_cooperation = self.normalised_cooperation
+
+        def matvec(vector):
+            vector = np.ravel(vector)
+            return 2 * normalised_cooperation.dot(vector) - vector.sum()
+
+        operator = LinearOperator(normalised_cooperation.shape, matvec=matvec,
+                                  dtype=float)
+        eigenvector, eigenvalue = eigen.principal_eigenvector(operator)
+        return eigenvector
+
+    def _summarise_state_prob(self):
+        counts = np.zeros((self.num_players, len(STATE_COLUMNS)))
+        np.add.at(counts, self.edges[:, 0], self.normalised_state_distribution)
+        return _divide(counts, counts.sum(axis=1)[:, np.newaxis]).tolist()
+
+    def _summarise_state_to_C_prob(self):
+        to_C = self.normalised_state_to_action_distribution[:, ::2]
+        totals = np.zeros((self.num_players, len(STATE_COLUMNS)))
+        counts = np.zeros((self.num_players, len(STATE_COLUMNS)))
+        np.add.at(totals, self.edges[:, 0], to_C)
+        np.add.at(counts, self.edges[:, 0], to_C > 0)
+        return _divide(totals, counts).tolist()
+
+    def __eq__(self, other):
+        """
+        Check equality of results set
+
+        Parameters
+        ----------
+
+            other : axelrod.SparseResultSet
+                Another results set against which to check equality
+        """
+        if not np.array_equal(self.edges, other.edges):
+            return False
+
+        def equal(array, other_array):
+            if hasattr(array, "data"):
+                array, other_array = array.data, other_array.data
+            array, other_array = np.asarray(array), np.asarray(other_array)
+            both_nan = np.isnan(array) & np.isnan(other_array)
+            return (array.shape == other_array.shape and
+                    bool(np.all((array == other_array) | both_nan)))
+
+        attributes = ["wins", "scores", "normalised_scores",
+                      "edge_match_lengths", "edge_payoffs", "edge_score_diffs",
+                      "payoff_matrix", "payoff_stddevs", "payoff_diffs_means",
+                      "cooperation", "normalised_cooperation",
+                      "vengeful_cooperation", "cooperating_rating",
+                      "good_partner_matrix", "good_partner_rating",
+                      "eigenmoses_rating", "eigenjesus_rating"]
+        return (self.ranking == other.ranking and
+                self.ranked_names == other.ranked_names and
+                all(equal(getattr(self, attribute), getattr(other, attribute))
+                    for attribute in attributes))
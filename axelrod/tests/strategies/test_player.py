@@ -1,4 +1,7 @@
+import copy
+import gc
 import itertools
+import pickle
 import random
 import types
 import unittest
@@ -9,7 +12,10 @@ from hypothesis.strategies import integers
 
 import axelrod
 from axelrod import DefaultGame, Player
-from axelrod.player import get_state_distribution_from_history, update_history
+from axelrod.player import (
+    get_state_distribution_from_history, update_history, type_registry,
+    TypeRegistry)
+from axelrod.strategy_transformers import DualTransformer
 from axelrod.tests.property import strategy_lists
 
 
@@ -163,6 +169,87 @@ class TestPlayerClass(unittest.TestCase):
             self.assertEqual(len(player1.history), turns)
             self.assertEqual(player1.history, player2.history)
 
+    def test_type_id(self):
+        p1 = axelrod.GTFT(p=0.1)
+        p2 = axelrod.GTFT(p=0.1)
+        p3 = axelrod.GTFT(p=0.2)
+        self.assertEqual(p1.type_id, p2.type_id)
+        self.assertNotEqual(p1.type_id, p3.type_id)
+        self.assertEqual(type_registry.name(p1.type_id), str(p1))
+        self.assertEqual(type_registry.name(p3.type_id), str(p3))
+
+    def test_type_id_is_kept_by_clone_and_reset(self):
+        player = axelrod.GoByMajority(memory_depth=5)
+        type_id = player.type_id
+        self.assertEqual(player.clone().type_id, type_id)
+        player.reset()
+        self.assertEqual(player.type_id, type_id)
+
+    def test_type_id_does_not_change_equality(self):
+        p1 = axelrod.Cooperator()
+        p2 = axelrod.Cooperator()
+        p1.type_id
+        self.assertEqual(p1, p2)
+        self.assertEqual(p2, p1)
+
+    def test_type_id_from_another_registry_is_recomputed(self):
+        player = axelrod.TitForTat()
+        type_id = player.type_id
+        # The clone keeps the entry of the configuration alive
+        clone = player.clone()
+        player._type_id = ("another process", type_id + 1)
+        self.assertEqual(player.type_id, type_id)
+
+    def test_type_registry(self):
+        registry = TypeRegistry()
+        self.assertEqual(len(registry), 0)
+        self.assertEqual(registry.type_id("Cooperator"), 0)
+        self.assertEqual(registry.type_id("Defector"), 1)
+        self.assertEqual(registry.type_id("Cooperator"), 0)
+        self.assertEqual(registry.name(1), "Defector")
+        self.assertEqual(registry.names, ["Cooperator", "Defector"])
+        self.assertEqual(len(registry), 2)
+        self.assertNotEqual(registry.token, type_registry.token)
+
+    def test_type_registry_forgets_unused_entries(self):
+        registry = TypeRegistry()
+        registry.type_id("Cooperator")
+        entry = registry.entry("Transient")
+        self.assertIs(registry.entry("Transient"), entry)
+        self.assertEqual(registry.name(entry.type_id), "Transient")
+        self.assertEqual(len(registry), 2)
+
+        type_id = entry.type_id
+        del entry
+        gc.collect()
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(registry.names, ["Cooperator"])
+        with self.assertRaises(KeyError):
+            registry.name(type_id)
+        # IDs are not reused
+        self.assertGreater(registry.type_id("Transient"), type_id)
+
+    def test_type_registry_is_bounded_by_live_players(self):
+        length = len(type_registry)
+        players = [axelrod.GoByMajority(memory_depth=1000 + i)
+                   for i in range(10)]
+        for player in players:
+            player.type_id
+        self.assertEqual(len(type_registry), length + 10)
+        del players, player
+        gc.collect()
+        self.assertEqual(len(type_registry), length)
+
+    def test_type_id_is_shared_by_classes_with_the_same_name(self):
+        first = DualTransformer()(axelrod.TitForTat)
+        second = DualTransformer()(axelrod.TitForTat)
+        self.assertIsNot(first, second)
+        player = first()
+        self.assertEqual(player.type_id, second().type_id)
+        self.assertEqual(pickle.loads(pickle.dumps(player)).type_id,
+                         player.type_id)
+        self.assertEqual(copy.deepcopy(player).type_id, player.type_id)
+
     def test_equality(self):
         """Test the equality method for some bespoke cases"""
         # Check repr
@@ -1,7 +1,10 @@
 """Tests for the Ecosystem class."""
 
+import math
 import unittest
 
+import numpy as np
+
 import axelrod
 
 
@@ -94,3 +97,64 @@ class TestEcosystem(unittest.TestCase):
         self.assertAlmostEqual(last[1], 0.0)
         self.assertAlmostEqual(last[2], 0.0)
         self.assertAlmostEqual(last[3], 1.0)
+
+    def test_reproduce_with_fitness(self):
+        eco = axelrod.Ecosystem(self.res_defector_wins, fitness=math.exp)
+        eco.reproduce(10)
+        self.assertEqual(len(eco.population_sizes), 11)
+        self.assertGreater(eco.population_sizes[-1][3], 0.25)
+
+    def test_reproduce_batch(self):
+        eco = axelrod.Ecosystem(self.res_defector_wins)
+        populations = eco.reproduce_batch(50, repetitions=3)
+        self.assertEqual(populations.shape, (51, 3, 4))
+        self.assertTrue(np.allclose(populations.sum(axis=2), 1))
+        self.assertTrue(np.allclose(populations[0], 0.25))
+        self.assertTrue(np.all(populations[-1, :, 3] > 0.99))
+        # The ecosystem is not modified
+        self.assertEqual(len(eco.population_sizes), 1)
+
+        populations = eco.reproduce_batch(
+            5, populations=[[1, 1, 1, 1], [0, 0, 1, 3]])
+        self.assertEqual(populations.shape, (6, 2, 4))
+        self.assertTrue(np.allclose(populations[0, 1], [0, 0, .25, .75]))
+        self.assertTrue(np.allclose(populations[:, 1, :2], 0))
+
+    def test_reproduce_batch_is_independent(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()]
+        results = axelrod.Tournament(players, turns=10, noise=0.2).play(
+            progress_bar=False)
+        eco = axelrod.Ecosystem(results)
+        populations = eco.reproduce_batch(5, repetitions=2)
+        self.assertFalse(np.allclose(populations[-1, 0],
+                                     populations[-1, 1]))
+
+    def test_reproduce_batch_with_invalid_populations(self):
+        eco = axelrod.Ecosystem(self.res_cooperators)
+        self.assertRaises(TypeError, eco.reproduce_batch, 5,
+                          populations=[[1, 1, 1]])
+        self.assertRaises(TypeError, eco.reproduce_batch, 5,
+                          populations=[[1, 1, -1, 1]])
+
+    def test_replicator(self):
+        eco = axelrod.Ecosystem(self.res_defector_wins)
+        eco.reproduce(1000, replicator=True)
+        pops = eco.population_sizes
+        # Stops early once the populations have converged
+        self.assertLess(len(pops), 1001)
+        for p in pops:
+            self.assertEqual(len(p), 4)
+            self.assertAlmostEqual(sum(p), 1.0)
+        self.assertAlmostEqual(pops[-1][3], 1.0)
+
+        eco = axelrod.Ecosystem(self.res_defector_wins)
+        eco.reproduce(5, replicator=True)
+        self.assertEqual(len(eco.population_sizes), 6)
+        self.assertGreater(eco.population_sizes[-1][3],
+                           eco.population_sizes[1][3])
+
+    def test_replicator_stable_population(self):
+        eco = axelrod.Ecosystem(self.res_cooperators)
+        eco.reproduce(100, replicator=True)
+        self.assertEqual(eco.population_sizes, [[0.25] * 4])
@@ -4,8 +4,12 @@ import unittest
 
 import numpy
 from numpy.testing import assert_array_almost_equal
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import aslinearoperator
 
-from axelrod.eigen import normalise, principal_eigenvector
+import axelrod
+from axelrod.eigen import (normalise, principal_eigenvector,
+                           principal_eigenvectors, RatingEngine)
 
 
 class FunctionCases(unittest.TestCase):
@@ -43,3 +47,105 @@ class FunctionCases(unittest.TestCase):
         self.assertAlmostEqual(evalue, 3, places=3)
         assert_array_almost_equal(evector, numpy.dot(mat, evector) / evalue)
         assert_array_almost_equal(evector, normalise([0, 0, 0, 1]), decimal=4)
+
+    def test_eigenvalue_is_a_float(self):
+        for mat in ([[2, 1], [1, 2]], numpy.array([[2, 1], [1, 2]]),
+                    numpy.matrix([[2, 1], [1, 2]])):
+            _, evalue = principal_eigenvector(mat)
+            self.assertIsInstance(evalue, float)
+
+    def test_sparse_and_operator(self):
+        mat = numpy.array([[1, 2, 0], [-2, 1, 2], [1, 3, 1]])
+        expected, expected_value = principal_eigenvector(mat)
+        for operand in (csr_matrix(mat), aslinearoperator(mat)):
+            evector, evalue = principal_eigenvector(operand)
+            assert_array_almost_equal(evector, expected)
+            self.assertAlmostEqual(evalue, expected_value)
+
+    def test_warm_start(self):
+        mat = [[1, 2, 0], [-2, 1, 2], [1, 3, 1]]
+        expected = normalise(numpy.array([0.5, 0.5, 1]))
+        evector, evalue = principal_eigenvector(mat, maximum_iterations=0,
+                                                initial=expected)
+        assert_array_almost_equal(evector, expected)
+        self.assertAlmostEqual(evalue, 3)
+
+    def test_arpack(self):
+        numpy.random.seed(0)
+        mat = numpy.random.random((50, 50))
+        evector, evalue = principal_eigenvector(mat, method='arpack')
+        assert_array_almost_equal(numpy.dot(mat, evector), evalue * evector)
+        self.assertTrue(numpy.all(evector > 0))
+        power_evector, _ = principal_eigenvector(mat, max_error=1e-12)
+        assert_array_almost_equal(evector, power_evector)
+
+        evector, evalue = principal_eigenvector(csr_matrix(mat),
+                                                method='auto')
+        assert_array_almost_equal(evector, power_evector, decimal=3)
+
+        # Matrices too small for ARPACK
+        evector, evalue = principal_eigenvector([[2, 1], [1, 2]],
+                                                method='arpack')
+        self.assertAlmostEqual(evalue, 3)
+        assert_array_almost_equal(evector, normalise([1, 1]))
+
+    def test_invalid_method(self):
+        with self.assertRaises(ValueError):
+            principal_eigenvector([[1]], method='lanczos')
+
+    def test_batch(self):
+        matrices = [[[2, 0, 0], [0, 1, 0], [0, 0, 1]],
+                    [[1, 2, 0], [-2, 1, 2], [1, 3, 1]],
+                    numpy.identity(3)]
+        evectors, evalues = principal_eigenvectors(matrices)
+        self.assertEqual(evectors.shape, (3, 3))
+        for mat, evector, evalue in zip(matrices, evectors, evalues):
+            expected, expected_value = principal_eigenvector(mat)
+            assert_array_almost_equal(evector, expected)
+            self.assertAlmostEqual(evalue, expected_value)
+
+
+class TestRatingEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat(), axelrod.Grudger()]
+        cls.result_sets = [
+            axelrod.Tournament(players, turns=10, repetitions=2,
+                               noise=noise).play(progress_bar=False)
+            for noise in (0, 0.1, 0.2)]
+
+    def test_rate(self):
+        engine = RatingEngine(warm_start=False)
+        eigenjesus, eigenmoses = engine.rate(self.result_sets)
+        self.assertEqual(eigenjesus.shape, (3, 4))
+        for result_set, jesus, moses in zip(self.result_sets, eigenjesus,
+                                            eigenmoses):
+            assert_array_almost_equal(jesus, result_set.eigenjesus_rating)
+            assert_array_almost_equal(moses, result_set.eigenmoses_rating)
+
+    def test_warm_start(self):
+        engine = RatingEngine(max_error=1e-10)
+        mat = [[1, 2, 0], [-2, 1, 2], [1, 3, 1]]
+        evector = engine.principal_eigenvector(mat, key='rating')
+        self.assertIn(('rating', 3), engine.eigenvectors)
+        assert_array_almost_equal(evector, normalise([0.5, 0.5, 1]))
+        # Starting from the eigenvector, one iteration is enough
+        engine.maximum_iterations = 0
+        assert_array_almost_equal(engine.principal_eigenvector(mat, 'rating'),
+                                  evector)
+        evectors = engine.principal_eigenvectors([mat, mat], key='rating')
+        assert_array_almost_equal(evectors, [evector, evector])
+
+    def test_arpack(self):
+        engine = RatingEngine(method='arpack')
+        eigenjesus, eigenmoses = engine.rate(self.result_sets)
+        for result_set, jesus, moses in zip(self.result_sets, eigenjesus,
+                                            eigenmoses):
+            for mat, evector in ((result_set.normalised_cooperation, jesus),
+                                 (result_set.vengeful_cooperation, moses)):
+                evalues = numpy.linalg.eigvals(mat)
+                evalue = evalues[numpy.argmax(numpy.abs(evalues))]
+                assert_array_almost_equal(numpy.dot(mat, evector),
+                                          evalue * evector)
@@ -1,4 +1,5 @@
 import os
+import pickle
 import unittest
 from tempfile import mkstemp
 from unittest.mock import patch
@@ -10,6 +11,9 @@ from hypothesis import given, settings
 import axelrod as axl
 from axelrod.fingerprint import (create_points, create_jossann, create_probes,
                                  create_edges, generate_data, reshape_data,
+                                 create_machine, dual_machine, exact_data,
+                                 exact_cooperation, fingerprint_strategies,
+                                 FingerprintIndex, FingerprintStore,
                                  AshlockFingerprint, Point, TransitiveFingerprint)
 from axelrod.tests.property import strategy_lists
 
@@ -77,6 +81,57 @@ class TestFingerprint(unittest.TestCase):
         ja = create_jossann((.5, .6), probe)
         self.assertEqual(str(ja), "Dual Joss-Ann Random: 0.1: (0.5, 0.4)")
 
+    def test_create_jossann_reuses_classes(self):
+        probes = [create_jossann(point, self.probe)
+                  for point in [(.1, .2), (.3, .4), (.5, .6), (.7, .8)]]
+        self.assertIs(type(probes[0]), type(probes[1]))
+        self.assertIs(type(probes[2]), type(probes[3]))
+        self.assertIsNot(type(probes[0]), type(probes[2]))
+        self.assertEqual(probes[0].joss_ann_probability, (.1, .2))
+        self.assertEqual(str(probes[1]), "Joss-Ann Tit For Tat: (0.3, 0.4)")
+
+    def test_create_jossann_classifier(self):
+        ja = create_jossann((1, 0), self.probe)
+        self.assertFalse(ja.classifier["stochastic"])
+        ja = create_jossann((.5, .4), self.probe)
+        self.assertTrue(ja.classifier["stochastic"])
+        self.assertFalse(self.probe.classifier["stochastic"])
+
+    def test_create_jossann_clone_and_reset(self):
+        ja = create_jossann((.5, .6), axl.Random(p=0.1))
+        clone = ja.clone()
+        self.assertEqual(str(clone), "Dual Joss-Ann Random: 0.1: (0.5, 0.4)")
+        self.assertEqual(clone.joss_ann_probability, (.5, .4))
+        self.assertTrue(clone.classifier["stochastic"])
+        ja.play(axl.Cooperator())
+        ja.reset()
+        self.assertEqual(ja.history, [])
+        self.assertEqual(ja.joss_ann_probability, (.5, .4))
+        self.assertTrue(ja.classifier["stochastic"])
+
+    def test_create_jossann_play(self):
+        # (1, 0) always cooperates, (0, 1) always defects, (0, 0) is the
+        # probe and (1, 1) its dual
+        for point, action in [((1, 0), C), ((0, 1), D), ((0, 0), C),
+                              ((1, 1), D)]:
+            ja = create_jossann(point, self.probe)
+            match = axl.Match((ja, axl.Cooperator()), turns=5)
+            self.assertEqual(set(a for a, _ in match.play()), {action})
+
+    def test_create_jossann_pickling(self):
+        for point in [(.1, .2), (.5, .6)]:
+            ja = create_jossann(point, axl.Random(p=0.1))
+            unpickled = pickle.loads(pickle.dumps(ja))
+            self.assertIs(type(unpickled), type(ja))
+            self.assertEqual(unpickled, ja)
+
+        transformed = axl.strategy_transformers.FlipTransformer()(
+            axl.TitForTat)
+        ja = create_jossann((.1, .2), transformed)
+        unpickled = pickle.loads(pickle.dumps(ja))
+        self.assertEqual(str(unpickled), str(ja))
+        self.assertEqual(unpickled.joss_ann_probability, (.1, .2))
+
     def test_create_probes(self):
         probes = create_probes(self.probe, self.expected_points,
                                progress_bar=False)
@@ -180,24 +235,17 @@ class TestFingerprint(unittest.TestCase):
                               progress_bar=True)
         self.assertEqual(sorted(data.keys()), self.expected_points)
 
-    @patch('axelrod.fingerprint.mkstemp', RecordedMksTemp.mkstemp)
-    def test_temp_file_creation(self):
+    @patch('axelrod.tournament.mkstemp', RecordedMksTemp.mkstemp)
+    def test_no_temp_file_creation(self):
 
         RecordedMksTemp.reset_record()
         af = AshlockFingerprint(self.strategy, self.probe)
-        filename = "test_outputs/test_fingerprint.csv"
-
-        self.assertEqual(RecordedMksTemp.record, [])
 
-        # Temp file is created and destroyed.
+        # The interactions are not written to a file
         af.fingerprint(turns=1, repetitions=1, step=0.5, progress_bar=False,
                        filename=None)
-
-        self.assertEqual(len(RecordedMksTemp.record), 1)
-        filename = RecordedMksTemp.record[0][1]
-        self.assertIsInstance(filename, str)
-        self.assertNotEqual(filename, '')
-        self.assertFalse(os.path.isfile(filename))
+        self.assertEqual(RecordedMksTemp.record, [])
+        self.assertIsNone(af.interactions)
 
     def test_fingerprint_with_filename(self):
         filename = "test_outputs/test_fingerprint.csv"
@@ -212,20 +260,39 @@ class TestFingerprint(unittest.TestCase):
         af = AshlockFingerprint(self.strategy, self.probe)
         data = af.fingerprint(turns=10, repetitions=2, step=0.5,
                               progress_bar=False)
+        coord_keys = sorted(list(data.keys()))
+        self.assertEqual(af.step, 0.5)
+        self.assertEqual(coord_keys, self.expected_points)
+
+    def test_serial_fingerprint_with_filename(self):
+        af = AshlockFingerprint(self.strategy, self.probe)
+        data = af.fingerprint(turns=10, repetitions=2, step=0.5,
+                              progress_bar=False,
+                              filename="test_outputs/test_fingerprint.csv")
         edge_keys = sorted(list(af.interactions.keys()))
         coord_keys = sorted(list(data.keys()))
         self.assertEqual(af.step, 0.5)
         self.assertEqual(edge_keys, self.expected_edges)
         self.assertEqual(coord_keys, self.expected_points)
 
+    def test_streamed_fingerprint_matches_file(self):
+        af = AshlockFingerprint(self.strategy, self.probe)
+        axl.seed(0)
+        streamed = af.fingerprint(turns=10, repetitions=3, step=0.5,
+                                  progress_bar=False)
+        axl.seed(0)
+        from_file = af.fingerprint(turns=10, repetitions=3, step=0.5,
+                                   progress_bar=False,
+                                   filename="test_outputs/test_fingerprint.csv")
+        for point in self.expected_points:
+            self.assertAlmostEqual(streamed[point], from_file[point])
+
     def test_parallel_fingerprint(self):
         af = AshlockFingerprint(self.strategy, self.probe)
         af.fingerprint(turns=10, repetitions=2, step=0.5, processes=2,
                        progress_bar=False)
-        edge_keys = sorted(list(af.interactions.keys()))
         coord_keys = sorted(list(af.data.keys()))
         self.assertEqual(af.step, 0.5)
-        self.assertEqual(edge_keys, self.expected_edges)
         self.assertEqual(coord_keys, self.expected_points)
 
     def test_plot(self):
@@ -348,6 +415,181 @@ class TestFingerprint(unittest.TestCase):
         for key, value in data.items():
             self.assertAlmostEqual(value, test_data[key], places=2)
 
+    def test_create_machine_memory_one(self):
+        machine = create_machine(axl.WinStayLoseShift)
+        self.assertEqual(machine.cooperation.tolist(), [1, 1, 0, 0, 1])
+        self.assertEqual(machine.transitions.tolist(),
+                         [[[1, 2], [3, 4]]] * 5)
+
+        machine = create_machine(axl.MemoryOnePlayer((0.1, 0.2, 0.3, 0.4), D))
+        self.assertEqual(machine.cooperation.tolist(),
+                         [0, 0.1, 0.2, 0.3, 0.4])
+
+    def test_create_machine_deterministic_memory_one(self):
+        machine = create_machine(axl.TitForTat)
+        self.assertEqual(machine.cooperation.tolist(), [1, 1, 0, 1, 0])
+        self.assertEqual(machine.transitions.tolist(),
+                         [[[1, 2], [3, 4]]] * 5)
+
+        machine = create_machine(axl.Defector())
+        self.assertEqual(machine.cooperation.tolist(), [0] * 5)
+
+        machine = create_machine(axl.Alternator)
+        self.assertEqual(machine.cooperation.tolist(), [1, 0, 0, 1, 1])
+
+    def test_create_machine_fsm(self):
+        machine = create_machine(axl.FSMPlayer())
+        self.assertEqual(machine.cooperation.tolist(), [1, 1, 0])
+        self.assertEqual(machine.transitions.tolist(),
+                         [[[1, 2], [1, 2]]] * 3)
+        self.assertEqual(len(create_machine(axl.Fortress3).cooperation), 7)
+
+    def test_create_machine_lookup(self):
+        machine = create_machine(axl.LookerUp())
+        self.assertEqual(machine.cooperation.tolist(), [1, 1, 0, 1, 0])
+        self.assertEqual(machine.transitions.tolist(),
+                         [[[1, 2], [3, 4]]] * 5)
+        machine = create_machine(axl.PSOGambler1_1_1)
+        self.assertTrue(any(0 < p < 1 for p in machine.cooperation))
+
+    def test_create_machine_not_analysable(self):
+        self.assertIsNone(create_machine(axl.GoByMajority))
+        # Classified as memory one but remembers every defection
+        self.assertIsNone(create_machine(axl.Grudger))
+
+    def test_create_machine_random(self):
+        machine = create_machine(axl.Random(0.3))
+        self.assertEqual(machine.cooperation.tolist(), [0.3])
+        self.assertEqual(machine.transitions.tolist(), [[[0, 0], [0, 0]]])
+
+    def test_exact_cooperation(self):
+        machine = create_machine(axl.TitForTat)
+        opponents = [create_machine(axl.Random(p)) for p in (0, 0.25, 1)]
+        opponents.append(create_machine(axl.Defector))
+        cooperation = exact_cooperation(machine, opponents, 4)
+        expected = np.array([[1, 0, 0, 0],
+                             [1, 0.25, 0.25, 0.25],
+                             [1, 1, 1, 1],
+                             [1, 0, 0, 0]])
+        self.assertTrue(np.allclose(cooperation, expected))
+
+        cooperation = exact_cooperation(machine, opponents, 3, noise=0.1)
+        self.assertTrue(np.allclose(cooperation[:, 0], 0.9))
+        self.assertTrue(np.allclose(cooperation[0], [0.9, 0.18, 0.18]))
+
+    def test_dual_machine(self):
+        machine = create_machine(axl.TitForTat)
+        dual = dual_machine(machine)
+        self.assertEqual(dual.cooperation.tolist(), [0, 0, 1, 0, 1])
+        self.assertEqual(dual.transitions.tolist(),
+                         [[[3, 4], [1, 2]]] * 5)
+
+    def test_exact_data(self):
+        probe = create_machine(axl.TitForTat)
+        points = [Point(0.25, 0.5), Point(0.75, 0.5)]
+        data = exact_data(create_machine(axl.Cooperator), probe, points, 10)
+        self.assertAlmostEqual(data[Point(0.25, 0.5)], 3 * 0.5)
+        # The dual of Tit For Tat defects against a cooperator
+        self.assertAlmostEqual(data[Point(0.75, 0.5)], 3 * 0.5)
+        # The probe cooperates with probability 1 - y on the first turn and
+        # with probability x afterwards
+        data = exact_data(create_machine(axl.Defector), probe, points, 10)
+        self.assertAlmostEqual(data[Point(0.25, 0.5)],
+                               (3 + 9 * (5 * 0.25 + 0.75)) / 10)
+
+    def test_exact_fingerprint(self):
+        af = AshlockFingerprint(self.strategy, self.probe)
+        data = af.fingerprint(turns=50, step=0.5, progress_bar=False,
+                              exact=True)
+        self.assertTrue(af.exact)
+        self.assertEqual(af.step, 0.5)
+        self.assertEqual(sorted(data.keys()), self.expected_points)
+        # The corners are deterministic
+        self.assertAlmostEqual(data[Point(0.0, 0.0)], 3.0)
+        self.assertAlmostEqual(data[Point(0.0, 1.0)], 0.5)
+        self.assertAlmostEqual(data[Point(1.0, 0.0)], 3.0)
+        self.assertAlmostEqual(data[Point(1.0, 1.0)], 1.3)
+        self.assertIsInstance(af.plot(), matplotlib.pyplot.Figure)
+
+    def test_exact_fingerprint_matches_simulation(self):
+        axl.seed(0)
+        for strategy in [axl.Fortress3, axl.EvolvedLookerUp1_1_1]:
+            af = AshlockFingerprint(strategy, self.probe)
+            exact = af.fingerprint(turns=5, step=0.5, progress_bar=False,
+                                   exact=True)
+            simulated = af.fingerprint(turns=5, repetitions=200, step=0.5,
+                                       progress_bar=False)
+            for point in self.expected_points:
+                self.assertAlmostEqual(exact[point], simulated[point],
+                                       delta=0.3)
+
+    def test_exact_fingerprint_falls_back_to_simulation(self):
+        af = AshlockFingerprint(axl.GoByMajority, self.probe)
+        axl.seed(0)
+        data = af.fingerprint(turns=10, repetitions=2, step=0.5,
+                              progress_bar=False, exact=True)
+        self.assertFalse(af.exact)
+        axl.seed(0)
+        self.assertEqual(data, af.fingerprint(turns=10, repetitions=2,
+                                              step=0.5, progress_bar=False))
+
+    def test_adaptive_fingerprint_exact(self):
+        af = AshlockFingerprint(self.strategy, self.probe)
+        data = af.adaptive_fingerprint(turns=10, initial_step=0.25,
+                                       min_step=0.05, progress_bar=False,
+                                       exact=True)
+        self.assertTrue(af.exact)
+        self.assertEqual(af.step, 1 / 32)
+        self.assertEqual(len(data), 33 ** 2)
+        self.assertEqual(sorted(data), sorted(af.points))
+        self.assertLess(len(af.sampled_data), len(data))
+
+        sampled_points = list(af.sampled_data)
+        expected = exact_data(create_machine(self.strategy),
+                              create_machine(self.probe), sampled_points, 10)
+        for point in sampled_points:
+            self.assertAlmostEqual(af.sampled_data[point], expected[point])
+            self.assertAlmostEqual(data[point], expected[point])
+
+        uniform = af.fingerprint(turns=10, step=1 / 32, progress_bar=False,
+                                 exact=True)
+        for point in uniform:
+            self.assertAlmostEqual(data[point], uniform[point], delta=0.2)
+
+    def test_adaptive_fingerprint_without_refinement(self):
+        af = AshlockFingerprint(self.strategy, self.probe)
+        data = af.adaptive_fingerprint(turns=10, initial_step=0.25,
+                                       min_step=0.05, tolerance=10,
+                                       progress_bar=False, exact=True)
+        self.assertEqual(len(af.sampled_data), 25)
+        self.assertEqual(len(data), 33 ** 2)
+
+    def test_adaptive_fingerprint_with_budget(self):
+        af = AshlockFingerprint(self.strategy, self.probe)
+        af.adaptive_fingerprint(turns=10, initial_step=0.25, min_step=0.01,
+                                tolerance=0, max_probes=60,
+                                progress_bar=False, exact=True)
+        self.assertGreater(len(af.sampled_data), 25)
+        self.assertLessEqual(len(af.sampled_data), 60)
+
+    def test_adaptive_fingerprint_simulation(self):
+        axl.seed(0)
+        af = AshlockFingerprint(self.strategy, self.probe)
+        data = af.adaptive_fingerprint(turns=5, repetitions=2,
+                                       initial_step=0.5, min_step=0.25,
+                                       progress_bar=False)
+        self.assertFalse(af.exact)
+        self.assertEqual(af.step, 0.25)
+        self.assertEqual(len(data), 25)
+        for point in self.expected_points:
+            self.assertIn(point, af.sampled_data)
+        self.assertIsInstance(af.plot(), matplotlib.pyplot.Figure)
+
+    def test_adaptive_fingerprint_with_invalid_initial_step(self):
+        af = AshlockFingerprint(self.strategy, self.probe)
+        with self.assertRaises(ValueError):
+            af.adaptive_fingerprint(initial_step=0.3, progress_bar=False)
+
     @given(strategy_pair=strategy_lists(min_size=2, max_size=2))
     @settings(max_examples=5, max_iterations=20)
     def test_pair_fingerprints(self, strategy_pair):
@@ -377,6 +619,160 @@ class TestFingerprint(unittest.TestCase):
         self.assertIsInstance(data, dict)
 
 
+class TestFingerprintStrategies(unittest.TestCase):
+
+    def test_matches_individual_fingerprints(self):
+        # The probes of the corners of the unit square are deterministic
+        strategies = [axl.TitForTat, axl.Cooperator(), axl.GoByMajority]
+        data = fingerprint_strategies(strategies, turns=5, repetitions=2,
+                                      step=1, progress_bar=False)
+        self.assertEqual(len(data), 3)
+        for strategy, strategy_data in zip(strategies, data):
+            af = AshlockFingerprint(strategy)
+            expected = af.fingerprint(turns=5, repetitions=2, step=1,
+                                      progress_bar=False)
+            self.assertEqual(strategy_data, expected)
+
+        data = fingerprint_strategies(strategies, turns=5, repetitions=2,
+                                      step=0.25, progress_bar=False)
+        for strategy_data in data:
+            self.assertEqual(sorted(strategy_data),
+                             create_points(0.25, progress_bar=False))
+
+    def test_exact(self):
+        strategies = [axl.WinStayLoseShift, axl.GoByMajority]
+        data = fingerprint_strategies(strategies, turns=10, repetitions=2,
+                                      step=0.1, progress_bar=False,
+                                      exact=True)
+        af = AshlockFingerprint(axl.WinStayLoseShift)
+        expected = af.fingerprint(turns=10, step=0.1, progress_bar=False,
+                                  exact=True)
+        self.assertEqual(data[0], expected)
+        self.assertEqual(len(data[1]), 121)
+
+    def test_parallel(self):
+        strategies = [axl.TitForTat, axl.Defector]
+        serial = fingerprint_strategies(strategies, turns=5, repetitions=2,
+                                        step=1, progress_bar=False)
+        parallel = fingerprint_strategies(strategies, turns=5, repetitions=2,
+                                          step=1, processes=2,
+                                          progress_bar=False)
+        self.assertEqual(serial, parallel)
+
+    def test_store(self):
+        filename = "test_outputs/test_fingerprint.store"
+        if os.path.exists(filename):
+            os.remove(filename)
+        store = FingerprintStore(filename)
+        data = fingerprint_strategies([axl.TitForTat, axl.Alternator],
+                                      turns=5, repetitions=2, step=0.5,
+                                      progress_bar=False, store=store)
+        self.assertEqual(len(store), 2)
+        self.assertTrue(os.path.exists(filename))
+
+        store = FingerprintStore(filename)
+        self.assertEqual(len(store), 2)
+        with patch('axelrod.fingerprint.stream_scores') as stream_scores:
+            cached = fingerprint_strategies([axl.Alternator(), axl.TitForTat],
+                                            turns=5, repetitions=2, step=0.5,
+                                            progress_bar=False, store=store)
+        self.assertFalse(stream_scores.called)
+        self.assertEqual(cached, data[::-1])
+
+        # Different parameters are different fingerprints
+        fingerprint_strategies([axl.TitForTat], turns=6, repetitions=2,
+                               step=0.5, progress_bar=False, store=store)
+        self.assertEqual(len(FingerprintStore(filename)), 3)
+
+    def test_store_key(self):
+        key = FingerprintStore.key(axl.Random(0.3), axl.TitForTat, 0.5, 5, 2)
+        self.assertEqual(key[:6], ("Random: 0.3", "Tit For Tat", 0.5, 5, 2,
+                                   False))
+        self.assertEqual(key, FingerprintStore.key(
+            axl.Random(0.3), axl.TitForTat(), 0.5, 5, 2))
+        self.assertNotEqual(key, FingerprintStore.key(
+            axl.Random(0.4), axl.TitForTat, 0.5, 5, 2))
+
+    def test_load_invalid_store(self):
+        filename = "test_outputs/test_fingerprint.store"
+        with open(filename, 'wb') as io:
+            pickle.dump([1, 2], io)
+        with self.assertRaises(ValueError):
+            FingerprintStore(filename)
+
+
+class TestFingerprintIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        strategies = [axl.TitForTat, axl.Cooperator, axl.Defector,
+                      axl.WinStayLoseShift, axl.Alternator, axl.Grumpy]
+        cls.names = [str(s()) for s in strategies]
+        data = fingerprint_strategies(strategies, turns=10, step=0.1,
+                                      repetitions=20, progress_bar=False,
+                                      exact=True)
+        cls.fingerprints = dict(zip(cls.names, data))
+
+    def test_nearest(self):
+        index = FingerprintIndex(self.fingerprints)
+        nearest = index.nearest(self.fingerprints["Tit For Tat"], k=3)
+        self.assertEqual(len(nearest), 3)
+        self.assertEqual(nearest[0][0], "Tit For Tat")
+        self.assertAlmostEqual(nearest[0][1], 0)
+        distances = [distance for _, distance in nearest]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_distances_are_root_mean_square_differences(self):
+        index = FingerprintIndex(self.fingerprints)
+        nearest = index.nearest(self.fingerprints["Cooperator"],
+                                k=len(self.names))
+        cooperator = np.array(
+            [self.fingerprints["Cooperator"][p]
+             for p in sorted(self.fingerprints["Cooperator"])])
+        for name, distance in nearest:
+            data = self.fingerprints[name]
+            vector = np.array([data[p] for p in sorted(data)])
+            self.assertAlmostEqual(
+                distance, np.sqrt(np.mean((vector - cooperator) ** 2)))
+
+    def test_query(self):
+        index = FingerprintIndex(self.fingerprints, dimensions=2)
+        self.assertEqual(index.components.shape[0], 2)
+        queries = [self.fingerprints[name] for name in self.names]
+        results = index.query(queries, k=10)
+        self.assertEqual(len(results), len(self.names))
+        for result in results:
+            self.assertEqual(len(result), len(self.names))
+
+    def test_transitive_fingerprints(self):
+        fingerprints = {}
+        for strategy in [axl.TitForTat, axl.Cooperator, axl.Defector]:
+            tf = TransitiveFingerprint(strategy, number_of_opponents=5)
+            fingerprints[str(strategy())] = tf.fingerprint(
+                turns=5, progress_bar=False, exact=True)
+        index = FingerprintIndex(fingerprints)
+        nearest = index.nearest(fingerprints["Defector"], k=1)
+        self.assertEqual(nearest, [("Defector", 0)])
+
+    def test_invalid_fingerprints(self):
+        with self.assertRaises(ValueError):
+            FingerprintIndex({"A": np.zeros(3), "B": np.zeros(4)})
+        index = FingerprintIndex(self.fingerprints)
+        with self.assertRaises(ValueError):
+            index.nearest(np.zeros(3))
+
+    def test_clusters(self):
+        fingerprints = dict(self.fingerprints)
+        fingerprints["Copy"] = fingerprints["Tit For Tat"]
+        index = FingerprintIndex(fingerprints)
+        clusters = index.clusters(threshold=0.01)
+        self.assertEqual(clusters[0], ["Tit For Tat", "Copy"])
+        self.assertEqual(len(clusters), len(self.names))
+        self.assertEqual(index.clusters(threshold=10), [list(fingerprints)])
+        index = FingerprintIndex({"A": np.zeros(3)})
+        self.assertEqual(index.clusters(), [["A"]])
+
+
 class TestTransitiveFingerprint(unittest.TestCase):
 
     def test_init(self):
@@ -427,6 +823,22 @@ class TestTransitiveFingerprint(unittest.TestCase):
 
         self.assertEqual(tf.data.shape, (50, 50))
 
+    def test_streamed_fingerprint(self):
+        opponents = [axl.Cooperator(), axl.Defector(), axl.Alternator()]
+        tf = TransitiveFingerprint(axl.TitForTat, opponents=opponents)
+        data = tf.fingerprint(turns=4, repetitions=3, progress_bar=False)
+        expected_data = np.array([[1, 1, 1, 1],
+                                  [1, 0, 0, 0],
+                                  [1, 1, 0, 1]])
+        self.assertTrue(np.array_equal(data, expected_data))
+
+        strategy = axl.MemoryOnePlayer((0.5, 0.5, 0.5, 0.5), C)
+        tf = TransitiveFingerprint(strategy, opponents=opponents[:1])
+        data = tf.fingerprint(turns=20, repetitions=50, progress_bar=False)
+        self.assertEqual(data.shape, (1, 20))
+        self.assertEqual(data[0, 0], 1)
+        self.assertTrue(np.all(0 < data[0, 1:]) and np.all(data[0, 1:] < 1))
+
     def test_analyse_cooperation_ratio(self):
         tf = TransitiveFingerprint(axl.TitForTat)
         filename = "test_outputs/test_fingerprint.csv"
@@ -456,6 +868,45 @@ class TestTransitiveFingerprint(unittest.TestCase):
                                   [0, 0, 0]])
         self.assertTrue(np.array_equal(data, expected_data))
 
+    def test_analyse_cooperation_ratio_matches_stream(self):
+        filename = "test_outputs/test_fingerprint.csv"
+        tf = TransitiveFingerprint(axl.TitForTat, number_of_opponents=12)
+        axl.seed(0)
+        streamed = tf.fingerprint(turns=10, repetitions=5, progress_bar=False)
+        axl.seed(0)
+        from_file = tf.fingerprint(turns=10, repetitions=5,
+                                   progress_bar=False, filename=filename)
+        self.assertEqual(from_file.shape, (12, 10))
+        self.assertTrue(np.allclose(streamed, from_file))
+
+    def test_exact_fingerprint(self):
+        tf = TransitiveFingerprint(axl.TitForTat, number_of_opponents=5)
+        data = tf.fingerprint(turns=4, progress_bar=False, exact=True)
+        self.assertTrue(tf.exact)
+        expected = np.array([[1] + [p] * 3 for p in np.linspace(0, 1, 5)])
+        self.assertTrue(np.allclose(data, expected))
+
+    def test_exact_fingerprint_matches_simulation(self):
+        player = axl.WinStayLoseShift()
+        opponents = [axl.Random(0.3), axl.Random(0.8), axl.Alternator(),
+                     axl.TitForTat()]
+        tf = TransitiveFingerprint(player, opponents=opponents)
+        exact = tf.fingerprint(turns=6, noise=0.05, progress_bar=False,
+                               exact=True)
+        self.assertTrue(tf.exact)
+        axl.seed(0)
+        simulated = tf.fingerprint(turns=6, repetitions=4000, noise=0.05,
+                                   progress_bar=False)
+        self.assertFalse(tf.exact)
+        self.assertTrue(np.allclose(exact, simulated, atol=0.05))
+
+    def test_exact_fingerprint_falls_back_to_simulation(self):
+        tf = TransitiveFingerprint(axl.GoByMajority, number_of_opponents=3)
+        data = tf.fingerprint(turns=5, repetitions=2, progress_bar=False,
+                              exact=True)
+        self.assertFalse(tf.exact)
+        self.assertEqual(data.shape, (3, 5))
+
     def test_plot(self):
         """
         Test that plot is created with various arguments.
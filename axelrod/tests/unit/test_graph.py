@@ -1,11 +1,39 @@
 import unittest
 from collections import defaultdict
 
+import axelrod
 from axelrod import graph
 
 
 class TestGraph(unittest.TestCase):
 
+    def test_sorted_out_vertices(self):
+        g = graph.Graph(edges=[[3, 1], [3, 2], [0, 3]])
+        self.assertEqual(g.sorted_out_vertices(3), [0, 1, 2])
+        self.assertIs(g.sorted_out_vertices(3), g.sorted_out_vertices(3))
+        g.add_edge(3, 4)
+        self.assertEqual(g.sorted_out_vertices(3), [0, 1, 2, 4])
+        self.assertEqual(g.sorted_out_vertices(5), [])
+        self.assertNotIn(5, g.vertices())
+
+    def test_random_out_vertex(self):
+        g = graph.cycle(4)
+        axelrod.seed(0)
+        vertices = [g.random_out_vertex(0) for _ in range(100)]
+        self.assertEqual(set(vertices), {1, 3})
+
+    def test_adjacency_matrix(self):
+        g = graph.Graph(edges=[[0, 1, 2], [1, 2, 5]])
+        matrix = g.adjacency_matrix()
+        self.assertEqual(matrix.toarray().tolist(),
+                         [[0, 2, 0], [2, 0, 5], [0, 5, 0]])
+        self.assertIs(g.adjacency_matrix(), matrix)
+        g = graph.cycle(3, directed=True)
+        self.assertEqual(g.adjacency_matrix().toarray().tolist(),
+                         [[0, 1, 0], [0, 0, 1], [1, 0, 0]])
+        g.add_edge(0, 3)
+        self.assertEqual(g.adjacency_matrix().shape, (4, 4))
+
     def test_init(self):
         # Undirected graph with no vertices
         g = graph.Graph()
@@ -266,3 +294,63 @@ class TestGraph(unittest.TestCase):
         for vertex in range(4):
             self.assertEqual(set(g.out_vertices(vertex)), set(neighbors))
             self.assertEqual(set(g.in_vertices(vertex)), set(neighbors))
+
+
+    def test_lattice(self):
+        g = graph.lattice(3, 4)
+        self.assertEqual(sorted(g.vertices()), list(range(12)))
+        self.assertEqual(len(g.edges()), 2 * 24)
+        self.assertEqual(g.sorted_out_vertices(0), [1, 3, 4, 8])
+        self.assertEqual(g.sorted_out_vertices(5), [1, 4, 6, 9])
+        g = graph.lattice(3, 4, periodic=False)
+        self.assertEqual(len(g.edges()), 2 * 17)
+        self.assertEqual(g.sorted_out_vertices(0), [1, 4])
+        self.assertEqual(g.sorted_out_vertices(11), [7, 10])
+        g = graph.lattice(100, 100)
+        for vertex in g.vertices():
+            self.assertEqual(len(g.out_vertices(vertex)), 4)
+
+    def test_random_regular_graph(self):
+        axelrod.seed(0)
+        for length, degree in [(10, 3), (100, 4), (50, 1)]:
+            g = graph.random_regular_graph(length, degree)
+            self.assertEqual(sorted(g.vertices()), list(range(length)))
+            for vertex in g.vertices():
+                neighbors = g.out_vertices(vertex)
+                self.assertEqual(len(neighbors), degree)
+                self.assertNotIn(vertex, neighbors)
+        with self.assertRaises(ValueError):
+            graph.random_regular_graph(5, 3)
+        with self.assertRaises(ValueError):
+            graph.random_regular_graph(4, 4)
+
+    def test_small_world_graph(self):
+        axelrod.seed(0)
+        g = graph.small_world_graph(20, 4, 0)
+        self.assertEqual(len(g.edges()), 2 * 40)
+        self.assertEqual(g.sorted_out_vertices(0), [1, 2, 18, 19])
+        g = graph.small_world_graph(100, 4, .2)
+        self.assertEqual(len(g.edges()), 2 * 200)
+        rewired = sum(abs(source - target) % 98 > 2
+                      for source, target in g.edges())
+        self.assertGreater(rewired, 0)
+        for source, target in g.edges():
+            self.assertNotEqual(source, target)
+        g = graph.small_world_graph(3, 2, 0)
+        self.assertEqual(g.sorted_out_vertices(0), [1, 2])
+
+    def test_small_world_graph_neighbours(self):
+        for length, neighbours in [(20, 3), (20, 0), (4, 4), (3, 6)]:
+            with self.assertRaises(ValueError):
+                graph.small_world_graph(length, neighbours, .1)
+
+    def test_scale_free_graph(self):
+        axelrod.seed(0)
+        g = graph.scale_free_graph(200, 2)
+        self.assertEqual(sorted(g.vertices()), list(range(200)))
+        self.assertEqual(len(g.edges()), 2 * (2 + 197 * 2))
+        degrees = [len(g.out_vertices(vertex)) for vertex in g.vertices()]
+        self.assertGreaterEqual(min(degrees), 1)
+        self.assertGreater(max(degrees), 10)
+        with self.assertRaises(ValueError):
+            graph.scale_free_graph(3, 3)
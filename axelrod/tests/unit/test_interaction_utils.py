@@ -1,7 +1,10 @@
 from collections import Counter
+import os
 import tempfile
 import unittest
 
+import numpy as np
+
 import axelrod
 from axelrod import Action
 import axelrod.interaction_utils as iu
@@ -131,6 +134,113 @@ class TestMatch(unittest.TestCase):
                                                       progress_bar=False)
         self.assertEqual(expected_interactions, interactions)
 
+    def test_read_interactions_from_file_with_progress_bar(self):
+        tmp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
+        players = [axelrod.Alternator(), axelrod.TitForTat(),
+                   axelrod.Random()]
+        tournament = axelrod.Tournament(players=players, prob_end=.2,
+                                        repetitions=2)
+        axelrod.seed(0)
+        tournament.play(filename=tmp_file.name, progress_bar=False)
+        tmp_file.close()
+        interactions = iu.read_interactions_from_file(tmp_file.name,
+                                                      progress_bar=True)
+        self.assertEqual(sorted(interactions), [(0, 0), (0, 1), (0, 2),
+                                                (1, 1), (1, 2), (2, 2)])
+        for pair_interactions in interactions.values():
+            self.assertEqual(len(pair_interactions), 2)
+            for interaction in pair_interactions:
+                for state in interaction:
+                    self.assertIn(state, [(C, C), (C, D), (D, C), (D, D)])
+
+    def test_decode_states(self):
+        states = iu.decode_states("CCDD", "CDCD")
+        self.assertEqual(states.tolist(), [(C, C), (C, D), (D, C), (D, D)])
+        self.assertEqual(iu.decode_states("", "").tolist(), [])
+
+    def test_build_interactions_index(self):
+        tmp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        tournament = axelrod.Tournament(players=players, turns=2, repetitions=3)
+        tournament.play(filename=tmp_file.name, progress_bar=False)
+        tmp_file.close()
+
+        index_filename = iu.build_interactions_index(tmp_file.name)
+        self.assertEqual(index_filename, tmp_file.name + ".index.npy")
+        index = iu.read_interactions_index(tmp_file.name)
+        self.assertEqual(index.shape, (18, 5))
+        keys = [(player, opponent, interaction)
+                for interaction, player, opponent, _, _ in index.tolist()]
+        self.assertEqual(keys, sorted(keys))
+        with open(tmp_file.name, "rb") as interactions_file:
+            lines = interactions_file.readlines()[1:]
+        for (interaction, player, opponent, offset, length), line in zip(
+                sorted(index.tolist(), key=lambda row: row[3]), lines):
+            self.assertEqual(line.split(b",")[:3],
+                             [str(value).encode()
+                              for value in (interaction, player, opponent)])
+            self.assertEqual(length, len(line))
+
+    def test_read_pair_interactions(self):
+        tmp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
+        players = [axelrod.Alternator(), axelrod.TitForTat(),
+                   axelrod.Grudger(), axelrod.Random()]
+        tournament = axelrod.Tournament(players=players, prob_end=.2,
+                                        repetitions=3)
+        axelrod.seed(0)
+        tournament.play(filename=tmp_file.name, progress_bar=False,
+                        processes=2)
+        tmp_file.close()
+        expected_interactions = iu.read_interactions_from_file(
+            tmp_file.name, progress_bar=False)
+        for (player, opponent), interactions in expected_interactions.items():
+            self.assertEqual(
+                iu.read_pair_interactions(tmp_file.name, player, opponent),
+                interactions)
+        self.assertEqual(iu.read_pair_interactions(tmp_file.name, 3, 0), [])
+
+    def test_read_pair_interactions_rebuilds_stale_index(self):
+        tmp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
+        index_filename = tmp_file.name + ".index"
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        tournament = axelrod.Tournament(players=players, turns=2, repetitions=1)
+        tournament.play(filename=tmp_file.name, progress_bar=False)
+        tmp_file.close()
+        self.assertEqual(
+            iu.read_pair_interactions(tmp_file.name, 0, 1,
+                                      index_filename=index_filename),
+            [[(C, D), (C, D)]])
+
+        tournament = axelrod.Tournament(players=players, turns=3, repetitions=2)
+        tournament.play(filename=tmp_file.name, progress_bar=False)
+        os.utime(index_filename, (0, 0))
+        self.assertEqual(
+            iu.read_pair_interactions(tmp_file.name, 0, 1,
+                                      index_filename=index_filename),
+            [[(C, D), (C, D), (C, D)] for _ in range(2)])
+
+    def test_read_pair_interactions_rebuilds_unversioned_index(self):
+        tmp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.Alternator()]
+        tournament = axelrod.Tournament(players=players, turns=2, repetitions=2)
+        tournament.play(filename=tmp_file.name, progress_bar=False)
+        tmp_file.close()
+        expected_interactions = iu.read_interactions_from_file(
+            tmp_file.name, progress_bar=False)
+
+        # An index in the order of the file without a header row, as written
+        # before the index was sorted
+        index_filename = iu.build_interactions_index(tmp_file.name)
+        index = np.load(index_filename)[1:]
+        np.save(index_filename, index[np.argsort(index[:, 3])[::-1]])
+        for (player, opponent), interactions in expected_interactions.items():
+            self.assertEqual(
+                iu.read_pair_interactions(tmp_file.name, player, opponent),
+                interactions)
+        self.assertEqual(np.load(index_filename)[0].tolist(),
+                         [-1, iu.INDEX_VERSION, 0, 0, 0])
+
     def test_string_to_interactions(self):
         string = 'CDCDDD'
         interactions = [(C, D), (C, D), (D, D)]
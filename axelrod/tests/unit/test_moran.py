@@ -1,15 +1,25 @@
 from collections import Counter
 import itertools
 import random
+import os
+import pickle
 import unittest
+from unittest.mock import patch
 
 from hypothesis import given, example, settings
 import matplotlib
 import matplotlib.pyplot as plt
+import numpy as np
+from scipy.sparse.linalg import spsolve
 
 import axelrod
-from axelrod import MoranProcess, ApproximateMoranProcess, Pdf
-from axelrod.moran import fitness_proportionate_selection
+from axelrod import (MoranProcess, ApproximateMoranProcess,
+                     TypeCountMoranProcess, AnalyticMoranProcess, Pdf,
+                     estimate_fixation, build_cached_outcomes,
+                     save_cached_outcomes, load_cached_outcomes)
+from axelrod.moran import (fitness_proportionate_selection,
+                           expected_payoff_matrix, FixationEstimate)
+from axelrod.strategy_transformers import DualTransformer
 from axelrod.tests.property import strategy_lists
 
 C, D = axelrod.Action.C, axelrod.Action.D
@@ -17,6 +27,22 @@ C, D = axelrod.Action.C, axelrod.Action.D
 
 class TestMoranProcess(unittest.TestCase):
 
+    def test_classes_with_the_same_name_are_the_same_type(self):
+        first = DualTransformer()(axelrod.TitForTat)
+        second = DualTransformer()(axelrod.TitForTat)
+        players = [first(), second()]
+        mp = MoranProcess(players)
+        self.assertEqual(mp.populations,
+                         [Counter({'Dual Tit For Tat': 2})])
+        self.assertEqual(len(mp.play()), 1)
+        self.assertEqual(mp.winning_strategy_name, 'Dual Tit For Tat')
+
+        players = pickle.loads(pickle.dumps(
+            [first(), first(), axelrod.Defector()]))
+        mp = MoranProcess(players)
+        self.assertEqual(mp.populations,
+                         [Counter({'Dual Tit For Tat': 2, 'Defector': 1})])
+
     def test_init(self):
         players = axelrod.Cooperator(), axelrod.Defector()
         mp = MoranProcess(players)
@@ -282,6 +308,77 @@ class TestMoranProcess(unittest.TestCase):
         self.assertEqual(populations, mp.populations)
         self.assertEqual(mp.winning_strategy_name, str(axelrod.Defector()))
 
+    def test_lattice_matchups_are_cached(self):
+        players = [axelrod.Cooperator() for _ in range(15)]
+        players.append(axelrod.Defector())
+        g = axelrod.graph.lattice(4, 4)
+        mp = MoranProcess(players, turns=5, interaction_graph=g)
+        indices = mp._matchup_indices()
+        self.assertEqual(len(indices), 32)
+        self.assertIs(mp._matchup_indices(), indices)
+        axelrod.seed(0)
+        populations = mp.play()
+        self.assertEqual(sum(populations[-1].values()), 16)
+
+    def test_record(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()] * 2
+        for record, populations, scores in [("every", 11, 10),
+                                            ("ring", 10, 10),
+                                            ("file", 101, 100)]:
+            axelrod.seed(0)
+            mp = MoranProcess(players, turns=5, mutation_rate=.1,
+                              record=record, record_size=10)
+            for _ in zip(range(100), mp):
+                pass
+            self.assertEqual(len(mp), 101)
+            self.assertEqual(len(mp.populations), populations)
+            self.assertEqual(len(mp.score_history), scores)
+            self.assertEqual(mp.score_history.width, 6)
+            for population in mp.populations:
+                self.assertEqual(sum(population.values()), 6)
+            mp.reset()
+            self.assertEqual(len(mp), 1)
+            self.assertEqual(mp.populations[0],
+                             Counter({"Cooperator": 2, "Defector": 2,
+                                      "Tit For Tat": 2}))
+            self.assertEqual(len(mp.score_history), 0)
+
+    def test_record_matches_all(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()] * 2
+        axelrod.seed(2)
+        mp = MoranProcess(players, turns=5, mutation_rate=.1)
+        for _ in zip(range(50), mp):
+            pass
+        axelrod.seed(2)
+        mp_file = MoranProcess(players, turns=5, mutation_rate=.1,
+                               record="file",
+                               record_filename="test_outputs/test_moran")
+        for _ in zip(range(50), mp_file):
+            pass
+        self.assertEqual(list(mp_file.populations), mp.populations)
+        np.testing.assert_array_almost_equal(mp_file.score_history.array(),
+                                             mp.score_history)
+        self.assertTrue(os.path.exists("test_outputs/test_moran.populations"))
+        self.assertTrue(os.path.exists("test_outputs/test_moran.scores"))
+
+    def test_unknown_record(self):
+        with self.assertRaises(ValueError):
+            MoranProcess([axelrod.Cooperator(), axelrod.Defector()],
+                         record="some")
+
+    def test_record_population_plot(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()] * 2
+        axelrod.seed(0)
+        mp = MoranProcess(players, turns=5, mutation_rate=.1,
+                          record="every", record_size=5)
+        for _ in zip(range(20), mp):
+            pass
+        ax = mp.populations_plot()
+        self.assertEqual(ax.get_xlim(), (-1, 21))
+        self.assertEqual(ax.get_ylim(), (0, 4.2))
+
     @given(strategies=strategy_lists(min_size=2, max_size=4))
     @settings(max_examples=5, max_iterations=20)
 
@@ -336,6 +433,77 @@ class TestMoranProcess(unittest.TestCase):
         mp = MoranProcess((p1, p2), deterministic_cache=cache)
         self.assertEqual(cache, mp.deterministic_cache)
 
+    def test_payoffs_reused_by_type(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat(), axelrod.Grudger()] * 3
+        mp = MoranProcess(players, turns=5)
+        with patch("axelrod.moran.Match.play", autospec=True,
+                   side_effect=axelrod.Match.play) as play:
+            axelrod.seed(0)
+            mp.play()
+        self.assertEqual(len(mp.payoffs), play.call_count)
+        self.assertLessEqual(play.call_count, 16)
+        self.assertEqual(mp.payoffs[("Cooperator", "Defector")], (0, 5))
+
+    def test_incremental_scores(self):
+        """Scores of a round match replaying every match of the round"""
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat(), axelrod.Alternator()] * 3
+        edges = [(i, (i + 1) % 12) for i in range(12)] + [(0, 6), (3, 9)]
+        for interaction_graph in [None, axelrod.graph.Graph(edges)]:
+            axelrod.seed(2)
+            mp = MoranProcess(players, turns=5, mutation_rate=0.1,
+                              interaction_graph=interaction_graph)
+            self.assertTrue(mp._deterministic)
+            for _ in range(50):
+                next(mp)
+                scores = [0] * len(players)
+                for i, j in mp._matchup_indices():
+                    match = axelrod.Match((mp.players[i], mp.players[j]),
+                                          turns=5)
+                    match.play()
+                    match_scores = match.final_score_per_turn()
+                    scores[i] += match_scores[0]
+                    scores[j] += match_scores[1]
+                for score, expected in zip(mp.score_all(), scores):
+                    self.assertAlmostEqual(score, expected)
+
+    def test_incremental_scores_give_same_process(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat(), axelrod.Grudger()] * 2
+        axelrod.seed(5)
+        mp = MoranProcess(players, turns=10)
+        populations = mp.play()
+        axelrod.seed(5)
+        mp = MoranProcess(players, turns=10)
+        mp._deterministic = False
+        self.assertEqual(mp.play(), populations)
+
+    def test_stochastic_matches_are_replayed(self):
+        players = [axelrod.Cooperator(), axelrod.Random()]
+        mp = MoranProcess(players)
+        self.assertFalse(mp._deterministic)
+        with patch("axelrod.moran.Match.play", autospec=True,
+                   side_effect=axelrod.Match.play) as play:
+            mp.score_all()
+            mp.score_all()
+        self.assertEqual(play.call_count, 2)
+        self.assertEqual(mp.payoffs, {})
+
+        mp = MoranProcess([axelrod.Cooperator(), axelrod.Defector()],
+                          prob_end=.5)
+        self.assertFalse(mp._deterministic)
+
+    def test_reset_discards_scores(self):
+        players = axelrod.Cooperator(), axelrod.Defector()
+        mp = MoranProcess(players)
+        axelrod.seed(0)
+        mp.play()
+        self.assertIsNotNone(mp._pair_scores)
+        mp.reset()
+        self.assertIsNone(mp._pair_scores)
+        self.assertEqual(mp.score_all(), [0, 5])
+
     def test_iter(self):
         p1, p2 = axelrod.Cooperator(), axelrod.Defector()
         mp = MoranProcess((p1, p2))
@@ -357,6 +525,17 @@ class TestMoranProcess(unittest.TestCase):
         self.assertEqual(ax.get_xlim(), (-0.8, 16.8))
         self.assertEqual(ax.get_ylim(), (0, 5.25))
 
+    def test_population_plot_with_partial_record(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = axelrod.MoranProcess(players, record="ring", record_size=3)
+        # The Defector is absent from the first kept population only
+        mp.populations.extend([Counter({"Cooperator": 2}),
+                               Counter({"Cooperator": 2}),
+                               Counter({"Cooperator": 1, "Defector": 1})])
+        ax = mp.populations_plot()
+        _, labels = ax.get_legend_handles_labels()
+        self.assertEqual(labels, ["Cooperator", "Defector"])
+
 
 class GraphMoranProcess(unittest.TestCase):
 
@@ -496,3 +675,629 @@ class TestApproximateMoranProcess(unittest.TestCase):
         self.assertEqual(scores, (0, 5))
         scores = self.amp._get_scores_from_cache(("Defector", "Cooperator"))
         self.assertEqual(scores, (5, 0))
+
+    def test_type_pair_index(self):
+        self.assertEqual(self.amp.type_names, ["Cooperator", "Defector"])
+        self.assertEqual(self.amp._pair_swapped.tolist(),
+                         [[False, False], [True, False]])
+        self.assertEqual(self.amp._pair_pdf[0, 1], self.amp._pair_pdf[1, 0])
+
+    def test_score_all_samples_outcomes(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.Defector()]
+        cached_outcomes = {
+            ("Cooperator", "Defector"): Pdf(Counter([(0, 5), (1, 1)])),
+            ("Cooperator", "Cooperator"): Pdf(Counter([(3, 3)])),
+            ("Defector", "Defector"): Pdf(Counter([(1, 1), (2, 2)]))}
+        amp = ApproximateMoranProcess(players, cached_outcomes)
+        axelrod.seed(0)
+        totals = Counter()
+        for _ in range(1000):
+            scores = amp.score_all()
+            self.assertIn(scores[0], [0, 1, 2])
+            self.assertIn(scores[1], [2, 3, 6, 7])
+            self.assertIn(scores[1] - scores[2], [-4, 0, 4])
+            totals["Cooperator"] += scores[0]
+        self.assertAlmostEqual(totals["Cooperator"] / 1000, 1, places=1)
+        self.assertEqual(len(amp.score_history), 1000)
+
+    def test_missing_outcomes(self):
+        cached_outcomes = {("Cooperator", "Defector"): Pdf(Counter([(0, 5)]))}
+        amp = ApproximateMoranProcess(self.players, cached_outcomes)
+        self.assertEqual(amp.score_all(), [0, 5])
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.Defector()]
+        amp = ApproximateMoranProcess(players, cached_outcomes)
+        with self.assertRaises(KeyError):
+            amp.score_all()
+
+    def test_player_types_follow_replacements(self):
+        players = [axelrod.Cooperator(), axelrod.Cooperator(),
+                   axelrod.Defector()]
+        axelrod.seed(1)
+        amp = ApproximateMoranProcess(players, self.cached_outcomes)
+        for _ in amp:
+            amp.score_all()
+            self.assertEqual(amp._player_types.tolist(),
+                             [amp.type_index[str(player)]
+                              for player in amp.players])
+        self.assertEqual(amp.populations[-1][amp.winning_strategy_name], 3)
+        amp.reset()
+        amp.score_all()
+        self.assertEqual(amp._player_types.tolist(), [0, 0, 1])
+
+
+class TestCachedOutcomes(unittest.TestCase):
+    players = [axelrod.Cooperator(), axelrod.Defector(), axelrod.Random(),
+               axelrod.Defector()]
+
+    def test_build_cached_outcomes(self):
+        axelrod.seed(0)
+        cached_outcomes = build_cached_outcomes(self.players, turns=10,
+                                                repetitions=5)
+        self.assertEqual(len(cached_outcomes), 6)
+        pdf = cached_outcomes[("Cooperator", "Defector")]
+        self.assertEqual(pdf.sample_space, ((0, 5),))
+        self.assertEqual(pdf.total, 1)
+        self.assertEqual(cached_outcomes[("Cooperator", "Cooperator")].sample(),
+                         (3, 3))
+        pdf = cached_outcomes[("Cooperator", "Random: 0.5")]
+        self.assertEqual(pdf.total, 5)
+        for score, opponent_score in pdf.sample_space:
+            self.assertAlmostEqual(score * 2 / 3 + opponent_score, 5)
+        pdf = cached_outcomes[("Random: 0.5", "Random: 0.5")]
+        self.assertEqual(pdf.total, 5)
+
+    def test_parallel(self):
+        cached_outcomes = build_cached_outcomes(self.players, turns=10,
+                                                repetitions=5, processes=2)
+        self.assertEqual(len(cached_outcomes), 6)
+        self.assertEqual(
+            cached_outcomes[("Defector", "Random: 0.5")].total, 5)
+        self.assertEqual(
+            cached_outcomes[("Defector", "Defector")].sample(), (1, 1))
+
+    def test_deterministic_cache(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()]
+        cache = axelrod.DeterministicCache()
+        cached_outcomes = build_cached_outcomes(players, turns=5,
+                                                deterministic_cache=cache)
+        self.assertEqual(len(cache), 6)
+        with patch("axelrod.moran.Tournament") as tournament:
+            outcomes = build_cached_outcomes(players, turns=5,
+                                             deterministic_cache=cache)
+            self.assertFalse(tournament.called)
+        self.assertEqual(outcomes[("Defector", "Tit For Tat")].sample(),
+                         cached_outcomes[("Defector", "Tit For Tat")].sample())
+        self.assertEqual(outcomes[("Defector", "Tit For Tat")].sample(),
+                         (1.8, 0.8))
+
+    def test_noise_and_prob_end(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        cached_outcomes = build_cached_outcomes(players, turns=10,
+                                                repetitions=4, noise=.1)
+        self.assertEqual(cached_outcomes[("Cooperator", "Defector")].total, 4)
+        cached_outcomes = build_cached_outcomes(players, turns=None,
+                                                prob_end=.1, repetitions=4)
+        self.assertEqual(cached_outcomes[("Cooperator", "Defector")].total, 4)
+
+    def test_decimals(self):
+        players = [axelrod.Cooperator(), axelrod.Random()]
+        axelrod.seed(0)
+        cached_outcomes = build_cached_outcomes(players, turns=100,
+                                                repetitions=20, decimals=0)
+        pdf = cached_outcomes[("Cooperator", "Random: 0.5")]
+        self.assertEqual(pdf.total, 20)
+        self.assertLessEqual(pdf.size, 3)
+        for score, opponent_score in pdf.sample_space:
+            self.assertEqual(score, round(score))
+
+    def test_save_and_load(self):
+        axelrod.seed(0)
+        cached_outcomes = build_cached_outcomes(self.players, turns=10,
+                                                repetitions=5)
+        filename = "test_outputs/test_cached_outcomes.csv"
+        save_cached_outcomes(cached_outcomes, filename)
+        loaded = load_cached_outcomes(filename)
+        self.assertEqual(set(loaded), set(cached_outcomes))
+        for pair, pdf in cached_outcomes.items():
+            self.assertEqual(dict(zip(loaded[pair].sample_space,
+                                      loaded[pair].counts)),
+                             dict(zip(pdf.sample_space, pdf.counts)))
+        amp = ApproximateMoranProcess(self.players, loaded)
+        axelrod.seed(0)
+        amp.play()
+        self.assertIn(amp.winning_strategy_name,
+                      ["Cooperator", "Defector", "Random: 0.5"])
+
+class TestExpectedPayoffMatrix(unittest.TestCase):
+
+    def test_deterministic_players(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.Alternator()]
+        payoffs = expected_payoff_matrix(players, turns=2)
+        np.testing.assert_array_almost_equal(payoffs, [[3, 0, 1.5],
+                                                       [5, 1, 3],
+                                                       [4, .5, 2]])
+
+    def test_stochastic_players(self):
+        players = [axelrod.Cooperator(), axelrod.Random()]
+        cache = axelrod.DeterministicCache()
+        axelrod.seed(0)
+        payoffs = expected_payoff_matrix(players, turns=100, repetitions=20,
+                                         deterministic_cache=cache)
+        self.assertEqual(payoffs[0, 0], 3)
+        self.assertAlmostEqual(payoffs[0, 1], 1.5, places=1)
+        self.assertAlmostEqual(payoffs[1, 0], 4, places=1)
+        self.assertAlmostEqual(payoffs[1, 1], 2.25, places=1)
+        self.assertEqual(len(cache), 1)
+
+    def test_different_game(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        payoffs = expected_payoff_matrix(players, turns=2,
+                                         game=axelrod.Game(r=4, p=2, s=1, t=6))
+        np.testing.assert_array_almost_equal(payoffs, [[4, 1], [6, 2]])
+
+
+class TestTypeCountMoranProcess(unittest.TestCase):
+
+    def test_init(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.Cooperator()]
+        mp = TypeCountMoranProcess(players, turns=2)
+        self.assertIsInstance(mp, MoranProcess)
+        self.assertEqual(mp.names, ["Cooperator", "Defector"])
+        self.assertEqual(mp.counts.tolist(), [2, 1])
+        self.assertEqual(mp.population_size, 3)
+        self.assertEqual(mp.populations,
+                         [Counter({"Cooperator": 2, "Defector": 1})])
+        np.testing.assert_array_almost_equal(mp.payoff_matrix,
+                                             [[3, 0], [5, 1]])
+
+    def test_init_with_counts(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = TypeCountMoranProcess(players, counts=[600, 400],
+                                   payoff_matrix=[[3, 0], [5, 1]])
+        self.assertEqual(mp.population_distribution(),
+                         Counter({"Cooperator": 600, "Defector": 400}))
+        self.assertEqual(mp.population_size, 1000)
+        with self.assertRaises(ValueError):
+            TypeCountMoranProcess(players, counts=[1, 2, 3])
+
+    def test_score_all(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = TypeCountMoranProcess(players, counts=[3, 2],
+                                   payoff_matrix=[[3, 0], [5, 1]])
+        np.testing.assert_array_almost_equal(mp.score_all(), [6, 16])
+        np.testing.assert_array_almost_equal(mp.score_all([3, 1]), [6, 15])
+        self.assertEqual(len(mp.score_history), 2)
+
+    def test_fixation(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = TypeCountMoranProcess(players, counts=[5, 0], turns=2)
+        self.assertTrue(mp.fixation_check())
+        self.assertEqual(mp.winning_strategy_name, "Cooperator")
+        with self.assertRaises(StopIteration):
+            next(mp)
+
+    def test_play(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        for mode in ["bd", "db"]:
+            axelrod.seed(0)
+            mp = TypeCountMoranProcess(players, counts=[10, 10], mode=mode,
+                                       turns=5)
+            populations = mp.play()
+            self.assertEqual(mp.winning_strategy_name, "Defector")
+            self.assertEqual(populations[-1], Counter({"Defector": 20}))
+            for population in populations:
+                self.assertEqual(sum(population.values()), 20)
+            for previous, population in zip(populations, populations[1:]):
+                changes = abs(previous["Defector"] - population["Defector"])
+                self.assertLessEqual(changes, 1)
+            self.assertEqual(len(mp), len(populations))
+            mp.reset()
+            self.assertEqual(len(mp), 1)
+            self.assertIsNone(mp.winning_strategy_name)
+            self.assertEqual(mp.score_history, [])
+
+    def test_fixation_probability_matches_moran_process(self):
+        """The neutral fixation probability of a single mutant is 1 / N"""
+        players = [axelrod.Cooperator()] * 4 + [axelrod.Alternator()]
+        axelrod.seed(0)
+        mp = TypeCountMoranProcess(players, payoff_matrix=[[1, 1], [1, 1]])
+        winners = Counter()
+        for _ in range(1000):
+            mp.play()
+            winners[mp.winning_strategy_name] += 1
+            mp.reset()
+        self.assertAlmostEqual(winners["Alternator"] / 1000, 1 / 5, places=1)
+
+    def test_mutation(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()]
+        axelrod.seed(3)
+        mp = TypeCountMoranProcess(players, counts=[50, 0, 0],
+                                   mutation_rate=.5, turns=5)
+        with self.assertRaises(ValueError):
+            mp.play()
+        for _, population in zip(range(100), mp):
+            pass
+        self.assertEqual(len(mp), 101)
+        self.assertEqual(len(mp.populations[-1]), 3)
+        self.assertEqual(sum(mp.populations[-1].values()), 50)
+        self.assertFalse(mp.fixation_check())
+
+    def test_zero_fitness(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        axelrod.seed(0)
+        mp = TypeCountMoranProcess(players, counts=[2, 2],
+                                   payoff_matrix=[[0, 0], [0, 0]])
+        mp.play()
+        self.assertIn(mp.winning_strategy_name, ["Cooperator", "Defector"])
+
+    def test_record(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        axelrod.seed(0)
+        mp = TypeCountMoranProcess(players, counts=[10, 10],
+                                   payoff_matrix=[[3, 0], [5, 1]],
+                                   skip_no_op_steps=True, record="ring",
+                                   record_size=5)
+        mp.play()
+        self.assertEqual(len(mp), mp.steps + 1)
+        self.assertEqual(len(mp.populations), 5)
+        self.assertEqual(mp.populations[-1], Counter({"Defector": 20}))
+        self.assertEqual(mp.populations.steps()[-1], mp.steps)
+        self.assertEqual(mp.score_history.width, 2)
+
+    def test_population_plot(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        axelrod.seed(0)
+        mp = TypeCountMoranProcess(players, counts=[5, 5], turns=5)
+        mp.play()
+        ax = mp.populations_plot()
+        self.assertEqual(ax.get_xlim(), (-0.9, 18.9))
+        self.assertEqual(ax.get_ylim(), (0, 10.5))
+
+    def test_transition_probabilities_bd(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = TypeCountMoranProcess(players, counts=[2, 1],
+                                   payoff_matrix=[[3, 0], [5, 1]])
+        transitions = mp.transition_probabilities()
+        np.testing.assert_array_almost_equal(
+            transitions, [[2 / 3 * 6 / 16, 2 / 3 * 10 / 16],
+                          [1 / 3 * 6 / 16, 1 / 3 * 10 / 16]])
+
+    def test_transition_probabilities_db(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = TypeCountMoranProcess(players, counts=[2, 1], mode="db",
+                                   payoff_matrix=[[3, 0], [5, 1]])
+        transitions = mp.transition_probabilities()
+        np.testing.assert_array_almost_equal(transitions,
+                                             [[0, 2 / 3], [1 / 3, 0]])
+
+    def test_transition_probabilities_with_mutation(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()]
+        for mode in ["bd", "db"]:
+            mp = TypeCountMoranProcess(players, counts=[5, 3, 0], mode=mode,
+                                       mutation_rate=.1,
+                                       payoff_matrix=[[3, 0, 3],
+                                                      [5, 1, 1],
+                                                      [3, 1, 3]])
+            transitions = mp.transition_probabilities()
+            self.assertAlmostEqual(transitions.sum(), 1)
+            np.testing.assert_array_almost_equal(transitions[2], [0, 0, 0])
+            self.assertGreater(transitions[0, 2], 0)
+
+    def test_skip_no_op_steps(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        for mode in ["bd", "db"]:
+            axelrod.seed(0)
+            mp = TypeCountMoranProcess(players, counts=[10, 10], mode=mode,
+                                       payoff_matrix=[[3, 0], [5, 1]],
+                                       skip_no_op_steps=True)
+            populations = mp.play()
+            self.assertEqual(mp.winning_strategy_name, "Defector")
+            self.assertEqual(len(populations), mp.steps + 1)
+            for previous, population in zip(populations, populations[1:]):
+                changes = abs(previous["Defector"] - population["Defector"])
+                self.assertLessEqual(changes, 1)
+            self.assertEqual(len(mp.score_history),
+                             sum(previous != population
+                                 for previous, population
+                                 in zip(populations, populations[1:])))
+
+    def test_run_length_encode(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        for skip_no_op_steps in [True, False]:
+            axelrod.seed(1)
+            mp = TypeCountMoranProcess(players, counts=[10, 10],
+                                       payoff_matrix=[[3, 0], [5, 1]],
+                                       skip_no_op_steps=skip_no_op_steps,
+                                       run_length_encode=True)
+            populations = mp.play()
+            self.assertEqual(len(populations), len(mp.population_steps))
+            self.assertEqual(mp.population_steps[0], 0)
+            self.assertEqual(mp.population_steps[-1], mp.steps)
+            for previous, population in zip(populations, populations[1:]):
+                self.assertNotEqual(previous, population)
+            for previous, step in zip(mp.population_steps,
+                                      mp.population_steps[1:]):
+                self.assertLess(previous, step)
+            mp.reset()
+            self.assertEqual(mp.population_steps, [0])
+            self.assertEqual(mp.steps, 0)
+
+    def test_skip_no_op_steps_matches_original_distribution(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        repetitions = 1000
+        for mode in ["bd", "db"]:
+            results = []
+            for skip_no_op_steps in [False, True]:
+                axelrod.seed(0)
+                mp = TypeCountMoranProcess(players, counts=[6, 2], mode=mode,
+                                           payoff_matrix=[[3, 1], [4, 2]],
+                                           skip_no_op_steps=skip_no_op_steps)
+                winners = Counter()
+                steps = 0
+                for _ in range(repetitions):
+                    mp.play()
+                    winners[mp.winning_strategy_name] += 1
+                    steps += mp.steps
+                    mp.reset()
+                results.append((winners["Defector"] / repetitions,
+                                steps / repetitions))
+            (original_fixation, original_steps), (fixation, steps) = results
+            self.assertAlmostEqual(original_fixation, fixation, delta=.06)
+            self.assertAlmostEqual(original_steps / steps, 1, delta=.15)
+
+    def test_no_possible_change(self):
+        players = [axelrod.Cooperator()]
+        mp = TypeCountMoranProcess(players, counts=[3], mutation_rate=.5,
+                                   payoff_matrix=[[3]],
+                                   skip_no_op_steps=True)
+        next(mp)
+        self.assertEqual(mp.steps, 1)
+        self.assertEqual(mp.populations, [Counter({"Cooperator": 3})] * 2)
+
+
+class TestAnalyticMoranProcess(unittest.TestCase):
+
+    def test_states(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()]
+        mp = AnalyticMoranProcess(players, counts=[1, 1, 1],
+                                  payoff_matrix=np.ones((3, 3)))
+        states = mp.states()
+        self.assertEqual(len(states), 10)
+        self.assertEqual(len(set(states)), 10)
+        for state in states:
+            self.assertEqual(sum(state), 3)
+
+    def test_transition_matrix(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        for mode in ["bd", "db"]:
+            mp = AnalyticMoranProcess(players, counts=[2, 1], mode=mode,
+                                      payoff_matrix=[[3, 0], [5, 1]])
+            matrix = mp.transition_matrix().toarray()
+            np.testing.assert_array_almost_equal(matrix.sum(axis=1),
+                                                 [1, 1, 1, 1])
+            states = mp.states()
+            self.assertEqual(matrix[states.index((0, 3)),
+                                    states.index((0, 3))], 1)
+            self.assertEqual(matrix[states.index((3, 0)),
+                                    states.index((3, 0))], 1)
+
+    def test_neutral_fixation(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        for mode in ["bd", "db"]:
+            mp = AnalyticMoranProcess(players, counts=[4, 1], mode=mode,
+                                      payoff_matrix=[[1, 1], [1, 1]])
+            probabilities = mp.fixation_probabilities()
+            self.assertAlmostEqual(probabilities["Cooperator"], 4 / 5)
+            self.assertAlmostEqual(probabilities["Defector"], 1 / 5)
+
+    def test_product_formula_matches_chain(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        for mode in ["bd", "db"]:
+            mp = AnalyticMoranProcess(players, counts=[6, 4], mode=mode,
+                                      payoff_matrix=[[3, 1], [4, 2]])
+            probability = mp._two_type_fixation_probability()
+            initial, fundamental, exits = mp._absorbing_chain()
+            absorption = spsolve(fundamental, exits)[initial]
+            self.assertAlmostEqual(probability, absorption[0])
+            self.assertAlmostEqual(mp.fixation_probabilities()["Defector"],
+                                   absorption[1])
+
+    def test_large_two_type_population(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = AnalyticMoranProcess(players, counts=[600, 400],
+                                  payoff_matrix=[[3, 1], [4, 2]])
+        probabilities = mp.fixation_probabilities()
+        self.assertAlmostEqual(probabilities["Defector"], 1)
+        self.assertGreater(mp.absorption_time(), 1000)
+
+    def test_without_product_formula(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = AnalyticMoranProcess(players, counts=[3, 2],
+                                  payoff_matrix=[[3, 0], [5, 1]])
+        self.assertIsNone(mp._two_type_fixation_probability())
+        probabilities = mp.fixation_probabilities()
+        self.assertAlmostEqual(sum(probabilities.values()), 1)
+        self.assertGreater(probabilities["Defector"], .5)
+
+    def test_matches_simulation(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()]
+        payoff_matrix = [[3, 0, 3], [5, 1, 1.4], [3, .9, 3]]
+        mp = AnalyticMoranProcess(players, counts=[2, 2, 2],
+                                  payoff_matrix=payoff_matrix)
+        probabilities = mp.fixation_probabilities()
+        self.assertAlmostEqual(sum(probabilities.values()), 1)
+        estimate = estimate_fixation(players, trials=2000, seed=0,
+                                     process_class=TypeCountMoranProcess,
+                                     counts=[2, 2, 2],
+                                     payoff_matrix=payoff_matrix)
+        for name, probability in probabilities.items():
+            self.assertAlmostEqual(probability,
+                                   estimate.probabilities[name], delta=.04)
+        times = mp.fixation_times()
+        for name, time in times.items():
+            self.assertAlmostEqual(time / estimate.mean_times[name], 1,
+                                   delta=.1)
+        total = sum(probabilities[name] * times[name] for name in times)
+        self.assertAlmostEqual(mp.absorption_time(), total)
+
+    def test_neutral_absorption_time(self):
+        """The expected absorption time of a neutral bd process from one
+        mutant is N H_{N - 1}"""
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = AnalyticMoranProcess(players, counts=[4, 1],
+                                  payoff_matrix=[[1, 1], [1, 1]])
+        harmonic = sum(1 / k for k in range(1, 5))
+        self.assertAlmostEqual(mp.absorption_time(), 5 * harmonic)
+
+    def test_fixated_population(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()]
+        mp = AnalyticMoranProcess(players, counts=[3, 0, 0],
+                                  payoff_matrix=np.ones((3, 3)))
+        self.assertEqual(mp.fixation_probabilities(),
+                         {"Cooperator": 1, "Defector": 0, "Tit For Tat": 0})
+        self.assertEqual(mp.absorption_time(), 0)
+        times = mp.fixation_times()
+        self.assertEqual(times["Cooperator"], 0)
+        self.assertTrue(np.isnan(times["Defector"]))
+
+    def test_stationary_distribution(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = AnalyticMoranProcess(players, counts=[2, 2], mutation_rate=.1,
+                                  payoff_matrix=[[1, 1], [1, 1]])
+        distribution = mp.stationary_distribution()
+        self.assertEqual(sorted(distribution), mp.states())
+        self.assertAlmostEqual(sum(distribution.values()), 1)
+        self.assertAlmostEqual(distribution[(0, 4)], distribution[(4, 0)])
+        self.assertAlmostEqual(distribution[(1, 3)], distribution[(3, 1)])
+        matrix = mp.transition_matrix().toarray()
+        vector = np.array([distribution[state] for state in mp.states()])
+        np.testing.assert_array_almost_equal(vector.dot(matrix), vector)
+
+    def test_mutation_rate(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = AnalyticMoranProcess(players, counts=[2, 2], mutation_rate=.1,
+                                  payoff_matrix=[[1, 1], [1, 1]])
+        with self.assertRaises(ValueError):
+            mp.fixation_probabilities()
+        with self.assertRaises(ValueError):
+            mp.absorption_time()
+        with self.assertRaises(ValueError):
+            mp.fixation_times()
+        mp = AnalyticMoranProcess(players, counts=[2, 2],
+                                  payoff_matrix=[[1, 1], [1, 1]])
+        with self.assertRaises(ValueError):
+            mp.stationary_distribution()
+
+    def test_payoffs_from_matches(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        mp = AnalyticMoranProcess(players, counts=[3, 2], turns=5, noise=0)
+        np.testing.assert_array_almost_equal(mp.payoff_matrix,
+                                             [[3, 0], [5, 1]])
+        self.assertAlmostEqual(mp.fixation_probabilities()["Defector"],
+                               0.8730009, places=5)
+
+
+class TestEstimateFixation(unittest.TestCase):
+
+    def test_neutral_fixation(self):
+        players = [axelrod.Cooperator()] * 3 + [axelrod.TitForTat()]
+        estimate = estimate_fixation(players, trials=400, seed=0,
+                                     chunk_size=50, turns=2)
+        self.assertIsInstance(estimate, FixationEstimate)
+        self.assertEqual(estimate.trials, 400)
+        self.assertEqual(sorted(estimate.probabilities),
+                         ["Cooperator", "Tit For Tat"])
+        self.assertAlmostEqual(sum(estimate.probabilities.values()), 1)
+        lower, upper = estimate.intervals["Tit For Tat"]
+        self.assertLessEqual(lower, estimate.probabilities["Tit For Tat"])
+        self.assertGreaterEqual(upper, estimate.probabilities["Tit For Tat"])
+        self.assertLess(lower, 1 / 4)
+        self.assertGreater(upper, 1 / 4)
+        for mean_time in estimate.mean_times.values():
+            self.assertGreaterEqual(mean_time, 1)
+
+    def test_deterministic_outcome(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        estimate = estimate_fixation(players, trials=10, seed=0, turns=5)
+        self.assertEqual(estimate.probabilities,
+                         {"Cooperator": 0, "Defector": 1})
+        self.assertGreaterEqual(estimate.mean_times["Defector"], 1)
+        self.assertTrue(np.isnan(estimate.mean_times["Cooperator"]))
+        lower, upper = estimate.intervals["Defector"]
+        self.assertLess(lower, 1)
+        self.assertAlmostEqual(upper, 1)
+
+    def test_reproducible_with_processes(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat(), axelrod.Random()]
+        serial = estimate_fixation(players, trials=40, seed=1, chunk_size=10,
+                                   turns=5)
+        parallel = estimate_fixation(players, trials=40, seed=1,
+                                     chunk_size=10, processes=2, turns=5)
+        self.assertEqual(serial, parallel)
+        again = estimate_fixation(players, trials=40, seed=1, chunk_size=10,
+                                  turns=5)
+        self.assertEqual(serial, again)
+
+    def test_does_not_reseed_global_random_number_generators(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.Random()]
+        axelrod.seed(0)
+        expected = random.random(), np.random.random()
+
+        axelrod.seed(0)
+        estimate_fixation(players, trials=20, seed=5, chunk_size=10, turns=5)
+        self.assertEqual((random.random(), np.random.random()), expected)
+
+    def test_partial_records(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.Defector()]
+        expected = estimate_fixation(players, trials=20, seed=0, turns=5)
+        self.assertGreater(expected.mean_times["Defector"], 1)
+        for record in ["ring", "every"]:
+            estimate = estimate_fixation(players, trials=20, seed=0, turns=5,
+                                         record=record, record_size=2)
+            self.assertEqual(estimate, expected)
+
+    def test_early_stopping(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        estimate = estimate_fixation(players, trials=1000, seed=0,
+                                     chunk_size=20, tolerance=.2, turns=5)
+        self.assertEqual(estimate.trials, 20)
+        estimate = estimate_fixation(players, trials=1000, seed=0,
+                                     chunk_size=20, processes=2,
+                                     tolerance=.2, turns=5)
+        self.assertEqual(estimate.trials, 20)
+
+    def test_shares_deterministic_cache(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.Random()]
+        cache = axelrod.DeterministicCache()
+        estimate_fixation(players, trials=2, seed=0, turns=5,
+                          deterministic_cache=cache)
+        self.assertEqual(len(cache), 3)
+
+    def test_type_count_process(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        estimate = estimate_fixation(players, trials=50, seed=0,
+                                     process_class=TypeCountMoranProcess,
+                                     counts=[50, 50],
+                                     payoff_matrix=[[1, 1], [1, 1]],
+                                     skip_no_op_steps=True)
+        self.assertEqual(estimate.trials, 50)
+        self.assertGreater(estimate.mean_times["Cooperator"], 100)
+
+    def test_mutation(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        with self.assertRaises(ValueError):
+            estimate_fixation(players, trials=2, mutation_rate=.1)
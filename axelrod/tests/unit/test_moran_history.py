@@ -0,0 +1,121 @@
+import os
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from axelrod.moran_history import (
+    KeepEveryHistory, RingBufferHistory, FileHistory, PopulationHistory,
+    new_history)
+
+
+class TestKeepEveryHistory(unittest.TestCase):
+
+    def test_append(self):
+        history = KeepEveryHistory(2, every=3)
+        for step in range(8):
+            history.append([step, -step])
+        self.assertEqual(history.total, 8)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.steps().tolist(), [0, 3, 6])
+        self.assertEqual(history.array().tolist(), [[0, 0], [3, -3], [6, -6]])
+        self.assertEqual(history[-1].tolist(), [6, -6])
+        self.assertEqual([row.tolist() for row in history],
+                         [[0, 0], [3, -3], [6, -6]])
+
+    def test_clear(self):
+        history = KeepEveryHistory(2)
+        history.extend([[1, 2], [3, 4]])
+        self.assertEqual(len(history), 2)
+        history.clear()
+        self.assertEqual(history.total, 0)
+        self.assertEqual(history.array().shape, (0, 2))
+
+    def test_every(self):
+        with self.assertRaises(ValueError):
+            KeepEveryHistory(2, every=0)
+
+
+class TestRingBufferHistory(unittest.TestCase):
+
+    def test_append(self):
+        history = RingBufferHistory(1, dtype=int, size=3)
+        history.extend([[1], [2]])
+        self.assertEqual(history.array().tolist(), [[1], [2]])
+        self.assertEqual(history.steps().tolist(), [0, 1])
+        history.extend([[3], [4], [5]])
+        self.assertEqual(history.total, 5)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.array().tolist(), [[3], [4], [5]])
+        self.assertEqual(history.steps().tolist(), [2, 3, 4])
+        self.assertEqual(history.array().dtype, np.dtype(int))
+        history.clear()
+        self.assertEqual(len(history), 0)
+
+    def test_size(self):
+        with self.assertRaises(ValueError):
+            RingBufferHistory(2, size=0)
+
+
+class TestFileHistory(unittest.TestCase):
+    filename = "test_outputs/test_history.bin"
+
+    def test_append(self):
+        history = FileHistory(3, filename=self.filename, buffer_size=4)
+        for step in range(10):
+            history.append([step, step / 2, 1])
+        self.assertEqual(os.path.getsize(self.filename), 8 * 8 * 3)
+        self.assertEqual(len(history), 10)
+        array = history.array()
+        self.assertEqual(array.shape, (10, 3))
+        self.assertEqual(os.path.getsize(self.filename), 10 * 8 * 3)
+        self.assertEqual(array[:, 1].tolist(), [step / 2
+                                                for step in range(10)])
+        history.clear()
+        self.assertEqual(os.path.getsize(self.filename), 0)
+        self.assertEqual(history.array().shape, (0, 3))
+
+    def test_temporary_file(self):
+        history = FileHistory(1)
+        filename = history.filename
+        history.append([1])
+        self.assertEqual(history.array().tolist(), [[1]])
+        self.assertTrue(os.path.exists(filename))
+        del history
+        self.assertFalse(os.path.exists(filename))
+
+
+class TestPopulationHistory(unittest.TestCase):
+
+    def test_populations(self):
+        populations = PopulationHistory(
+            ["Cooperator", "Defector"], KeepEveryHistory(2, dtype=int))
+        populations.append(Counter({"Cooperator": 3}))
+        populations.extend([Counter({"Cooperator": 2, "Defector": 1})] * 2)
+        self.assertEqual(len(populations), 3)
+        self.assertEqual(populations.total, 3)
+        self.assertEqual(populations[0], Counter({"Cooperator": 3}))
+        self.assertEqual(populations[-1],
+                         Counter({"Cooperator": 2, "Defector": 1}))
+        self.assertEqual(populations[:2],
+                         [Counter({"Cooperator": 3}),
+                          Counter({"Cooperator": 2, "Defector": 1})])
+        self.assertEqual(list(populations)[1], populations[1])
+        self.assertEqual(populations.counts().tolist(),
+                         [[3, 0], [2, 1], [2, 1]])
+        self.assertEqual(populations.steps().tolist(), [0, 1, 2])
+
+
+class TestNewHistory(unittest.TestCase):
+
+    def test_new_history(self):
+        history = new_history("every", 2, size=5)
+        self.assertIsInstance(history, KeepEveryHistory)
+        self.assertEqual(history.every, 5)
+        history = new_history("ring", 2, size=5)
+        self.assertIsInstance(history, RingBufferHistory)
+        self.assertEqual(history.size, 5)
+        history = new_history("file", 2)
+        self.assertIsInstance(history, FileHistory)
+        with self.assertRaises(ValueError):
+            new_history("all", 2)
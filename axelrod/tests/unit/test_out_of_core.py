@@ -0,0 +1,221 @@
+import csv
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import axelrod
+from axelrod.out_of_core import (STATE_COLUMNS, STATE_TO_ACTION_COLUMNS,
+                                 OutOfCoreResultSet)
+
+
+C, D = axelrod.Action.C, axelrod.Action.D
+
+
+class TestOutOfCoreResultSet(unittest.TestCase):
+
+    filename = "test_outputs/test_results.csv"
+    players = [axelrod.Alternator(), axelrod.TitForTat(), axelrod.Defector()]
+    repetitions = 3
+
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = axelrod.ResultSet(cls.filename, cls.players,
+                                         cls.repetitions, progress_bar=False)
+        # A small memory limit forces several chunks and blocks.
+        cls.results = OutOfCoreResultSet(cls.filename, cls.players,
+                                         cls.repetitions, memory_limit=1000,
+                                         progress_bar=False)
+
+    def assertArrayAlmostEqual(self, array, expected):
+        np.testing.assert_array_almost_equal(np.asarray(array),
+                                             np.asarray(expected))
+
+    def test_init(self):
+        self.assertEqual(self.results.players, self.players)
+        self.assertEqual(self.results.num_players, len(self.players))
+        self.assertEqual(self.results.chunksize, 1)
+        self.assertEqual(self.results.block_size, 1)
+        self.assertTrue(os.path.isdir(self.results.directory))
+        self.assertIsInstance(self.results.payoff_matrix, np.memmap)
+
+    def test_with_progress_bar(self):
+        results = OutOfCoreResultSet(self.filename, self.players,
+                                     self.repetitions, progress_bar=True)
+        self.assertGreater(results.progress_bar.n, 0)
+
+    def test_temporary_directory_is_removed(self):
+        results = OutOfCoreResultSet(self.filename, self.players,
+                                     self.repetitions, progress_bar=False)
+        directory = results.directory
+        del results
+        self.assertFalse(os.path.exists(directory))
+
+    def test_given_directory(self):
+        directory = tempfile.mkdtemp()
+        results = OutOfCoreResultSet(self.filename, self.players,
+                                     self.repetitions, directory=directory,
+                                     progress_bar=False)
+        self.assertEqual(results.directory, directory)
+        loaded = np.load(os.path.join(directory, "payoff_matrix.npy"))
+        self.assertArrayAlmostEqual(loaded, self.expected.payoff_matrix)
+        del results
+        self.assertTrue(os.path.exists(directory))
+
+    def test_wins_and_scores(self):
+        self.assertArrayAlmostEqual(self.results.wins, self.expected.wins)
+        self.assertArrayAlmostEqual(self.results.scores, self.expected.scores)
+        self.assertArrayAlmostEqual(self.results.normalised_scores,
+                                    self.expected.normalised_scores)
+
+    def test_ranking(self):
+        self.assertEqual(self.results.ranking, self.expected.ranking)
+        self.assertEqual(self.results.ranked_names, self.expected.ranked_names)
+
+    def test_payoffs(self):
+        for player, opponents in enumerate(self.expected.payoffs):
+            for opponent, payoffs in enumerate(opponents):
+                values = self.results.payoffs[player, opponent]
+                values = values[~np.isnan(values)]
+                self.assertArrayAlmostEqual(values, payoffs)
+        self.assertArrayAlmostEqual(self.results.payoff_matrix,
+                                    self.expected.payoff_matrix)
+        self.assertArrayAlmostEqual(self.results.payoff_stddevs,
+                                    self.expected.payoff_stddevs)
+
+    def test_score_diffs(self):
+        self.assertArrayAlmostEqual(self.results.score_diffs,
+                                    self.expected.score_diffs)
+        self.assertArrayAlmostEqual(self.results.payoff_diffs_means,
+                                    self.expected.payoff_diffs_means)
+
+    def test_match_lengths(self):
+        self.assertEqual(self.results.match_lengths.shape,
+                         (self.repetitions, len(self.players),
+                          len(self.players)))
+        self.assertArrayAlmostEqual(self.results.match_lengths,
+                                    self.expected.match_lengths)
+
+    def test_cooperation(self):
+        self.assertArrayAlmostEqual(self.results.cooperation,
+                                    self.expected.cooperation)
+        self.assertArrayAlmostEqual(self.results.normalised_cooperation,
+                                    self.expected.normalised_cooperation)
+        self.assertArrayAlmostEqual(self.results.vengeful_cooperation,
+                                    self.expected.vengeful_cooperation)
+        self.assertArrayAlmostEqual(self.results.cooperating_rating,
+                                    self.expected.cooperating_rating)
+        self.assertArrayAlmostEqual(self.results.initial_cooperation_count,
+                                    self.expected.initial_cooperation_count)
+        self.assertArrayAlmostEqual(self.results.initial_cooperation_rate,
+                                    self.expected.initial_cooperation_rate)
+
+    def test_good_partner(self):
+        self.assertArrayAlmostEqual(self.results.good_partner_matrix,
+                                    self.expected.good_partner_matrix)
+        self.assertArrayAlmostEqual(self.results.good_partner_rating,
+                                    self.expected.good_partner_rating)
+
+    def test_state_distributions(self):
+        states = [(C, C), (C, D), (D, C), (D, D)]
+        states_to_actions = [(state, action) for state in states
+                             for action in [C, D]]
+        self.assertEqual(len(states), len(STATE_COLUMNS))
+        self.assertEqual(len(states_to_actions), len(STATE_TO_ACTION_COLUMNS))
+        for attribute, keys in [
+                ("state_distribution", states),
+                ("normalised_state_distribution", states),
+                ("state_to_action_distribution", states_to_actions),
+                ("normalised_state_to_action_distribution",
+                 states_to_actions)]:
+            expected = [[[counter[key] for key in keys] for counter in row]
+                        for row in getattr(self.expected, attribute)]
+            self.assertArrayAlmostEqual(getattr(self.results, attribute),
+                                        expected)
+
+    def test_eigen_ratings(self):
+        self.assertArrayAlmostEqual(self.results.eigenjesus_rating,
+                                    self.expected.eigenjesus_rating)
+        self.assertArrayAlmostEqual(self.results.eigenmoses_rating,
+                                    self.expected.eigenmoses_rating)
+
+    def test_summarise(self):
+        summary = self.results.summarise()
+        expected = self.expected.summarise()
+        self.assertEqual(len(summary), len(expected))
+        for player, expected_player in zip(summary, expected):
+            self.assertEqual(player.Rank, expected_player.Rank)
+            self.assertEqual(str(player.Name), str(expected_player.Name))
+            self.assertArrayAlmostEqual(player[2:], expected_player[2:])
+
+    def test_write_summary(self):
+        filename = self.filename + ".out_of_core.summary"
+        self.results.write_summary(filename=filename)
+        with open(filename, "r") as csvfile:
+            rows = list(csv.reader(csvfile))
+        self.assertEqual(rows[0][1], "Name")
+        self.assertEqual([row[1] for row in rows[1:]],
+                         self.expected.ranked_names)
+        for row in rows:
+            self.assertEqual(len(row), 14)
+
+
+class TestOutOfCoreResultSetSpatial(TestOutOfCoreResultSet):
+
+    filename = "test_outputs/test_results_spatial.csv"
+    players = [axelrod.Alternator(), axelrod.TitForTat(), axelrod.Defector(),
+               axelrod.Cooperator()]
+    repetitions = 3
+
+
+class TestOutOfCoreResultSetProbEnd(TestOutOfCoreResultSet):
+    """Matches of varying length and stochastic players"""
+
+    @classmethod
+    def setUpClass(cls):
+        axelrod.seed(1)
+        cls.players = [axelrod.Random(), axelrod.TitForTat(),
+                       axelrod.Grudger(), axelrod.Random(0.7)]
+        cls.repetitions = 4
+        cls.filename = "test_outputs/test_results_out_of_core.csv"
+        tournament = axelrod.Tournament(cls.players, prob_end=0.2,
+                                        repetitions=cls.repetitions)
+        tournament.play(filename=cls.filename, progress_bar=False)
+        super().setUpClass()
+
+
+class TestTournamentMemoryLimit(unittest.TestCase):
+
+    def test_play_with_memory_limit(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat(), axelrod.Grudger()]
+        tournament = axelrod.Tournament(players, turns=10, repetitions=2)
+        expected = tournament.play(progress_bar=False)
+        results = tournament.play(progress_bar=False, memory_limit=10 ** 4)
+        self.assertIsInstance(results, axelrod.OutOfCoreResultSet)
+        self.assertEqual(results.ranked_names, expected.ranked_names)
+        np.testing.assert_array_almost_equal(results.payoff_matrix,
+                                             expected.payoff_matrix)
+
+    def test_non_integer_game(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()]
+        game = axelrod.Game(r=3.3, s=0.1, t=5.2, p=1.1)
+        tournament = axelrod.Tournament(players, game=game, turns=3,
+                                        repetitions=2)
+        expected = tournament.play(progress_bar=False)
+        results = tournament.play(progress_bar=False, memory_limit=10 ** 4)
+        np.testing.assert_array_almost_equal(results.scores, expected.scores)
+        np.testing.assert_array_almost_equal(results.payoff_matrix,
+                                             expected.payoff_matrix)
+
+    def test_memory_limit_with_sparse_or_backend(self):
+        players = [axelrod.Cooperator(), axelrod.Defector()]
+        tournament = axelrod.Tournament(players, turns=10, repetitions=2)
+        with self.assertRaises(ValueError):
+            tournament.play(progress_bar=False, memory_limit=10 ** 4,
+                            sparse=True)
+        with self.assertRaises(ValueError):
+            tournament.play(progress_bar=False, memory_limit=10 ** 4,
+                            backend="numpy")
@@ -4,6 +4,7 @@ import random
 import unittest
 import numpy
 from axelrod import random_choice, seed, Action, Pdf
+from axelrod.random_ import alias_table
 
 C, D = Action.C, Action.D
 
@@ -74,3 +75,35 @@ class TestPdf(unittest.TestCase):
             sample = self.pdf.sample()
             seed(s)
             self.assertEqual(sample, self.pdf.sample())
+
+    def test_sample_size(self):
+        seed(0)
+        samples = self.pdf.sample(size=10000)
+        self.assertEqual(len(samples), 10000)
+        frequencies = Counter(samples)
+        for outcome, count in self.counter.items():
+            self.assertAlmostEqual(frequencies[outcome] / 10000,
+                                   count / self.pdf.total, places=1)
+
+    def test_sample_indices(self):
+        seed(0)
+        indices = self.pdf.sample_indices(size=5)
+        self.assertEqual(len(indices), 5)
+        self.assertTrue(all(0 <= index < self.pdf.size for index in indices))
+        self.assertIn(self.pdf.sample_indices(), range(self.pdf.size))
+
+    def test_alias_table(self):
+        probability = [.1, .2, .3, .4]
+        alias_probability, alias = alias_table(probability)
+        # The probability of each outcome is the sum of the probability of
+        # keeping its column and of the columns aliasing to it
+        total = alias_probability.copy()
+        for column, target in enumerate(alias):
+            total[target] += 1 - alias_probability[column]
+        for expected, actual in zip(probability, total / 4):
+            self.assertAlmostEqual(expected, actual)
+
+    def test_single_outcome(self):
+        pdf = Pdf(Counter([(3, 3)]))
+        self.assertEqual(pdf.sample(), (3, 3))
+        self.assertEqual(pdf.sample(size=3), [(3, 3)] * 3)
@@ -1,8 +1,10 @@
 import csv
 from collections import Counter
 import unittest
+from unittest.mock import patch
 
 from hypothesis import given, settings
+import numpy as np
 from numpy import mean, std, nanmedian
 from dask.dataframe.core import DataFrame
 import pandas as pd
@@ -16,6 +18,15 @@ from axelrod.tests.property import tournaments, prob_end_tournaments
 C, D = axelrod.Action.C, axelrod.Action.D
 
 
+def flatten(values):
+    """Yields the numbers of arbitrarily nested lists or arrays."""
+    if isinstance(values, (list, tuple)):
+        for value in values:
+            yield from flatten(value)
+    else:
+        yield from np.ravel(values)
+
+
 class TestResultSet(unittest.TestCase):
 
     @classmethod
@@ -1158,3 +1169,199 @@ class TestCreateCounterDict(unittest.TestCase):
                          Counter({"Var 1": 20, "Var 2": 2}))
         self.assertEqual(create_counter_dict(df, 7, 3, key_map),
                          Counter({"Var 1": 30}))
+
+
+class TestMerge(unittest.TestCase):
+    """Tests for combining the result sets of parts of a tournament"""
+    @classmethod
+    def setUpClass(cls):
+        cls.players = [axelrod.Alternator(), axelrod.TitForTat(),
+                       axelrod.Defector(), axelrod.Grudger()]
+        cls.turns = 5
+
+    def play(self, repetitions, edges=None):
+        tournament = axelrod.Tournament(self.players, turns=self.turns,
+                                        repetitions=repetitions, edges=edges)
+        return tournament.play(progress_bar=False)
+
+    def test_merge_repetitions(self):
+        expected = self.play(repetitions=3)
+        merged = self.play(repetitions=2).merge(self.play(repetitions=1))
+        self.assertIsInstance(merged, axelrod.ResultSet)
+        self.assertEqual(merged.repetitions, 3)
+        self.assertIsNone(merged.filename)
+        self.assertEqual(merged, expected)
+        self.assertEqual(merged.state_distribution,
+                         expected.state_distribution)
+        self.assertEqual(merged.initial_cooperation_rate,
+                         expected.initial_cooperation_rate)
+        self.assertEqual(merged.summarise(), expected.summarise())
+
+    def test_merge_pairs(self):
+        edges = [(0, 1), (2, 3), (0, 2), (1, 3), (1, 2)]
+        expected = self.play(repetitions=2, edges=edges)
+        first = self.play(repetitions=2, edges=edges[:2])
+        second = self.play(repetitions=2, edges=edges[2:])
+        merged = first.merge(second, axis="pairs")
+        self.assertEqual(merged.repetitions, 2)
+        self.assertEqual(merged, expected)
+        self.assertEqual(merged.state_to_action_distribution,
+                         expected.state_to_action_distribution)
+        self.assertEqual(merged.good_partner_rating,
+                         expected.good_partner_rating)
+
+    def test_merge_with_progress_bar(self):
+        merged = self.play(repetitions=1).merge(self.play(repetitions=1),
+                                                progress_bar=True)
+        self.assertEqual(merged.progress_bar.total, 25)
+        self.assertEqual(merged.progress_bar.n, merged.progress_bar.total)
+
+    def test_combine(self):
+        expected = self.play(repetitions=3)
+        combined = axelrod.result_set.combine(
+            [self.play(repetitions=1) for _ in range(3)])
+        self.assertEqual(combined, expected)
+
+        blocks = [[(0, 1), (2, 3)], [(0, 2), (1, 3)], [(0, 3), (1, 2)]]
+        expected = self.play(repetitions=1,
+                             edges=[edge for block in blocks for edge in block])
+        combined = axelrod.result_set.combine(
+            [self.play(repetitions=1, edges=block) for block in blocks],
+            axis="pairs")
+        self.assertEqual(combined, expected)
+
+    def test_combine_requires_result_sets(self):
+        with self.assertRaises(ValueError):
+            axelrod.result_set.combine([])
+
+    def test_merge_errors(self):
+        results = self.play(repetitions=1, edges=[(0, 1), (2, 3)])
+        with self.assertRaises(ValueError):
+            results.merge(results, axis="pairs")
+        with self.assertRaises(ValueError):
+            results.merge(self.play(repetitions=2, edges=[(0, 2), (1, 3)]),
+                          axis="pairs")
+        with self.assertRaises(ValueError):
+            results.merge(results, axis="players")
+
+        tournament = axelrod.Tournament(self.players[:2], turns=self.turns,
+                                        repetitions=1)
+        with self.assertRaises(ValueError):
+            results.merge(tournament.play(progress_bar=False))
+
+
+class TestBackends(unittest.TestCase):
+    # The backends reduce the float columns in different orders so their
+    # result sets are only compared up to rounding
+    attributes = ["wins", "match_lengths", "scores", "normalised_scores",
+                  "payoffs", "payoff_matrix", "payoff_stddevs", "score_diffs",
+                  "payoff_diffs_means", "cooperation",
+                  "normalised_cooperation", "vengeful_cooperation",
+                  "cooperating_rating", "good_partner_matrix",
+                  "good_partner_rating", "eigenmoses_rating",
+                  "eigenjesus_rating"]
+    sparse_attributes = ["wins", "scores", "normalised_scores",
+                         "edge_match_lengths", "edge_payoffs",
+                         "edge_score_diffs", "payoff_matrix",
+                         "payoff_stddevs", "payoff_diffs_means",
+                         "cooperation", "normalised_cooperation",
+                         "vengeful_cooperation", "cooperating_rating",
+                         "good_partner_matrix", "good_partner_rating",
+                         "eigenmoses_rating", "eigenjesus_rating"]
+
+    def assertResultSetsClose(self, results, expected, attributes=None):
+        self.assertEqual(results.ranked_names, expected.ranked_names)
+        for attribute in attributes or self.attributes:
+            actual, desired = getattr(results, attribute), getattr(expected,
+                                                                   attribute)
+            if hasattr(actual, "data"):
+                actual, desired = (np.asarray(actual.data),
+                                   np.asarray(desired.data))
+            # Some attributes hold a list for each pair of players
+            actual, desired = list(flatten(actual)), list(flatten(desired))
+            np.testing.assert_allclose(actual, desired, rtol=1e-12,
+                                       err_msg=attribute)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.files = [("test_outputs/test_results.csv",
+                      [axelrod.Alternator(), axelrod.TitForTat(),
+                       axelrod.Defector()]),
+                     ("test_outputs/test_results_spatial.csv",
+                      [axelrod.Alternator(), axelrod.TitForTat(),
+                       axelrod.Defector()]),
+                     # Only self interactions
+                     ("test_outputs/test_results_spatial_three.csv",
+                      [axelrod.Alternator(), axelrod.TitForTat(),
+                       axelrod.Defector(), axelrod.Cooperator()])]
+        axelrod.seed(0)
+        filename = "test_outputs/test_results_backends.csv"
+        players = [axelrod.Random(), axelrod.TitForTat(),
+                   axelrod.Cooperator(), axelrod.Grudger()]
+        tournament = axelrod.Tournament(players, prob_end=.2, repetitions=3)
+        tournament.play(filename=filename, progress_bar=False)
+        cls.files.append((filename, players))
+
+    def test_backends_agree(self):
+        for filename, players in self.files:
+            results = {
+                backend: axelrod.ResultSet(filename, players, 3,
+                                           progress_bar=False,
+                                           backend=backend)
+                for backend in ["numpy", "pandas", "dask"]}
+            for backend, result_set in results.items():
+                self.assertEqual(result_set.backend, backend)
+                self.assertResultSetsClose(result_set, results["dask"])
+                for aggregate, expected in zip(result_set._aggregates,
+                                               results["dask"]._aggregates):
+                    self.assertEqual(list(aggregate.index.names),
+                                     list(expected.index.names))
+                    pd.testing.assert_index_equal(aggregate.index,
+                                                  expected.index)
+                    self.assertTrue(np.allclose(aggregate.values,
+                                                expected.values))
+
+    def test_dask_backend_with_processes(self):
+        filename, players = self.files[0]
+        results = axelrod.ResultSet(filename, players, 3, processes=2,
+                                    progress_bar=False, backend="dask")
+        expected = axelrod.ResultSet(filename, players, 3,
+                                     progress_bar=False, backend="numpy")
+        self.assertResultSetsClose(results, expected)
+
+    def test_sparse_result_set_backends(self):
+        filename, players = self.files[1]
+        results = axelrod.SparseResultSet(filename, players, 3,
+                                          progress_bar=False, backend="numpy")
+        expected = axelrod.SparseResultSet(filename, players, 3,
+                                           progress_bar=False,
+                                           backend="pandas")
+        self.assertResultSetsClose(results, expected, self.sparse_attributes)
+
+    def test_unknown_backend(self):
+        filename, players = self.files[0]
+        with self.assertRaises(ValueError):
+            axelrod.ResultSet(filename, players, 3, progress_bar=False,
+                              backend="spark")
+
+    def test_choose_backend(self):
+        filename, _ = self.files[0]
+        self.assertEqual(axelrod.result_set.choose_backend(filename), "numpy")
+        with patch("axelrod.result_set.NUMPY_MAX_FILE_SIZE", 0):
+            self.assertEqual(axelrod.result_set.choose_backend(filename),
+                             "pandas")
+            with patch("axelrod.result_set.PANDAS_MAX_FILE_SIZE", 0):
+                self.assertEqual(axelrod.result_set.choose_backend(filename),
+                                 "dask")
+                results = axelrod.ResultSet(filename, self.files[0][1], 3,
+                                            progress_bar=False)
+                self.assertEqual(results.backend, "dask")
+
+    def test_tournament_backend(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat()]
+        tournament = axelrod.Tournament(players, turns=5, repetitions=2)
+        results = tournament.play(progress_bar=False, backend="pandas")
+        self.assertEqual(results.backend, "pandas")
+        self.assertResultSetsClose(results, tournament.play(
+            progress_bar=False, backend="dask"))
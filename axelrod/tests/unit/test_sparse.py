@@ -0,0 +1,203 @@
+import unittest
+
+import matplotlib.pyplot as plt
+import numpy as np
+from scipy.sparse import csr_matrix
+
+import axelrod
+from axelrod.out_of_core import STATE_COLUMNS, STATE_TO_ACTION_COLUMNS
+
+
+C, D = axelrod.Action.C, axelrod.Action.D
+
+
+class TestSparseResultSet(unittest.TestCase):
+
+    filename = "test_outputs/test_results_spatial.csv"
+    players = [axelrod.Alternator(), axelrod.TitForTat(), axelrod.Defector(),
+               axelrod.Cooperator()]
+    repetitions = 3
+    expected_edges = [[0, 1], [0, 2], [1, 0], [2, 0]]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = axelrod.ResultSet(cls.filename, cls.players,
+                                         cls.repetitions, progress_bar=False)
+        cls.results = axelrod.SparseResultSet(cls.filename, cls.players,
+                                              cls.repetitions,
+                                              progress_bar=False)
+
+    def assertArrayAlmostEqual(self, array, expected):
+        if hasattr(array, "toarray"):
+            array = array.toarray()
+        np.testing.assert_array_almost_equal(np.asarray(array),
+                                             np.asarray(expected))
+
+    def dense(self, values, alternative=0):
+        """Expand an array indexed by edges to a players x players array"""
+        n = len(self.players)
+        array = np.full((n, n) + values.shape[1:], alternative, dtype=float)
+        array[self.results.edges[:, 0], self.results.edges[:, 1]] = values
+        return array
+
+    def test_init(self):
+        self.assertEqual(self.results.players, self.players)
+        self.assertEqual(self.results.num_players, len(self.players))
+        self.assertIsInstance(self.results, axelrod.ResultSet)
+
+    def test_with_progress_bar(self):
+        results = axelrod.SparseResultSet(self.filename, self.players,
+                                          self.repetitions, progress_bar=True)
+        self.assertEqual(results.progress_bar.total, 14)
+        self.assertEqual(results.progress_bar.n, results.progress_bar.total)
+
+    def test_edges(self):
+        self.assertEqual(self.results.edges.tolist(), self.expected_edges)
+        self.assertEqual(len(self.results.indptr), len(self.players) + 1)
+        self.assertEqual(self.results.indptr[-1], len(self.expected_edges))
+
+    def test_wins_and_scores(self):
+        self.assertArrayAlmostEqual(self.results.wins, self.expected.wins)
+        self.assertArrayAlmostEqual(self.results.scores, self.expected.scores)
+        self.assertArrayAlmostEqual(self.results.normalised_scores,
+                                    self.expected.normalised_scores)
+
+    def test_ranking(self):
+        self.assertEqual(self.results.ranking, self.expected.ranking)
+        self.assertEqual(self.results.ranked_names, self.expected.ranked_names)
+
+    def test_payoffs(self):
+        for player, (start, stop) in enumerate(zip(self.results.indptr,
+                                                   self.results.indptr[1:])):
+            self.assertEqual(len(self.results.payoffs[player]), stop - start)
+            for edge, payoffs in zip(self.results.edges[start:stop],
+                                     self.results.payoffs[player]):
+                self.assertArrayAlmostEqual(
+                    payoffs[~np.isnan(payoffs)],
+                    self.expected.payoffs[player][edge[1]])
+        self.assertIsInstance(self.results.payoff_matrix, csr_matrix)
+        self.assertArrayAlmostEqual(self.results.payoff_matrix,
+                                    self.expected.payoff_matrix)
+        self.assertArrayAlmostEqual(self.results.payoff_stddevs,
+                                    self.expected.payoff_stddevs)
+
+    def test_score_diffs(self):
+        self.assertArrayAlmostEqual(self.dense(self.results.edge_score_diffs),
+                                    self.expected.score_diffs)
+        self.assertArrayAlmostEqual(self.results.payoff_diffs_means,
+                                    self.expected.payoff_diffs_means)
+
+    def test_match_lengths(self):
+        self.assertEqual(len(self.results.match_lengths), self.repetitions)
+        expected = np.array(self.expected.match_lengths).transpose(1, 2, 0)
+        self.assertArrayAlmostEqual(
+            self.dense(self.results.edge_match_lengths), expected)
+
+    def test_cooperation(self):
+        for attribute in ["cooperation", "normalised_cooperation",
+                          "good_partner_matrix"]:
+            self.assertArrayAlmostEqual(getattr(self.results, attribute),
+                                        getattr(self.expected, attribute))
+        self.assertArrayAlmostEqual(
+            self.dense(self.results.vengeful_cooperation.data, alternative=-1),
+            self.expected.vengeful_cooperation)
+        for attribute in ["cooperating_rating", "good_partner_rating",
+                          "initial_cooperation_count",
+                          "initial_cooperation_rate"]:
+            self.assertArrayAlmostEqual(getattr(self.results, attribute),
+                                        getattr(self.expected, attribute))
+
+    def test_state_distributions(self):
+        states = [(C, C), (C, D), (D, C), (D, D)]
+        states_to_actions = [(state, action) for state in states
+                             for action in [C, D]]
+        self.assertEqual(len(states), len(STATE_COLUMNS))
+        self.assertEqual(len(states_to_actions), len(STATE_TO_ACTION_COLUMNS))
+        for attribute, keys in [
+                ("state_distribution", states),
+                ("normalised_state_distribution", states),
+                ("state_to_action_distribution", states_to_actions),
+                ("normalised_state_to_action_distribution",
+                 states_to_actions)]:
+            expected = [[[counter[key] for key in keys] for counter in row]
+                        for row in getattr(self.expected, attribute)]
+            self.assertArrayAlmostEqual(
+                self.dense(getattr(self.results, attribute)), expected)
+
+    def test_eigen_ratings(self):
+        self.assertArrayAlmostEqual(self.results.eigenjesus_rating,
+                                    self.expected.eigenjesus_rating)
+        self.assertArrayAlmostEqual(self.results.eigenmoses_rating,
+                                    self.expected.eigenmoses_rating)
+
+    def test_summarise(self):
+        summary = self.results.summarise()
+        expected = self.expected.summarise()
+        self.assertEqual(len(summary), len(expected))
+        for player, expected_player in zip(summary, expected):
+            self.assertEqual(player.Rank, expected_player.Rank)
+            self.assertEqual(str(player.Name), str(expected_player.Name))
+            self.assertArrayAlmostEqual(player[2:], expected_player[2:])
+
+    def test_equality(self):
+        results = axelrod.SparseResultSet(self.filename, self.players,
+                                          self.repetitions,
+                                          progress_bar=False)
+        self.assertEqual(results, self.results)
+
+        tournament = axelrod.Tournament(self.players, turns=2, repetitions=3)
+        self.assertNotEqual(tournament.play(progress_bar=False, sparse=True),
+                            self.results)
+
+    def test_plots(self):
+        plot = axelrod.Plot(self.results)
+        dense_plot = axelrod.Plot(self.expected)
+        self.assertEqual(plot._payoff_dataset, dense_plot._payoff_dataset)
+        self.assertEqual(plot._pdplot_dataset, dense_plot._pdplot_dataset)
+        self.assertArrayAlmostEqual(plot._boxplot_dataset,
+                                    dense_plot._boxplot_dataset)
+        for method in ["boxplot", "payoff", "winplot", "sdvplot", "pdplot",
+                       "lengthplot"]:
+            figure = getattr(plot, method)()
+            self.assertIsInstance(figure, plt.Figure)
+            plt.close(figure)
+
+
+class TestSparseResultSetFullRoundRobin(TestSparseResultSet):
+
+    filename = "test_outputs/test_results.csv"
+    players = [axelrod.Alternator(), axelrod.TitForTat(), axelrod.Defector()]
+    repetitions = 3
+    expected_edges = [[0, 1], [0, 2], [1, 0], [1, 2], [2, 0], [2, 1]]
+
+
+class TestTournament(unittest.TestCase):
+
+    def test_play_sparse(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat(), axelrod.Grudger()]
+        edges = [(0, 1), (1, 2), (2, 3), (3, 0)]
+        tournament = axelrod.Tournament(players, turns=10, repetitions=2,
+                                        edges=edges)
+        expected = tournament.play(progress_bar=False)
+        results = tournament.play(progress_bar=False, sparse=True)
+        self.assertIsInstance(results, axelrod.SparseResultSet)
+        self.assertEqual(len(results.edges), 2 * len(edges))
+        self.assertEqual(results.ranked_names, expected.ranked_names)
+        np.testing.assert_array_almost_equal(
+            results.payoff_matrix.toarray(), expected.payoff_matrix)
+
+    def test_merge(self):
+        players = [axelrod.Cooperator(), axelrod.Defector(),
+                   axelrod.TitForTat(), axelrod.Grudger()]
+        edges = [(0, 1), (2, 3)]
+        tournament = axelrod.Tournament(players, turns=10, repetitions=3,
+                                        edges=edges)
+        expected = tournament.play(progress_bar=False, sparse=True)
+        tournament = axelrod.Tournament(players, turns=10, repetitions=1,
+                                        edges=edges)
+        results = [tournament.play(progress_bar=False, sparse=True)
+                   for _ in range(3)]
+        merged = axelrod.result_set.combine(results)
+        self.assertIsInstance(merged, axelrod.SparseResultSet)
+        self.assertEqual(merged, expected)
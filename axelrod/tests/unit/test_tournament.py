@@ -3,7 +3,7 @@
 import csv
 import io
 import logging
-from multiprocessing import Queue, cpu_count
+from multiprocessing import Queue, active_children, cpu_count
 import os
 import pickle
 import unittest
@@ -451,6 +451,75 @@ class TestTournament(unittest.TestCase):
         self.assertIsInstance(results, axelrod.ResultSet)
         self.assertEqual(tournament.num_interactions, 75)
 
+    def test_stream(self):
+        tournament = axelrod.Tournament(
+            name=self.test_name,
+            players=self.players,
+            game=self.game,
+            turns=axelrod.DEFAULT_TURNS,
+            repetitions=self.test_repetitions)
+        axelrod.seed(0)
+        streamed = dict(tournament.stream(progress_bar=False))
+        self.assertEqual(len(streamed), 15)
+        for interactions in streamed.values():
+            self.assertEqual(len(interactions), self.test_repetitions)
+            for interaction in interactions:
+                self.assertEqual(len(interaction), axelrod.DEFAULT_TURNS)
+
+        axelrod.seed(0)
+        tournament.play(progress_bar=False, build_results=False,
+                        filename=self.filename)
+        self.assertEqual(streamed,
+                         axelrod.interaction_utils.read_interactions_from_file(
+                             self.filename, progress_bar=False))
+
+    @patch('tqdm.tqdm', RecordedTQDM)
+    def test_stream_progress_bar(self):
+        RecordedTQDM.reset_record()
+        tournament = axelrod.Tournament(
+            name=self.test_name,
+            players=self.players,
+            game=self.game,
+            turns=axelrod.DEFAULT_TURNS,
+            repetitions=self.test_repetitions)
+        list(tournament.stream(progress_bar=True))
+        self.assertEqual(len(RecordedTQDM.record), 1)
+        self.assertEqual(RecordedTQDM.record[0].n, 15)
+
+    def test_parallel_stream(self):
+        tournament = axelrod.Tournament(
+            name=self.test_name,
+            players=self.players,
+            game=self.game,
+            turns=axelrod.DEFAULT_TURNS,
+            repetitions=self.test_repetitions)
+        streamed = dict(tournament.stream(processes=2, progress_bar=False))
+        index_pairs = [chunk[0] for chunk in
+                       tournament.match_generator.build_match_chunks()]
+        self.assertEqual(sorted(streamed), sorted(index_pairs))
+        for interactions in streamed.values():
+            self.assertEqual(len(interactions), self.test_repetitions)
+
+    @patch('tqdm.tqdm', RecordedTQDM)
+    def test_parallel_stream_stopped_early(self):
+        RecordedTQDM.reset_record()
+        # Long enough for the workers to still be playing
+        tournament = axelrod.Tournament(
+            name=self.test_name,
+            players=self.players,
+            game=self.game,
+            turns=1000,
+            repetitions=20)
+        stream = tournament.stream(processes=2, progress_bar=True)
+        index_pair, interactions = next(stream)
+        self.assertEqual(len(interactions), 20)
+        self.assertGreater(len(active_children()), 0)
+
+        stream.close()
+        self.assertEqual(active_children(), [])
+        self.assertEqual(len(RecordedTQDM.record), 1)
+        self.assertTrue(RecordedTQDM.record[0].disable)
+
     def test_run_serial(self):
         tournament = axelrod.Tournament(
             name=self.test_name,
@@ -9,19 +9,21 @@ import os
 import tqdm
 
 from axelrod import DEFAULT_TURNS
-from axelrod.player import Player
+from axelrod.player import Player, type_registry
 from axelrod.action import actions_to_str
 from .game import Game
 from .match import Match
 from .match_generator import MatchGenerator
+from .out_of_core import OutOfCoreResultSet
 from .result_set import ResultSet
+from .sparse import SparseResultSet
 from axelrod.action import Action, str_to_actions
 
 import axelrod.interaction_utils as iu
 
 C, D = Action.C, Action.D
 
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 
 class Tournament(object):
@@ -99,7 +101,8 @@ class Tournament(object):
 
     def play(self, build_results: bool = True, filename: str = None,
              processes: int = None, progress_bar: bool = True,
-             ) -> ResultSet:
+             memory_limit: int = None, sparse: bool = False,
+             backend: str = None) -> ResultSet:
         """
         Plays the tournament and passes the results to the ResultSet class
 
@@ -113,11 +116,28 @@ class Tournament(object):
             The number of processes to be used for parallel processing
         progress_bar : bool
             Whether or not to create a progress bar which will be updated
+        memory_limit : integer
+            If given, the results are analysed out of core (see
+            axelrod.OutOfCoreResultSet) using approximately at most this number
+            of bytes of memory. The results are then analysed in a single
+            process and can not be sparse or use another backend.
+        sparse : bool
+            Whether or not to index the results by edges (see
+            axelrod.SparseResultSet), which is much more efficient for
+            tournaments in which few pairs of players interact.
+        backend : string
+            The library used to aggregate the results: "numpy", "pandas" or
+            "dask". If not given this is chosen from the size of the
+            interactions file (see axelrod.result_set.choose_backend).
 
         Returns
         -------
         axelrod.ResultSet
         """
+        if memory_limit is not None and (sparse or backend is not None):
+            raise ValueError("The results of a tournament analysed with a "
+                             "memory_limit can not be sparse or use a backend.")
+
         self.num_interactions = 0
 
         self.use_progress_bar = progress_bar
@@ -135,18 +155,90 @@ class Tournament(object):
             self._run_parallel(build_results=build_results, processes=processes)
 
         result_set = None
-        if build_results:
-            result_set = ResultSet(filename=self.filename,
-                                   players=[str(p) for p in self.players],
-                                   repetitions=self.repetitions,
-                                   processes=processes,
-                                   progress_bar=progress_bar)
+        if build_results and memory_limit is not None:
+            result_set = OutOfCoreResultSet(filename=self.filename,
+                                            players=[str(p)
+                                                     for p in self.players],
+                                            repetitions=self.repetitions,
+                                            memory_limit=memory_limit,
+                                            progress_bar=progress_bar)
+        elif build_results:
+            result_set_class = SparseResultSet if sparse else ResultSet
+            result_set = result_set_class(filename=self.filename,
+                                          players=[str(p)
+                                                   for p in self.players],
+                                          repetitions=self.repetitions,
+                                          processes=processes,
+                                          progress_bar=progress_bar,
+                                          backend=backend)
         if self._temp_file_descriptor is not None:
             os.close(self._temp_file_descriptor)
             os.remove(self.filename)
 
         return result_set
 
+    def stream(self, processes: int = None,
+               progress_bar: bool = True) -> Iterator[Tuple[tuple, list]]:
+        """
+        Plays the tournament and yields the interactions of each pair of
+        players as soon as they are played, without writing them to a file or
+        building a result set.
+
+        Parameters
+        ----------
+        processes : integer
+            The number of processes to be used for parallel processing
+        progress_bar : bool
+            Whether or not to create a progress bar which will be updated
+
+        Yields
+        ------
+        index_pair, interactions
+            The indices of the players and the list of the interactions of
+            their repetitions.
+        """
+        self.use_progress_bar = progress_bar
+        bar = self._get_progress_bar()
+
+        # The consumer can stop iterating at any time: the workers are then
+        # terminated rather than left to play the remaining matches.
+        workers = []  # type: List[Process]
+        try:
+            if processes is None:
+                for chunk in self.match_generator.build_match_chunks():
+                    results = self._play_matches(chunk, build_results=False)
+                    for index_pair, interactions in results.items():
+                        yield index_pair, [interaction
+                                           for interaction, _ in interactions]
+                    if self.use_progress_bar:
+                        bar.update(1)
+            else:
+                work_queue = Queue()  # type: Queue
+                done_queue = Queue()  # type: Queue
+                # Do not wait for unread chunks to be flushed on exit
+                work_queue.cancel_join_thread()
+                for chunk in self.match_generator.build_match_chunks():
+                    work_queue.put(chunk)
+                workers = self._start_workers(
+                    self._n_workers(processes=processes), work_queue,
+                    done_queue, build_results=False)
+
+                stops = 0
+                while stops < len(workers):
+                    results = done_queue.get()
+                    if results == 'STOP':
+                        stops += 1
+                        continue
+                    for index_pair, interactions in results.items():
+                        yield index_pair, [interaction
+                                           for interaction, _ in interactions]
+                    if self.use_progress_bar:
+                        bar.update(1)
+        finally:
+            for worker in workers:
+                worker.terminate()
+                worker.join()
+            _close_objects(bar)
 
     def _run_serial(self, build_results: bool=True) -> bool:
         """Run all matches in serial."""
@@ -217,6 +309,7 @@ class Tournament(object):
 
     def _write_interactions_to_file(self, results, writer):
         """Write the interactions to csv."""
+        names = [type_registry.name(player.type_id) for player in self.players]
         for index_pair, interactions in results.items():
             repetition = 0
             for interaction, results in interactions:
@@ -235,8 +328,8 @@ class Tournament(object):
                     opponent_index = index_pair[index - 1]
                     row = [self.num_interactions, player_index, opponent_index,
                            repetition]
-                    row.append(str(self.players[player_index]))
-                    row.append(str(self.players[opponent_index]))
+                    row.append(names[player_index])
+                    row.append(names[opponent_index])
                     history = actions_to_str([i[index] for i in interaction])
                     row.append(history)
 
@@ -305,7 +398,8 @@ class Tournament(object):
         return n_workers
 
     def _start_workers(self, workers: int, work_queue: Queue,
-                       done_queue: Queue, build_results: bool=True) -> bool:
+                       done_queue: Queue,
+                       build_results: bool=True) -> List[Process]:
         """
         Initiates the sub-processes to carry out parallel processing.
 
@@ -317,13 +411,20 @@ class Tournament(object):
             A queue containing an entry for each round robin to be processed
         done_queue : multiprocessing.Queue
             A queue containing the output dictionaries from each round robin
+
+        Returns
+        -------
+        processes : list
+            The started sub-processes
         """
+        processes = []  # type: List[Process]
         for worker in range(workers):
             process = Process(
                 target=self._worker, args=(work_queue, done_queue, build_results))
             work_queue.put('STOP')
             process.start()
-        return True
+            processes.append(process)
+        return processes
 
     def _process_done_queue(self, workers: int, done_queue: Queue,
                             build_results: bool=True):
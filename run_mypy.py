@@ -9,8 +9,11 @@ modules = ["run_strategy_indexer.py",
            "axelrod/load_data_.py",
            "axelrod/mock_player.py",
            "axelrod/moran.py",
+           "axelrod/moran_history.py",
+           "axelrod/out_of_core.py",
            "axelrod/plot.py",
            "axelrod/random_.py",
+           "axelrod/sparse.py",
            "axelrod/tournament.py",
            "axelrod/strategies/adaptive.py",
            "axelrod/strategies/alternator.py",
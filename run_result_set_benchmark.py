@@ -0,0 +1,52 @@
+"""
+Times the analysis of interactions files of increasing size with each of the
+result set aggregation backends.
+
+Usage:
+
+    python run_result_set_benchmark.py [number of repetitions of each timing]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+import axelrod as axl
+
+BACKENDS = ["numpy", "pandas", "dask"]
+SIZES = [(5, 10), (20, 10), (50, 10), (100, 20)]
+TURNS = 50
+
+
+def write_interactions(filename, number_of_players, repetitions):
+    """Plays a tournament writing its interactions to filename"""
+    axl.seed(0)
+    players = [axl.Random(p) for p in
+               [i / number_of_players for i in range(number_of_players)]]
+    tournament = axl.Tournament(players, turns=TURNS, repetitions=repetitions)
+    tournament.play(filename=filename, progress_bar=False)
+    return players
+
+
+def main(number=3):
+    print("{:>8} {:>12} {:>12} {:>10} {:>10} {:>10} {:>10}".format(
+        "players", "repetitions", "size (MB)", *BACKENDS, "chosen"))
+    for number_of_players, repetitions in SIZES:
+        _, filename = tempfile.mkstemp(suffix=".csv")
+        players = write_interactions(filename, number_of_players, repetitions)
+        names = [str(player) for player in players]
+        times = []
+        for backend in BACKENDS:
+            times.append(min(timeit.repeat(
+                lambda: axl.ResultSet(filename, names, repetitions,
+                                      progress_bar=False, backend=backend),
+                number=1, repeat=number)))
+        size = os.path.getsize(filename) / 2 ** 20
+        print("{:>8} {:>12} {:>12.2f} {:>10.3f} {:>10.3f} {:>10.3f} {:>10}"
+              .format(number_of_players, repetitions, size, *times,
+                      axl.result_set.choose_backend(filename)))
+        os.remove(filename)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))